@@ -11,13 +11,9 @@ import tempfile
 
 from . import models, schemas
 from ..auth.models import User
-from ...clients.openai import OpenAIClient
 
 logger = logging.getLogger(__name__)
 
-# Initialize OpenAI client
-openai_client = OpenAIClient()
-
 def get_legal_documents(db: Session, type: Optional[str] = None, active_only: bool = True) -> List[models.LegalDocument]:
     """
     Get legal documents
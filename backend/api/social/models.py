@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Float, DateTime, ForeignKey, Boolean, Text, JSON, Enum
+from sqlalchemy import Column, String, Integer, Float, Date, DateTime, ForeignKey, Boolean, Text, JSON, Enum, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
@@ -50,6 +50,10 @@ class SocialAccount(Base):
     posts_count = Column(Integer, nullable=True)
     metadata = Column(JSON, nullable=True)
     last_sync_at = Column(DateTime(timezone=True), nullable=True)
+    # Post sync cursor: newest synced post, only newer ones are fetched
+    posts_synced_until = Column(DateTime(timezone=True), nullable=True)
+    last_post_external_id = Column(String, nullable=True)
+    engagement_refreshed_at = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -84,6 +88,11 @@ class SocialPost(Base):
     user = relationship("User", back_populates="social_posts")
     account = relationship("SocialAccount", back_populates="posts")
     product = relationship("Product", back_populates="social_posts")
+    
+    __table_args__ = (
+        # Matching synced posts by their platform id; the conflict target of sync upserts
+        UniqueConstraint("account_id", "external_id", name="uq_social_posts_account_external"),
+    )
 
 class SocialTemplate(Base):
     __tablename__ = "social_templates"
@@ -155,6 +164,37 @@ class SocialAnalytics(Base):
     user = relationship("User", back_populates="social_analytics")
     account = relationship("SocialAccount")
     post = relationship("SocialPost")
+    
+    __table_args__ = (
+        # Date-range analytics queries filter on the user first
+        Index("ix_social_analytics_user_date", "user_id", "date"),
+    )
+
+# Daily engagement totals of the posts published per account, platform and day.
+# Maintained by sync_account_posts, rebuilt with `python -m api.social.rollup`.
+class SocialDailyMetrics(Base):
+    __tablename__ = "social_daily_metrics"
+    
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"))
+    account_id = Column(String, ForeignKey("social_accounts.id", ondelete="CASCADE"))
+    platform = Column(Enum(SocialPlatform), nullable=False)
+    day = Column(Date, nullable=False)
+    posts = Column(Integer, default=0)
+    impressions = Column(Integer, default=0)
+    reach = Column(Integer, default=0)
+    engagement = Column(Integer, default=0)
+    likes = Column(Integer, default=0)
+    comments = Column(Integer, default=0)
+    shares = Column(Integer, default=0)
+    clicks = Column(Integer, default=0)
+    saves = Column(Integer, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        UniqueConstraint("account_id", "platform", "day", name="uq_social_daily_metrics_account_platform_day"),
+        Index("ix_social_daily_metrics_user_day", "user_id", "day"),
+    )
 
 # Add relationships to User and Product models
 from ..auth.models import User
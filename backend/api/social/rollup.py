@@ -0,0 +1,202 @@
+"""
+Daily social metrics rollup.
+
+`SocialDailyMetrics` holds, per account, platform and publication day, the
+number of published posts and the sum of their latest engagement
+counters. Syncs, publishing and deletion apply the change of each post as
+a delta, so charts read one row per account and day however many posts
+there are. The table can be rebuilt from the posts at any time:
+
+    python -m api.social.rollup [--account ACCOUNT_ID]
+"""
+import argparse
+import uuid
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+import logging
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from database import upsert_insert
+from . import models
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_METRICS = ("impressions", "reach", "engagement", "likes", "comments", "shares", "clicks", "saves")
+
+# Interactions summed into "engagement" when the platform does not report a total
+ENGAGEMENT_METRICS = ("likes", "comments", "shares", "saves")
+
+RollupKey = Tuple[str, str, models.SocialPlatform, date]
+
+ROLLUP_COUNTERS = ("posts",) + ROLLUP_METRICS
+
+def parse_published_at(published_at: Any) -> Optional[datetime]:
+    """
+    Publication time of a post as naive UTC, whether stored as a datetime or received as an ISO string
+    """
+    if isinstance(published_at, str):
+        try:
+            published_at = datetime.fromisoformat(published_at.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if not isinstance(published_at, datetime):
+        return None
+    if published_at.tzinfo is not None:
+        published_at = published_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return published_at
+
+def published_day(published_at: Any) -> Optional[date]:
+    parsed = parse_published_at(published_at)
+    return parsed.date() if parsed else None
+
+def post_metrics(engagement: Optional[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Rollup counters of one post from its engagement payload
+    """
+    engagement = engagement or {}
+    metrics = {}
+    for metric in ROLLUP_METRICS:
+        try:
+            metrics[metric] = int(engagement.get(metric) or 0)
+        except (TypeError, ValueError):
+            metrics[metric] = 0
+    if "engagement" not in engagement:
+        metrics["engagement"] = sum(metrics[metric] for metric in ENGAGEMENT_METRICS)
+    return metrics
+
+class RollupDelta:
+    """
+    Accumulate per-day changes to one account's rollup rows
+    """
+    def __init__(self, account: models.SocialAccount):
+        self.account = account
+        self.totals: Dict[date, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def add(self, published_at: Any, engagement: Optional[Dict[str, Any]], sign: int = 1) -> None:
+        day = published_day(published_at)
+        if day is None:
+            return
+        totals = self.totals[day]
+        totals["posts"] += sign
+        for metric, value in post_metrics(engagement).items():
+            totals[metric] += sign * value
+
+    def remove_post(self, post: models.SocialPost) -> None:
+        """
+        Take a post's current state out of the totals, if it is counted
+        """
+        if post.status == models.PostStatus.published:
+            self.add(post.published_at, post.engagement, sign=-1)
+
+    def add_post(self, post: models.SocialPost) -> None:
+        """
+        Add a post's current state to the totals, if it is counted
+        """
+        if post.status == models.PostStatus.published:
+            self.add(post.published_at, post.engagement)
+
+    def apply(self, db: Session) -> None:
+        """
+        Add the accumulated changes to the rollup rows (the caller commits)
+        
+        Each day is one INSERT ... ON CONFLICT DO UPDATE SET col = col + delta,
+        so concurrent syncs of an account add up instead of overwriting each
+        other's read-modify-write. Days are written in order to keep the row
+        locks of concurrent transactions in the same order.
+        """
+        changes = {day: totals for day, totals in self.totals.items() if any(totals.values())}
+        if not changes:
+            return
+        
+        table = models.SocialDailyMetrics.__table__
+        for day in sorted(changes):
+            statement = upsert_insert(db, table).values(
+                id=str(uuid.uuid4()),
+                user_id=self.account.user_id,
+                account_id=self.account.id,
+                platform=self.account.platform,
+                day=day,
+                **{counter: changes[day].get(counter, 0) for counter in ROLLUP_COUNTERS}
+            )
+            db.execute(statement.on_conflict_do_update(
+                index_elements=[table.c.account_id, table.c.platform, table.c.day],
+                set_={
+                    **{
+                        counter: func.coalesce(table.c[counter], 0) + statement.excluded[counter]
+                        for counter in ROLLUP_COUNTERS
+                    },
+                    "updated_at": func.now()
+                }
+            ))
+        
+        self.totals.clear()
+
+def new_rollup_row(key: RollupKey) -> models.SocialDailyMetrics:
+    user_id, account_id, platform, day = key
+    return models.SocialDailyMetrics(
+        id=str(uuid.uuid4()),
+        user_id=user_id,
+        account_id=account_id,
+        platform=platform,
+        day=day,
+        posts=0,
+        **dict.fromkeys(ROLLUP_METRICS, 0)
+    )
+
+def rebuild_daily_metrics(db: Session, account_id: Optional[str] = None, batch_size: int = 1000) -> int:
+    """
+    Recompute the rollup from the published posts and replace the stored rows
+    
+    Returns the number of rollup rows written.
+    """
+    query = db.query(
+        models.SocialPost.user_id,
+        models.SocialPost.account_id,
+        models.SocialAccount.platform,
+        models.SocialPost.published_at,
+        models.SocialPost.engagement
+    ).join(
+        models.SocialAccount, models.SocialAccount.id == models.SocialPost.account_id
+    ).filter(
+        models.SocialPost.status == models.PostStatus.published,
+        models.SocialPost.published_at.isnot(None)
+    )
+    if account_id:
+        query = query.filter(models.SocialPost.account_id == account_id)
+    
+    rows: Dict[RollupKey, models.SocialDailyMetrics] = {}
+    for post in query.yield_per(batch_size):
+        key = (post.user_id, post.account_id, post.platform, published_day(post.published_at))
+        row = rows.get(key)
+        if row is None:
+            row = rows[key] = new_rollup_row(key)
+        row.posts += 1
+        for metric, value in post_metrics(post.engagement).items():
+            setattr(row, metric, getattr(row, metric) + value)
+    
+    delete = db.query(models.SocialDailyMetrics)
+    if account_id:
+        delete = delete.filter(models.SocialDailyMetrics.account_id == account_id)
+    delete.delete(synchronize_session=False)
+    
+    db.add_all(rows.values())
+    db.commit()
+    
+    return len(rows)
+
+if __name__ == "__main__":
+    from database import SessionLocal
+    
+    parser = argparse.ArgumentParser(description="Rebuild the daily social metrics rollup")
+    parser.add_argument("--account", help="Only rebuild this social account")
+    args = parser.parse_args()
+    
+    db = SessionLocal()
+    try:
+        count = rebuild_daily_metrics(db, account_id=args.account)
+        print(f"Wrote {count} daily social metrics rows")
+    finally:
+        db.close()
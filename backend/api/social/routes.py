@@ -5,7 +5,7 @@ from typing import List, Optional, Dict, Any
 from datetime import datetime, date
 
 from database import get_db
-from . import schemas, services
+from . import schemas, services, sync
 from ..auth.services import get_current_user
 from ..auth.models import User
 
@@ -80,6 +80,22 @@ async def delete_social_account(
     services.delete_social_account(db, account_id=account_id)
     return JSONResponse(status_code=status.HTTP_204_NO_CONTENT, content={})
 
+@router.post("/accounts/sync", response_model=schemas.SyncResponse)
+async def sync_all_social_accounts(
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Sync all social accounts of the current user concurrently
+    """
+    # Start sync in background
+    background_tasks.add_task(
+        sync.sync_social_accounts,
+        user_id=current_user.id
+    )
+    
+    return {"status": "success", "message": "Sync started"}
+
 @router.post("/accounts/{account_id}/sync", response_model=schemas.SyncResponse)
 async def sync_social_account(
     account_id: str,
@@ -481,6 +497,27 @@ async def get_social_analytics(
         post_id=post_id
     )
 
+@router.get("/analytics/daily", response_model=List[Dict[str, Any]])
+async def get_social_daily_metrics(
+    start_date: date = Query(...),
+    end_date: date = Query(...),
+    account_id: Optional[str] = Query(None),
+    platform: Optional[str] = Query(None),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Get daily post and engagement totals by publication day
+    """
+    return services.get_social_daily_metrics(
+        db,
+        user_id=current_user.id,
+        start_date=start_date,
+        end_date=end_date,
+        account_id=account_id,
+        platform=platform
+    )
+
 @router.post("/generate", response_model=schemas.ContentGenerationResponse)
 async def generate_social_content(
     generation: schemas.ContentGenerationRequest,
@@ -1,6 +1,6 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import func, desc, asc
-from typing import List, Optional, Dict, Any, BinaryIO
+from typing import List, Optional, Dict, Any, BinaryIO, Tuple
 from datetime import datetime, timedelta, date
 import uuid
 import logging
@@ -8,9 +8,14 @@ import json
 import random
 import io
 import os
+import inspect
 from fastapi import UploadFile
 
+from database import upsert_insert
+from config import settings
+from llm import llm_gateway
 from . import models, schemas
+from .rollup import ROLLUP_METRICS, RollupDelta, parse_published_at
 from ..products.models import Product
 from ...clients.facebook import FacebookClient
 from ...clients.instagram import InstagramClient
@@ -20,7 +25,6 @@ from ...clients.pinterest import PinterestClient
 from ...clients.youtube import YouTubeClient
 from ...clients.linkedin import LinkedInClient
 from ...clients.snapchat import SnapchatClient
-from ...clients.openai import OpenAIClient
 
 logger = logging.getLogger(__name__)
 
@@ -33,7 +37,6 @@ pinterest_client = PinterestClient()
 youtube_client = YouTubeClient()
 linkedin_client = LinkedInClient()
 snapchat_client = SnapchatClient()
-openai_client = OpenAIClient()
 
 def get_social_accounts(db: Session, user_id: str, platform: Optional[str] = None) -> List[models.SocialAccount]:
     """
@@ -183,8 +186,9 @@ def sync_social_account(db: Session, account_id: str) -> None:
         
         db.commit()
         
-        # Sync posts
+        # Sync new posts, then engagement of recent ones
         sync_account_posts(db, account, client)
+        refresh_recent_engagement(db, account, client)
         
     except Exception as e:
         logger.error(f"Error syncing social account {account_id}: {e}")
@@ -200,59 +204,250 @@ def sync_social_account(db: Session, account_id: str) -> None:
         
         db.commit()
 
+# Keyword arguments of a client's get_posts that can fetch from the sync cursor page by page
+PAGED_GET_POSTS_PARAMETERS = {"since", "since_id", "cursor", "limit"}
+
+def supports_paged_posts(client: Any) -> bool:
+    """
+    Whether the client's get_posts takes the paging keyword arguments
+    """
+    try:
+        parameters = inspect.signature(client.get_posts).parameters
+    except (TypeError, ValueError):
+        return False
+    if any(parameter.kind == inspect.Parameter.VAR_KEYWORD for parameter in parameters.values()):
+        return True
+    return PAGED_GET_POSTS_PARAMETERS <= set(parameters)
+
 def sync_account_posts(db: Session, account: models.SocialAccount, client: Any) -> None:
     """
-    Sync posts for a social account
+    Sync new posts for a social account
+    
+    Posts are fetched page by page (newest first) from the account's sync
+    cursor, so a sync only reads what was published since the last one.
+    Paging clients take `since`, `since_id`, `cursor` and `limit` and
+    return {"posts": [...], "next_cursor": ...}; a plain list is one page.
+    Clients without these arguments are called as `get_posts()` and the
+    posts are filtered here.
+    
+    The cursor is the newest post seen, by publication time and id. Each
+    sync reads SOCIAL_SYNC_LOOKBACK seconds before it again, and posts
+    published earlier are only skipped once they are stored, so posts that
+    show up late or are backdated are still added. Clients without
+    `get_posts_engagement` also keep their stored posts from the last
+    SOCIAL_ENGAGEMENT_REFRESH_DAYS days, so the sync refreshes their
+    engagement. Paging goes on past the previous newest post (`since_id`),
+    where backdated posts can follow, until a page only holds posts older
+    than the lookback. Engagement changes are applied to the daily metrics
+    rollup in the same transaction.
     """
     try:
-        # Get posts from platform
-        posts = client.get_posts()
+        since = parse_published_at(account.posts_synced_until)
+        window_start = since - timedelta(seconds=settings.SOCIAL_SYNC_LOOKBACK) if since else None
+        skip_before = window_start
+        if window_start and not hasattr(client, "get_posts_engagement"):
+            # The sync payload is the only engagement update these clients get
+            skip_before = min(window_start, datetime.utcnow() - timedelta(days=settings.SOCIAL_ENGAGEMENT_REFRESH_DAYS))
+        since_id = account.last_post_external_id
+        newest, newest_id = since, since_id
+        paged = supports_paged_posts(client)
+        cursor = None
         
-        # Process each post
-        for post_data in posts:
-            # Check if post already exists
-            external_id = post_data.get("id")
-            if not external_id:
-                continue
+        while True:
+            # Get posts from platform
+            if paged:
+                page = client.get_posts(
+                    since=window_start,
+                    since_id=since_id,
+                    cursor=cursor,
+                    limit=settings.SOCIAL_SYNC_PAGE_SIZE
+                )
+            else:
+                page = client.get_posts()
+            posts, cursor = (page.get("posts") or [], page.get("next_cursor")) if isinstance(page, dict) else (page or [], None)
+            if not paged:
+                cursor = None
             
-            existing_post = db.query(models.SocialPost).filter(
-                models.SocialPost.account_id == account.id,
-                models.SocialPost.external_id == external_id
-            ).first()
+            # Posts from before the lookback are skipped only if already stored
+            older = []
+            page_is_older = bool(posts)
+            for post_data in posts:
+                published_at = parse_published_at(post_data.get("published_at"))
+                if not (window_start and published_at and published_at < window_start):
+                    page_is_older = False
+                if skip_before and published_at and published_at < skip_before and post_data.get("id"):
+                    older.append(str(post_data["id"]))
+            stored = set(match_account_posts(db, account, older)) if older else set()
+            new_posts = [post_data for post_data in posts if str(post_data.get("id")) not in stored]
             
-            if existing_post:
-                # Update existing post
-                existing_post.status = models.PostStatus.published
-                existing_post.published_at = post_data.get("published_at")
-                existing_post.engagement = post_data.get("engagement")
-                existing_post.updated_at = datetime.utcnow()
-            else:
-                # Create new post
-                new_post = models.SocialPost(
-                    id=str(uuid.uuid4()),
-                    user_id=account.user_id,
-                    account_id=account.id,
-                    external_id=external_id,
-                    type=map_platform_post_type(post_data.get("type"), account.platform),
-                    status=models.PostStatus.published,
-                    content=post_data.get("content"),
-                    media_urls=post_data.get("media_urls"),
-                    link=post_data.get("link"),
-                    published_at=post_data.get("published_at"),
-                    hashtags=post_data.get("hashtags"),
-                    mentions=post_data.get("mentions"),
-                    engagement=post_data.get("engagement"),
-                    metadata=post_data
-                )
-                
-                db.add(new_post)
+            for post_data in new_posts:
+                published_at = parse_published_at(post_data.get("published_at"))
+                external_id = str(post_data.get("id") or "")
+                if published_at and external_id and (newest is None or (published_at, external_id) > (newest, newest_id or "")):
+                    newest, newest_id = published_at, external_id
+            
+            upsert_account_posts(db, account, new_posts)
+            
+            # Stop once a page only holds posts from before the lookback
+            if not cursor or not posts or page_is_older:
+                break
         
+        account.posts_synced_until = newest
+        account.last_post_external_id = newest_id
         db.commit()
         
     except Exception as e:
         logger.error(f"Error syncing posts for account {account.id}: {e}")
         raise
 
+def refresh_recent_engagement(db: Session, account: models.SocialAccount, client: Any) -> int:
+    """
+    Refresh engagement of the account's posts from the last SOCIAL_ENGAGEMENT_REFRESH_DAYS days
+    
+    Engagement of older posts barely moves, so they keep their last
+    metrics. Clients return {external_id: engagement} from
+    `get_posts_engagement(external_ids)`; clients without it are skipped
+    and keep the engagement their posts were synced with. Returns the
+    number of posts whose engagement changed.
+    """
+    if not hasattr(client, "get_posts_engagement"):
+        return 0
+    
+    cutoff = datetime.utcnow() - timedelta(days=settings.SOCIAL_ENGAGEMENT_REFRESH_DAYS)
+    posts = db.query(
+        models.SocialPost.id,
+        models.SocialPost.external_id,
+        models.SocialPost.status,
+        models.SocialPost.published_at,
+        models.SocialPost.engagement
+    ).filter(
+        models.SocialPost.account_id == account.id,
+        models.SocialPost.status == models.PostStatus.published,
+        models.SocialPost.external_id.isnot(None),
+        models.SocialPost.published_at >= cutoff
+    ).all()
+    
+    rollup = RollupDelta(account)
+    now = datetime.utcnow()
+    updates = []
+    batch_size = settings.SOCIAL_ENGAGEMENT_BATCH_SIZE
+    for i in range(0, len(posts), batch_size):
+        batch = posts[i:i + batch_size]
+        engagement = client.get_posts_engagement([post.external_id for post in batch]) or {}
+        for post in batch:
+            metrics = engagement.get(post.external_id)
+            if metrics is None or metrics == post.engagement:
+                continue
+            rollup.remove_post(post)
+            rollup.add(post.published_at, metrics)
+            updates.append({"id": post.id, "engagement": metrics, "updated_at": now})
+    
+    if updates:
+        db.bulk_update_mappings(models.SocialPost, updates)
+        rollup.apply(db)
+    account.engagement_refreshed_at = now
+    db.commit()
+    
+    return len(updates)
+
+# External ids per IN (...) lookup when matching synced posts
+POST_MATCH_CHUNK_SIZE = 500
+
+def match_account_posts(db: Session, account: models.SocialAccount, external_ids: List[str]) -> Dict[str, Any]:
+    """
+    Load the stored state of an account's posts by external id, in chunks
+    """
+    existing = {}
+    for i in range(0, len(external_ids), POST_MATCH_CHUNK_SIZE):
+        for post in db.query(
+            models.SocialPost.id,
+            models.SocialPost.external_id,
+            models.SocialPost.status,
+            models.SocialPost.published_at,
+            models.SocialPost.engagement
+        ).filter(
+            models.SocialPost.account_id == account.id,
+            models.SocialPost.external_id.in_(external_ids[i:i + POST_MATCH_CHUNK_SIZE])
+        ):
+            existing[post.external_id] = post
+    return existing
+
+def upsert_account_posts(db: Session, account: models.SocialAccount, posts: List[Dict[str, Any]]) -> Tuple[int, int]:
+    """
+    Insert or update remote posts of an account in bulk (the caller commits)
+    
+    Existing posts are matched with one prefetch of their external ids. New
+    ones are written with one INSERT ... ON CONFLICT (account_id,
+    external_id) DO NOTHING, so a post inserted by a concurrent sync is
+    never duplicated: it is matched again and updated like the others.
+    Returns the number of inserted and updated posts.
+    """
+    # Last payload wins if the platform returns a post twice; ids are keyed as stored
+    payloads = {str(post_data["id"]): post_data for post_data in posts if post_data.get("id")}
+    if not payloads:
+        return 0, 0
+    
+    existing = match_account_posts(db, account, list(payloads))
+    
+    inserts = [
+        {
+            "id": str(uuid.uuid4()),
+            "user_id": account.user_id,
+            "account_id": account.id,
+            "external_id": external_id,
+            "type": map_platform_post_type(post_data.get("type"), account.platform),
+            "status": models.PostStatus.published,
+            "content": post_data.get("content"),
+            "media_urls": post_data.get("media_urls"),
+            "link": post_data.get("link"),
+            "published_at": parse_published_at(post_data.get("published_at")),
+            "hashtags": post_data.get("hashtags"),
+            "mentions": post_data.get("mentions"),
+            "engagement": post_data.get("engagement"),
+            "metadata": post_data
+        }
+        for external_id, post_data in payloads.items() if external_id not in existing
+    ]
+    inserted = set()
+    if inserts:
+        table = models.SocialPost.__table__
+        inserted = set(db.execute(
+            upsert_insert(db, table).values(inserts).on_conflict_do_nothing(
+                index_elements=[table.c.account_id, table.c.external_id]
+            ).returning(table.c.external_id)
+        ).scalars())
+        
+        # Rows another sync inserted since the prefetch are updated instead
+        raced = [row["external_id"] for row in inserts if row["external_id"] not in inserted]
+        if raced:
+            existing.update(match_account_posts(db, account, raced))
+    
+    rollup = RollupDelta(account)
+    now = datetime.utcnow()
+    updates = []
+    for external_id, post_data in payloads.items():
+        existing_post = existing.get(external_id)
+        if existing_post:
+            # Update existing post
+            rollup.remove_post(existing_post)
+            updates.append({
+                "id": existing_post.id,
+                "status": models.PostStatus.published,
+                "published_at": parse_published_at(post_data.get("published_at")),
+                "engagement": post_data.get("engagement"),
+                "updated_at": now
+            })
+        elif external_id not in inserted:
+            continue
+        
+        rollup.add(post_data.get("published_at"), post_data.get("engagement"))
+    
+    if updates:
+        db.bulk_update_mappings(models.SocialPost, updates)
+    rollup.apply(db)
+    
+    return len(inserted), len(updates)
+
 def map_platform_post_type(platform_type: str, platform: str) -> models.PostType:
     """
     Map platform-specific post type to our internal type
@@ -407,6 +602,10 @@ def update_social_post(db: Session, post_id: str, post: schemas.SocialPostUpdate
     if not db_post:
         raise ValueError(f"Social post not found: {post_id}")
     
+    # A status change moves the post in or out of the daily rollup
+    rollup = RollupDelta(db_post.account)
+    rollup.remove_post(db_post)
+    
     # Update fields if provided
     if post.product_id is not None:
         db_post.product_id = post.product_id
@@ -440,6 +639,9 @@ def update_social_post(db: Session, post_id: str, post: schemas.SocialPostUpdate
     
     db_post.updated_at = datetime.utcnow()
     
+    rollup.add_post(db_post)
+    rollup.apply(db)
+    
     db.commit()
     db.refresh(db_post)
     
@@ -451,6 +653,9 @@ def delete_social_post(db: Session, post_id: str) -> None:
     """
     db_post = db.query(models.SocialPost).filter(models.SocialPost.id == post_id).first()
     if db_post:
+        rollup = RollupDelta(db_post.account)
+        rollup.remove_post(db_post)
+        rollup.apply(db)
         db.delete(db_post)
         db.commit()
 
@@ -504,9 +709,13 @@ def publish_social_post(db: Session, post_id: str) -> None:
         result = client.publish_post(post_data)
         
         # Update post with external ID and status
+        rollup = RollupDelta(account)
+        rollup.remove_post(post)
         post.external_id = result.get("id")
         post.status = models.PostStatus.published
         post.published_at = datetime.utcnow()
+        rollup.add(post.published_at, post.engagement)
+        rollup.apply(db)
         post.metadata = {
             **(post.metadata or {}),
             "publish_result": result
@@ -867,6 +1076,20 @@ def calculate_next_run(
     
     return next_run
 
+# Metrics summed by get_social_analytics
+ANALYTICS_METRICS = (
+    "impressions", "reach", "engagement", "likes", "comments",
+    "shares", "clicks", "saves", "followers_gained"
+)
+POST_ANALYTICS_METRICS = ("impressions", "reach", "engagement", "likes", "comments", "shares")
+DATE_ANALYTICS_METRICS = ("impressions", "reach", "engagement", "likes", "comments", "shares", "followers_gained")
+
+def analytics_sums(metrics=ANALYTICS_METRICS) -> List[Any]:
+    return [
+        func.coalesce(func.sum(getattr(models.SocialAnalytics, metric)), 0).label(metric)
+        for metric in metrics
+    ]
+
 def get_social_analytics(
     db: Session, 
     user_id: str, 
@@ -878,116 +1101,102 @@ def get_social_analytics(
 ) -> Dict[str, Any]:
     """
     Get social analytics
+    
+    Each breakdown is a grouped SUM in the database, so the work in Python
+    is proportional to the number of groups, not to the number of rows.
     """
     # Convert dates to datetime
     start_datetime = datetime.combine(start_date, datetime.min.time())
     end_datetime = datetime.combine(end_date, datetime.max.time())
     
-    # Build query
-    query = db.query(models.SocialAnalytics).filter(
+    # Build filters
+    filters = [
         models.SocialAnalytics.user_id == user_id,
         models.SocialAnalytics.date >= start_datetime,
         models.SocialAnalytics.date <= end_datetime
-    )
+    ]
     
     if account_id:
-        query = query.filter(models.SocialAnalytics.account_id == account_id)
+        filters.append(models.SocialAnalytics.account_id == account_id)
     
     if platform:
-        query = query.filter(models.SocialAnalytics.platform == platform)
+        filters.append(models.SocialAnalytics.platform == platform)
     
     if post_id:
-        query = query.filter(models.SocialAnalytics.post_id == post_id)
+        filters.append(models.SocialAnalytics.post_id == post_id)
     
-    analytics = query.all()
+    # Calculate summary
+    summary_row = db.query(
+        func.count(models.SocialAnalytics.id).label("rows"),
+        *analytics_sums()
+    ).filter(*filters).one()
+    
+    summary = {metric: int(getattr(summary_row, metric)) for metric in ANALYTICS_METRICS}
     
     # If no analytics data, return empty results
-    if not analytics:
+    if not summary_row.rows:
         return {
-            "summary": {
-                "impressions": 0,
-                "reach": 0,
-                "engagement": 0,
-                "likes": 0,
-                "comments": 0,
-                "shares": 0,
-                "clicks": 0,
-                "saves": 0,
-                "followers_gained": 0
-            },
+            "summary": summary,
             "by_platform": {},
             "by_post": [],
             "by_date": []
         }
     
-    # Calculate summary
-    summary = {
-        "impressions": sum(a.impressions or 0 for a in analytics),
-        "reach": sum(a.reach or 0 for a in analytics),
-        "engagement": sum(a.engagement or 0 for a in analytics),
-        "likes": sum(a.likes or 0 for a in analytics),
-        "comments": sum(a.comments or 0 for a in analytics),
-        "shares": sum(a.shares or 0 for a in analytics),
-        "clicks": sum(a.clicks or 0 for a in analytics),
-        "saves": sum(a.saves or 0 for a in analytics),
-        "followers_gained": sum(a.followers_gained or 0 for a in analytics)
-    }
-    
     # Calculate by platform
-    by_platform = {}
-    for platform_name in set(a.platform for a in analytics):
-        platform_analytics = [a for a in analytics if a.platform == platform_name]
-        by_platform[platform_name] = {
-            "impressions": sum(a.impressions or 0 for a in platform_analytics),
-            "reach": sum(a.reach or 0 for a in platform_analytics),
-            "engagement": sum(a.engagement or 0 for a in platform_analytics),
-            "likes": sum(a.likes or 0 for a in platform_analytics),
-            "comments": sum(a.comments or 0 for a in platform_analytics),
-            "shares": sum(a.shares or 0 for a in platform_analytics),
-            "clicks": sum(a.clicks or 0 for a in platform_analytics),
-            "saves": sum(a.saves or 0 for a in platform_analytics),
-            "followers_gained": sum(a.followers_gained or 0 for a in platform_analytics)
-        }
+    by_platform = {
+        row.platform: {metric: int(getattr(row, metric)) for metric in ANALYTICS_METRICS}
+        for row in db.query(
+            models.SocialAnalytics.platform,
+            *analytics_sums()
+        ).filter(*filters).group_by(models.SocialAnalytics.platform)
+    }
     
     # Calculate by post if post_id is not specified
     by_post = []
     if not post_id:
-        post_ids = set(a.post_id for a in analytics if a.post_id)
-        for post_id in post_ids:
-            post_analytics = [a for a in analytics if a.post_id == post_id]
-            
-            # Get post details
-            post = db.query(models.SocialPost).filter(models.SocialPost.id == post_id).first()
-            
+        post_rows = db.query(
+            models.SocialAnalytics.post_id,
+            func.min(models.SocialAnalytics.platform).label("platform"),
+            *analytics_sums(POST_ANALYTICS_METRICS)
+        ).filter(
+            *filters,
+            models.SocialAnalytics.post_id.isnot(None)
+        ).group_by(models.SocialAnalytics.post_id).all()
+        
+        # Get post details with one query
+        posts = {
+            post.id: post
+            for post in db.query(
+                models.SocialPost.id,
+                models.SocialPost.content,
+                models.SocialPost.published_at
+            ).filter(models.SocialPost.id.in_([row.post_id for row in post_rows]))
+        } if post_rows else {}
+        
+        for row in post_rows:
+            post = posts.get(row.post_id)
             by_post.append({
-                "post_id": post_id,
+                "post_id": row.post_id,
                 "title": post.content[:50] + "..." if post and post.content and len(post.content) > 50 else "N/A",
-                "platform": post_analytics[0].platform,
+                "platform": row.platform,
                 "date": post.published_at.isoformat() if post and post.published_at else None,
-                "impressions": sum(a.impressions or 0 for a in post_analytics),
-                "reach": sum(a.reach or 0 for a in post_analytics),
-                "engagement": sum(a.engagement or 0 for a in post_analytics),
-                "likes": sum(a.likes or 0 for a in post_analytics),
-                "comments": sum(a.comments or 0 for a in post_analytics),
-                "shares": sum(a.shares or 0 for a in post_analytics)
+                **{metric: int(getattr(row, metric)) for metric in POST_ANALYTICS_METRICS}
             })
     
     # Calculate by date
+    day = func.date(models.SocialAnalytics.date)
+    totals_by_day = {}
+    for row in db.query(day.label("day"), *analytics_sums(DATE_ANALYTICS_METRICS)).filter(*filters).group_by(day):
+        # SQLite returns the day as an ISO string, other databases as a date
+        row_day = row.day if isinstance(row.day, date) else date.fromisoformat(row.day)
+        totals_by_day[row_day] = {metric: int(getattr(row, metric)) for metric in DATE_ANALYTICS_METRICS}
+    
     by_date = []
     date_range = [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
     
-    for date in date_range:
-        date_analytics = [a for a in analytics if a.date.date() == date]
-        by_date.append({
-            "date": date.isoformat(),
-            "impressions": sum(a.impressions or 0 for a in date_analytics),
-            "reach": sum(a.reach or 0 for a in date_analytics),
-            "engagement": sum(a.engagement or 0 for a in date_analytics),
-            "likes": sum(a.likes or 0 for a in date_analytics),
-            "comments": sum(a.comments or 0 for a in date_analytics),
-            "shares": sum(a.shares or 0 for a in date_analytics),
-            "followers_gained": sum(a.followers_gained or 0 for a in date_analytics)
-        })
+    for current_date in date_range:
+        totals = totals_by_day.get(current_date) or dict.fromkeys(DATE_ANALYTICS_METRICS, 0)
+        by_date.append({"date": current_date.isoformat(), **totals})
     
     return {
         "summary": summary,
@@ -996,6 +1205,47 @@ def get_social_analytics(
         "by_date": by_date
     }
 
+def get_social_daily_metrics(
+    db: Session,
+    user_id: str,
+    start_date: date,
+    end_date: date,
+    account_id: Optional[str] = None,
+    platform: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Get daily post and engagement totals by publication day from the rollup
+    
+    Reads at most one rollup row per account, platform and day, however
+    many posts were published.
+    """
+    query = db.query(
+        models.SocialDailyMetrics.day,
+        func.sum(models.SocialDailyMetrics.posts).label("posts"),
+        *[func.sum(getattr(models.SocialDailyMetrics, metric)).label(metric) for metric in ROLLUP_METRICS]
+    ).filter(
+        models.SocialDailyMetrics.user_id == user_id,
+        models.SocialDailyMetrics.day >= start_date,
+        models.SocialDailyMetrics.day <= end_date
+    )
+    
+    if account_id:
+        query = query.filter(models.SocialDailyMetrics.account_id == account_id)
+    
+    if platform:
+        query = query.filter(models.SocialDailyMetrics.platform == platform)
+    
+    totals_by_day = {
+        row.day: {field: int(getattr(row, field) or 0) for field in ("posts",) + ROLLUP_METRICS}
+        for row in query.group_by(models.SocialDailyMetrics.day)
+    }
+    
+    empty = dict.fromkeys(("posts",) + ROLLUP_METRICS, 0)
+    return [
+        {"date": current_date.isoformat(), **totals_by_day.get(current_date, empty)}
+        for current_date in (start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1))
+    ]
+
 def generate_social_content(db: Session, generation: schemas.ContentGenerationRequest, user_id: str) -> Dict[str, Any]:
     """
     Generate social content using AI
@@ -1013,7 +1263,7 @@ def generate_social_content(db: Session, generation: schemas.ContentGenerationRe
     
     # Generate content using OpenAI
     try:
-        response = openai_client.generate_completion(prompt)
+        response = llm_gateway.generate_completion(prompt, feature="social_content")
         
         # Parse response
         variations = parse_content_generation_response(response, generation.platform, generation.type)
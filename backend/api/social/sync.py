@@ -0,0 +1,149 @@
+import asyncio
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from itertools import chain, zip_longest
+from typing import Dict, List, Optional, Tuple
+import logging
+
+from sqlalchemy import or_, update
+
+from database import SessionLocal
+from config import settings
+from . import models, services
+
+logger = logging.getLogger(__name__)
+
+# One semaphore per platform caps concurrent syncs against its API. The
+# limit is per process: with N API workers running the sync worker, a
+# platform sees up to N * SOCIAL_SYNC_PER_PLATFORM concurrent syncs.
+platform_limits: Dict[str, threading.BoundedSemaphore] = {}
+platform_limits_lock = threading.Lock()
+
+def get_platform_limit(platform: str) -> threading.BoundedSemaphore:
+    with platform_limits_lock:
+        if platform not in platform_limits:
+            platform_limits[platform] = threading.BoundedSemaphore(settings.SOCIAL_SYNC_PER_PLATFORM)
+        return platform_limits[platform]
+
+def list_sync_accounts(user_id: Optional[str] = None, due_only: bool = False, session_factory=SessionLocal) -> List[Tuple[str, str]]:
+    """
+    Return (account_id, platform) of the active accounts to sync
+    
+    Due accounts are claimed in one conditional UPDATE that moves their
+    last_sync_at to now, so workers of other processes running at the same
+    time skip them instead of syncing them twice. An account whose sync
+    fails is retried after the next interval.
+    """
+    db = session_factory()
+    try:
+        if due_only:
+            now = datetime.utcnow()
+            accounts = models.SocialAccount.__table__
+            claim = update(accounts).where(
+                accounts.c.is_active == True,
+                or_(
+                    accounts.c.last_sync_at.is_(None),
+                    accounts.c.last_sync_at <= now - timedelta(seconds=settings.SOCIAL_SYNC_INTERVAL)
+                )
+            )
+            if user_id:
+                claim = claim.where(accounts.c.user_id == user_id)
+            
+            claimed = db.execute(claim.values(last_sync_at=now).returning(accounts.c.id, accounts.c.platform)).all()
+            db.commit()
+            return [(account_id, platform) for account_id, platform in claimed]
+        
+        query = db.query(models.SocialAccount.id, models.SocialAccount.platform).filter(
+            models.SocialAccount.is_active == True
+        )
+        
+        if user_id:
+            query = query.filter(models.SocialAccount.user_id == user_id)
+        
+        return [(account_id, platform) for account_id, platform in query.order_by(models.SocialAccount.last_sync_at)]
+    finally:
+        db.close()
+
+def interleave_platforms(accounts: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """
+    Order accounts round-robin across platforms so workers don't queue behind one platform's limit
+    """
+    by_platform = defaultdict(list)
+    for account in accounts:
+        by_platform[account[1]].append(account)
+    return [account for account in chain.from_iterable(zip_longest(*by_platform.values())) if account]
+
+def sync_account(account_id: str, platform: str, session_factory=SessionLocal) -> None:
+    """
+    Sync one account in its own session, within its platform's concurrency limit
+    """
+    with get_platform_limit(platform):
+        db = session_factory()
+        try:
+            services.sync_social_account(db, account_id)
+        except Exception as e:
+            logger.error(f"Error syncing social account {account_id}: {e}")
+            db.rollback()
+        finally:
+            db.close()
+
+def sync_social_accounts(
+    user_id: Optional[str] = None,
+    due_only: bool = False,
+    session_factory=SessionLocal,
+    max_workers: int = settings.SOCIAL_SYNC_MAX_WORKERS
+) -> int:
+    """
+    Sync a user's accounts, or every due account, concurrently
+    
+    Returns the number of accounts synced.
+    """
+    accounts = interleave_platforms(list_sync_accounts(user_id, due_only, session_factory))
+    if not accounts:
+        return 0
+    
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="social-sync") as executor:
+        list(executor.map(lambda account: sync_account(*account, session_factory=session_factory), accounts))
+    
+    return len(accounts)
+
+class SocialSyncWorker:
+    """
+    Periodically sync every account whose last sync is older than SOCIAL_SYNC_INTERVAL
+    
+    Several processes can run this worker: due accounts are claimed
+    atomically, but the per-platform concurrency limit applies per process.
+    """
+    def __init__(self, session_factory=SessionLocal, interval: int = settings.SOCIAL_SYNC_CHECK_INTERVAL):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.task: Optional[asyncio.Task] = None
+
+    async def run(self) -> None:
+        while True:
+            try:
+                synced = await asyncio.get_running_loop().run_in_executor(
+                    None, lambda: sync_social_accounts(due_only=True, session_factory=self.session_factory)
+                )
+                if synced:
+                    logger.info(f"Synced {synced} due social accounts")
+            except Exception as e:
+                logger.error(f"Social sync worker error: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_event_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+social_sync_worker = SocialSyncWorker()
@@ -1,15 +1,51 @@
 import logging
 import json
 import re
+from collections import Counter
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 
-from ...clients.openai import OpenAIClient
+from config import settings
+from llm import llm_gateway
+from .intent import INTENT_CATEGORIES, intent_classifier
+from .search import InvertedIndex, tokenize
 
 logger = logging.getLogger(__name__)
 
-# Initialize OpenAI client
-openai_client = OpenAIClient()
+# Explicit requests for a human agent and frustration indicators, each escalating on its own
+ESCALATION_PATTERN = re.compile(
+    "|".join([
+        r"human",
+        r"agent",
+        r"person",
+        r"speak to someone",
+        r"talk to someone",
+        r"customer service",
+        r"support team",
+        r"not helpful",
+        r"doesn't work",
+        r"doesn't help",
+        r"useless",
+        r"frustrated",
+        r"annoyed",
+        r"angry"
+    ]),
+    re.IGNORECASE
+)
+
+# Complex technical issues, escalating when two different ones appear
+TECHNICAL_PATTERNS = [
+    r"error code",
+    r"doesn't work",
+    r"broken",
+    r"bug",
+    r"issue with",
+    r"problem with"
+]
+TECHNICAL_PATTERN = re.compile(
+    "|".join(f"(?P<t{i}>{pattern})" for i, pattern in enumerate(TECHNICAL_PATTERNS)),
+    re.IGNORECASE
+)
 
 class Chatbot:
     def __init__(self, kb_articles: Optional[List[Dict[str, Any]]] = None):
@@ -38,6 +74,25 @@ class Chatbot:
         Avoid making up features that don't exist. If unsure, suggest checking the documentation.
         """
 
+    @property
+    def kb_articles(self) -> List[Dict[str, Any]]:
+        return self._kb_articles
+
+    @kb_articles.setter
+    def kb_articles(self, articles: List[Dict[str, Any]]) -> None:
+        # Assigning a new article set invalidates the retrieval index
+        self._kb_articles = articles or []
+        self.kb_index: Optional[InvertedIndex] = None
+
+    def build_kb_index(self) -> InvertedIndex:
+        """
+        Tokenize the knowledge base articles once into an inverted index keyed by position
+        """
+        index = InvertedIndex()
+        for position, article in enumerate(self._kb_articles):
+            index.add(str(position), tokenize(f"{article['title']} {article['content']}"))
+        return index
+
     def generate_response(self, conversation_history: List[Dict[str, str]], query: str) -> str:
         """
         Generate a response based on conversation history and the current query
@@ -76,7 +131,7 @@ class Chatbot:
                 messages.insert(1, context_message)
             
             # Generate response using OpenAI
-            response = openai_client.generate_chat_completion(messages)
+            response = llm_gateway.generate_chat_completion(messages, feature="chatbot")
             
             return response
         
@@ -87,38 +142,51 @@ class Chatbot:
     def find_relevant_articles(self, query: str, threshold: float = 0.7) -> List[Dict[str, Any]]:
         """
         Find knowledge base articles relevant to the query
+        
+        Articles must contain at least `threshold` of the query keywords,
+        exactly or as a prefix of an article term ("track" matches
+        "tracking"), and are ranked by BM25 over the prebuilt index, so a
+        lookup only touches the postings of the query terms.
         """
         if not self.kb_articles:
             return []
         
-        # In a real implementation, this would use embeddings and vector similarity
-        # For now, we'll use a simple keyword matching approach
-        
         # Extract keywords from query
-        keywords = set(re.findall(r'\b\w{3,}\b', query.lower()))
+        keywords = {token for token in tokenize(query) if len(token) >= 3}
         
         if not keywords:
             return []
         
-        # Score articles based on keyword matches
-        scored_articles = []
+        if self.kb_index is None:
+            self.kb_index = self.build_kb_index()
         
-        for article in self.kb_articles:
-            article_text = f"{article['title']} {article['content']}".lower()
-            matches = sum(1 for keyword in keywords if keyword in article_text)
-            score = matches / len(keywords)
-            
-            if score >= threshold:
-                scored_articles.append((article, score))
+        # Count matched keywords per article from the postings of their exact and prefix matches
+        matches = Counter()
+        for keyword in keywords:
+            documents = set()
+            for term, _ in self.kb_index.expand(keyword):
+                documents.update(self.kb_index.postings[term])
+            matches.update(documents)
         
-        # Sort by score and return top 3
-        scored_articles.sort(key=lambda x: x[1], reverse=True)
-        return [article for article, _ in scored_articles[:3]]
+        # Return top 3 of the articles covering enough of the query
+        ranked = self.kb_index.search(
+            list(keywords),
+            limit=3,
+            accept=lambda doc_id: matches[doc_id] / len(keywords) >= threshold
+        )
+        return [self.kb_articles[int(doc_id)] for doc_id, _ in ranked]
 
     def classify_query(self, query: str) -> str:
         """
         Classify the query into a category
+        
+        The local intent classifier answers when it is confident enough;
+        only ambiguous queries fall back to the LLM.
         """
+        category, confidence = intent_classifier.predict(query)
+        if confidence >= settings.INTENT_CONFIDENCE_THRESHOLD:
+            return category
+        
         try:
             # Prepare prompt for classification
             prompt = f"""
@@ -137,69 +205,29 @@ class Chatbot:
             """
             
             # Generate classification using OpenAI
-            classification = openai_client.generate_completion(prompt).strip()
+            classification = llm_gateway.generate_completion(prompt, feature="classify_query", pack=True).strip()
             
             # Validate classification
-            valid_categories = [
-                "general_question", "product_import", "seo_optimization", 
-                "order_tracking", "technical_issue", "billing_question", "feature_request"
-            ]
-            
-            if classification not in valid_categories:
-                return "general_question"
+            if classification not in INTENT_CATEGORIES:
+                return category
             
             return classification
         
         except Exception as e:
             logger.error(f"Error classifying query: {e}")
-            return "general_question"
+            return category
 
     def should_escalate_to_human(self, query: str, conversation_history: List[Dict[str, str]]) -> bool:
         """
         Determine if the conversation should be escalated to a human agent
         """
-        # Check for explicit requests for human agent
-        human_patterns = [
-            r"human",
-            r"agent",
-            r"person",
-            r"speak to someone",
-            r"talk to someone",
-            r"customer service",
-            r"support team"
-        ]
-        
-        for pattern in human_patterns:
-            if re.search(pattern, query, re.IGNORECASE):
-                return True
-        
-        # Check for frustration indicators
-        frustration_patterns = [
-            r"not helpful",
-            r"doesn't work",
-            r"doesn't help",
-            r"useless",
-            r"frustrated",
-            r"annoyed",
-            r"angry"
-        ]
-        
-        for pattern in frustration_patterns:
-            if re.search(pattern, query, re.IGNORECASE):
-                return True
+        # Check for explicit requests for human agent or frustration indicators
+        if ESCALATION_PATTERN.search(query):
+            return True
         
         # Check for complex technical issues
-        technical_patterns = [
-            r"error code",
-            r"doesn't work",
-            r"broken",
-            r"bug",
-            r"issue with",
-            r"problem with"
-        ]
-        
-        technical_matches = sum(1 for pattern in technical_patterns if re.search(pattern, query, re.IGNORECASE))
-        if technical_matches >= 2:
+        technical_matches = {match.lastgroup for match in TECHNICAL_PATTERN.finditer(query)}
+        if len(technical_matches) >= 2:
             return True
         
         # Check for repeated questions (user asking the same thing multiple times)
@@ -244,7 +272,7 @@ class Chatbot:
             """
             
             # Generate suggestions using OpenAI
-            suggestions_text = openai_client.generate_completion(prompt)
+            suggestions_text = llm_gateway.generate_completion(prompt, feature="suggested_replies", pack=True)
             
             # Parse suggestions (one per line)
             suggestions = [line.strip() for line in suggestions_text.strip().split('\n') if line.strip()]
@@ -0,0 +1,168 @@
+"""
+Semantic retrieval for knowledge base articles.
+
+Articles are embedded offline with hashed word and character n-gram
+features (CPU only, no model download) into a float32 matrix saved with
+its article ids in one .npz file. Workers load it and answer queries with
+one matrix-vector product:
+
+    python -m api.support.embeddings
+"""
+import os
+import threading
+import zlib
+from typing import Callable, List, Optional, Tuple
+import logging
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from config import settings
+from . import models
+from .search import tokenize
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_DIM = 512
+NGRAM_SIZES = (3, 4)
+
+# Cosine similarity below which a semantic match is ignored
+MIN_SIMILARITY = 0.2
+
+def text_features(text: str) -> List[str]:
+    """
+    Word tokens plus character n-grams of each word, so inflections and typos still overlap
+    """
+    features = []
+    for token in tokenize(text):
+        features.append(token)
+        padded = f"#{token}#"
+        for size in NGRAM_SIZES:
+            features.extend(padded[i:i + size] for i in range(len(padded) - size + 1))
+    return features
+
+def embed_texts(texts: List[str]) -> np.ndarray:
+    """
+    Embed texts as L2-normalized signed feature-hashing vectors
+    """
+    matrix = np.zeros((len(texts), EMBEDDING_DIM), dtype=np.float32)
+    for row, text in enumerate(texts):
+        hashes = np.array([zlib.crc32(feature.encode()) for feature in text_features(text)], dtype=np.uint32)
+        if not len(hashes):
+            continue
+        signs = np.where(hashes & 0x80000000, -1.0, 1.0).astype(np.float32)
+        np.add.at(matrix[row], hashes % EMBEDDING_DIM, signs)
+    
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+def article_text(title: str, excerpt: Optional[str], content: Optional[str]) -> str:
+    # The title is repeated so short bodies don't drown it
+    return f"{title}\n{title}\n{excerpt or ''}\n{content or ''}"
+
+def build_embeddings(db: Session, path: str = settings.KB_EMBEDDINGS_PATH) -> int:
+    """
+    Embed all published articles and atomically replace the stored embeddings
+    
+    The ids and the matrix are written to one temporary .npz file that
+    replaces the previous one with a single `os.replace`, so readers see
+    either the old or the new build, never a mix.
+    
+    Returns the number of articles embedded.
+    """
+    rows = db.query(
+        models.KnowledgeBaseArticle.id,
+        models.KnowledgeBaseArticle.title,
+        models.KnowledgeBaseArticle.excerpt,
+        models.KnowledgeBaseArticle.content
+    ).filter(models.KnowledgeBaseArticle.is_published == True).order_by(models.KnowledgeBaseArticle.id).all()
+    
+    matrix = embed_texts([article_text(row.title, row.excerpt, row.content) for row in rows])
+    
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(f"{path}.npz.tmp", "wb") as f:
+        np.savez(f, ids=np.array([row.id for row in rows], dtype=str), matrix=matrix)
+    os.replace(f"{path}.npz.tmp", f"{path}.npz")
+    
+    return len(rows)
+
+class KBEmbeddingIndex:
+    """
+    Article embeddings queried with vectorized cosine top-k.
+    
+    The file is reloaded when a new build replaces it; until the first
+    build exists every search returns nothing.
+    """
+    def __init__(self, path: str = settings.KB_EMBEDDINGS_PATH):
+        self.path = path
+        self.matrix: Optional[np.ndarray] = None
+        self.ids: List[str] = []
+        self.loaded_mtime: Optional[float] = None
+        self.lock = threading.Lock()
+
+    def refresh(self) -> None:
+        try:
+            mtime = os.stat(f"{self.path}.npz").st_mtime
+        except OSError:
+            return
+        if mtime == self.loaded_mtime:
+            return
+        
+        with self.lock:
+            if mtime == self.loaded_mtime:
+                return
+            try:
+                with np.load(f"{self.path}.npz") as data:
+                    ids = data["ids"].tolist()
+                    matrix = data["matrix"]
+            except (OSError, ValueError, KeyError) as e:
+                logger.error(f"Failed to load knowledge base embeddings: {e}")
+                return
+            self.matrix, self.ids, self.loaded_mtime = matrix, ids, mtime
+
+    def search(
+        self,
+        query: str,
+        limit: int = 10,
+        accept: Optional[Callable[[str], bool]] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        Return (article_id, cosine similarity) pairs, most similar first
+        """
+        self.refresh()
+        matrix, ids = self.matrix, self.ids
+        if matrix is None or not len(ids):
+            return []
+        
+        query_vector = embed_texts([query])[0]
+        if not query_vector.any():
+            return []
+        
+        scores = matrix @ query_vector
+        candidates = min(len(ids), limit * 4)
+        top = np.argpartition(-scores, candidates - 1)[:candidates]
+        top = top[np.argsort(-scores[top])]
+        
+        results = []
+        for position in top:
+            score = float(scores[position])
+            if score < MIN_SIMILARITY:
+                break
+            if accept is None or accept(ids[position]):
+                results.append((ids[position], score))
+                if len(results) >= limit:
+                    break
+        return results
+
+kb_embedding_index = KBEmbeddingIndex()
+
+if __name__ == "__main__":
+    from database import SessionLocal
+    
+    db = SessionLocal()
+    try:
+        count = build_embeddings(db)
+        print(f"Embedded {count} knowledge base articles into {settings.KB_EMBEDDINGS_PATH}.npz")
+    finally:
+        db.close()
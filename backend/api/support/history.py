@@ -0,0 +1,193 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+import logging
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from config import settings
+from cache import TTLCache
+from llm import llm_gateway, estimate_tokens
+from . import models
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PROMPT = """
+Update the running summary of a support conversation between a DropFlow Pro user and the assistant.
+Keep the user's goals, facts about their store and products, answers already given and open issues.
+Write at most {max_words} words.
+
+Current summary:
+{summary}
+
+New messages:
+{messages}
+
+Updated summary:
+"""
+
+class ConversationHistoryManager:
+    """
+    Build bounded chat histories for chatbot conversations.
+    
+    The last `window` messages are sent verbatim; older ones are folded into
+    a rolling summary stored on the conversation (`summary`, covering the
+    first `summarized_count` messages). Once `fold_batch` extra messages
+    have accumulated a fold is scheduled on a background thread, so no turn
+    waits for the summary request, and the recent messages are trimmed
+    oldest-first to fit `token_budget`. Each turn loads at most
+    `window + fold_batch` messages however long the conversation gets,
+    even while folds are pending or failing.
+    """
+    def __init__(
+        self,
+        window: int = settings.CHATBOT_HISTORY_WINDOW,
+        fold_batch: int = settings.CHATBOT_HISTORY_FOLD_BATCH,
+        token_budget: int = settings.CHATBOT_HISTORY_TOKEN_BUDGET,
+        summary_words: int = 150,
+        retry_after: int = 60,
+        session_factory=SessionLocal
+    ):
+        self.window = window
+        self.fold_batch = fold_batch
+        self.token_budget = token_budget
+        self.summary_words = summary_words
+        self.session_factory = session_factory
+        self.executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="chatbot-fold")
+        self.scheduled = set()
+        self.lock = threading.Lock()
+        # Conversations whose last fold failed are not retried for `retry_after` seconds
+        self.failures = TTLCache("chatbot_fold_failures", ttl=retry_after)
+
+    def build(self, db: Session, conversation: models.ChatbotConversation, system_prompt: str) -> List[Dict[str, str]]:
+        """
+        Build the OpenAI messages for the next assistant turn
+        """
+        summarized = conversation.summarized_count or 0
+        total = db.query(func.count(models.ChatbotMessage.id)).filter(
+            models.ChatbotMessage.conversation_id == conversation.id
+        ).scalar()
+        unsummarized = total - summarized
+        
+        # Only the latest messages not folded into the summary yet are loaded
+        messages = db.query(
+            models.ChatbotMessage.role,
+            models.ChatbotMessage.content
+        ).filter(
+            models.ChatbotMessage.conversation_id == conversation.id
+        ).order_by(
+            models.ChatbotMessage.created_at.desc(), models.ChatbotMessage.id.desc()
+        ).limit(max(0, min(unsummarized, self.window + self.fold_batch))).all()
+        
+        if unsummarized - self.window >= self.fold_batch:
+            self.schedule_fold(conversation.id)
+        
+        history = [{"role": "system", "content": system_prompt}]
+        if conversation.summary:
+            history.append({
+                "role": "system",
+                "content": f"Summary of the earlier conversation:\n{conversation.summary}"
+            })
+        
+        budget = self.token_budget - sum(estimate_tokens(message["content"]) for message in history)
+        recent = []
+        for role, content in messages:
+            cost = estimate_tokens(content)
+            # Always keep the latest message, even if it alone exceeds the budget
+            if recent and cost > budget:
+                break
+            recent.append({"role": role, "content": content})
+            budget -= cost
+        
+        history.extend(reversed(recent))
+        return history
+
+    def schedule_fold(self, conversation_id: str) -> None:
+        """
+        Fold a conversation in the background, unless a fold is already queued or recently failed
+        """
+        with self.lock:
+            if conversation_id in self.scheduled or self.failures.get(conversation_id):
+                return
+            self.scheduled.add(conversation_id)
+        self.executor.submit(self.fold, conversation_id)
+
+    def fold(self, conversation_id: str) -> bool:
+        """
+        Fold the messages beyond the window into the conversation summary
+        
+        Runs with its own session. The summary only advances if
+        `summarized_count` is unchanged since it was read, so concurrent
+        folds of a conversation can't both apply. Returns whether it did.
+        """
+        db = self.session_factory()
+        try:
+            conversation = db.query(
+                models.ChatbotConversation.summary,
+                models.ChatbotConversation.summarized_count
+            ).filter(models.ChatbotConversation.id == conversation_id).first()
+            if conversation is None:
+                return False
+            
+            summarized = conversation.summarized_count or 0
+            total = db.query(func.count(models.ChatbotMessage.id)).filter(
+                models.ChatbotMessage.conversation_id == conversation_id
+            ).scalar()
+            overflow = total - summarized - self.window
+            if overflow < self.fold_batch:
+                return False
+            
+            messages = db.query(
+                models.ChatbotMessage.role,
+                models.ChatbotMessage.content
+            ).filter(
+                models.ChatbotMessage.conversation_id == conversation_id
+            ).order_by(
+                models.ChatbotMessage.created_at, models.ChatbotMessage.id
+            ).offset(summarized).limit(overflow).all()
+            
+            summary = self.summarize(conversation.summary, messages)
+            if summary is None:
+                self.failures.set(conversation_id, True)
+                return False
+            
+            updated = db.query(models.ChatbotConversation).filter(
+                models.ChatbotConversation.id == conversation_id,
+                func.coalesce(models.ChatbotConversation.summarized_count, 0) == summarized
+            ).update({
+                "summary": summary,
+                "summarized_count": summarized + len(messages),
+                "summary_tokens": estimate_tokens(summary)
+            }, synchronize_session=False)
+            db.commit()
+            return bool(updated)
+        
+        except Exception as e:
+            logger.error(f"Error folding chatbot conversation {conversation_id}: {e}")
+            db.rollback()
+            self.failures.set(conversation_id, True)
+            return False
+        finally:
+            db.close()
+            with self.lock:
+                self.scheduled.discard(conversation_id)
+
+    def summarize(self, summary: Optional[str], messages: List) -> Optional[str]:
+        """
+        Fold messages into a summary with the LLM; None if summarization failed
+        """
+        prompt = SUMMARY_PROMPT.format(
+            max_words=self.summary_words,
+            summary=summary or "(none)",
+            messages="\n".join(f"{role}: {content}" for role, content in messages)
+        )
+        
+        try:
+            return llm_gateway.generate_completion(prompt, feature="chatbot_summary").strip()
+        except Exception as e:
+            logger.error(f"Error summarizing chatbot conversation: {e}")
+            return None
+
+history_manager = ConversationHistoryManager()
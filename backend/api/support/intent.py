@@ -0,0 +1,195 @@
+"""
+Local intent classifier for chatbot queries.
+
+Queries are turned into hashed bag-of-words features (words and word
+bigrams) and scored by a multinomial logistic regression trained on the
+labeled examples below. Training takes tens of milliseconds and happens on
+first use; a prediction is a handful of row lookups, so most queries are
+classified in microseconds without calling the LLM.
+"""
+import threading
+import zlib
+from typing import Dict, List, Optional, Tuple
+import logging
+
+import numpy as np
+
+from .search import tokenize
+
+logger = logging.getLogger(__name__)
+
+INTENT_CATEGORIES = [
+    "general_question", "product_import", "seo_optimization",
+    "order_tracking", "technical_issue", "billing_question", "feature_request"
+]
+
+HASH_FEATURES = 4096
+
+TRAINING_EXAMPLES: Dict[str, List[str]] = {
+    "general_question": [
+        "What is dropshipping and how does it work",
+        "How do I get started with DropFlow Pro",
+        "Which products sell best for a new store",
+        "Any tips to grow my ecommerce business",
+        "How do I find winning products",
+        "What marketing strategies work for dropshipping",
+        "Is dropshipping still profitable",
+        "How should I price my products",
+        "Hello, I have a question",
+        "What can this platform do for me",
+    ],
+    "product_import": [
+        "How do I import products from AliExpress",
+        "Import products from BigBuy to my store",
+        "Can I bulk import products from a supplier",
+        "The product import is missing variants and images",
+        "How to add supplier products to my Shopify store",
+        "Import a product from a CSV file",
+        "How do I connect a new supplier",
+        "Sync product catalog from my supplier",
+        "Can I edit product descriptions before importing",
+        "Import product reviews from AliExpress",
+    ],
+    "seo_optimization": [
+        "How do I optimize my product titles for SEO",
+        "Improve my store ranking on Google",
+        "Generate meta descriptions for my products",
+        "How does the AI SEO optimization work",
+        "Which keywords should I use for my products",
+        "Optimize product descriptions for search engines",
+        "My products don't show up in Google search",
+        "How to write SEO friendly product pages",
+        "Add alt text and keywords to product images",
+        "Improve organic traffic to my store",
+    ],
+    "order_tracking": [
+        "Where is my customer's order",
+        "How do I track an order",
+        "The tracking number is not updating",
+        "My customer has not received the package",
+        "When will the order be delivered",
+        "Shipping status shows in transit for weeks",
+        "How do I add tracking information to orders",
+        "The carrier lost the shipment",
+        "Check delivery status of my orders",
+        "Customer asks where their parcel is",
+    ],
+    "technical_issue": [
+        "The app keeps crashing when I open the dashboard",
+        "I get an error code when syncing my store",
+        "The page won't load",
+        "Login is broken I can't sign in",
+        "There is a bug in the analytics page",
+        "The integration with Shopify stopped working",
+        "I see a 500 error when saving",
+        "The button does nothing when I click it",
+        "Store sync fails with a timeout error",
+        "My API key is not working",
+    ],
+    "billing_question": [
+        "How much does the pro plan cost",
+        "I was charged twice this month",
+        "How do I cancel my subscription",
+        "Can I get a refund",
+        "Update my credit card payment method",
+        "Where can I download my invoices",
+        "How do I upgrade my plan",
+        "Do you offer a free trial",
+        "Why did my payment fail",
+        "Change my billing address",
+    ],
+    "feature_request": [
+        "It would be great if you added support for eBay",
+        "Please add a dark mode",
+        "Can you add an integration with WooCommerce",
+        "I would like a feature to schedule price changes",
+        "Could you support more suppliers in the future",
+        "Feature request: export reports to Excel",
+        "Will you add multi-language stores",
+        "I wish the dashboard had custom widgets",
+        "Suggestion: let me bulk edit prices",
+        "Are you planning to add a mobile app",
+    ],
+}
+
+def query_features(text: str) -> List[int]:
+    """
+    Hashed indices of the words and word bigrams in the text
+    """
+    tokens = tokenize(text)
+    terms = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    return sorted({zlib.crc32(term.encode()) % HASH_FEATURES for term in terms})
+
+class IntentClassifier:
+    """
+    Multinomial logistic regression over hashed bag-of-words features.
+    """
+    def __init__(
+        self,
+        examples: Dict[str, List[str]] = TRAINING_EXAMPLES,
+        epochs: int = 300,
+        learning_rate: float = 0.5,
+        l2: float = 1e-3
+    ):
+        self.examples = examples
+        self.epochs = epochs
+        self.learning_rate = learning_rate
+        self.l2 = l2
+        self.categories = list(examples)
+        # (weights, bias), published in one assignment so readers never see half a model
+        self.model: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self.lock = threading.Lock()
+
+    def train(self) -> None:
+        texts = [text for category in self.categories for text in self.examples[category]]
+        labels = np.array([i for i, category in enumerate(self.categories) for _ in self.examples[category]])
+        rows = [query_features(text) for text in texts]
+        
+        # Train on the hash buckets the examples actually use, then scatter back
+        used = sorted({index for row in rows for index in row})
+        column = {index: position for position, index in enumerate(used)}
+        features = np.zeros((len(texts), len(used)), dtype=np.float32)
+        for row, indices in enumerate(rows):
+            features[row, [column[index] for index in indices]] = 1.0
+        targets = np.eye(len(self.categories), dtype=np.float32)[labels]
+        
+        compact = np.zeros((len(used), len(self.categories)), dtype=np.float32)
+        bias = np.zeros(len(self.categories), dtype=np.float32)
+        for _ in range(self.epochs):
+            probabilities = softmax(features @ compact + bias)
+            error = (probabilities - targets) / len(texts)
+            compact -= self.learning_rate * (features.T @ error + self.l2 * compact)
+            bias -= self.learning_rate * error.sum(axis=0)
+        
+        weights = np.zeros((HASH_FEATURES, len(self.categories)), dtype=np.float32)
+        weights[used] = compact
+        weights.setflags(write=False)
+        bias.setflags(write=False)
+        self.model = (weights, bias)
+        logger.info(f"Intent classifier trained on {len(texts)} examples")
+
+    def ensure_trained(self) -> None:
+        if self.model is None:
+            with self.lock:
+                if self.model is None:
+                    self.train()
+
+    def predict(self, query: str) -> Tuple[str, float]:
+        """
+        Return the most likely category and its probability
+        """
+        self.ensure_trained()
+        weights, bias = self.model
+        indices = query_features(query)
+        if not indices:
+            return "general_question", 0.0
+        
+        probabilities = softmax(weights[indices].sum(axis=0) + bias)
+        best = int(probabilities.argmax())
+        return self.categories[best], float(probabilities[best])
+
+def softmax(scores: np.ndarray) -> np.ndarray:
+    exp = np.exp(scores - scores.max(axis=-1, keepdims=True))
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+intent_classifier = IntentClassifier()
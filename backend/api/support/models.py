@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Float, DateTime, ForeignKey, Boolean, Text, JSON, Enum
+from sqlalchemy import Column, String, Integer, Float, DateTime, ForeignKey, Boolean, Text, JSON, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
@@ -85,6 +85,30 @@ class TicketAttachment(Base):
     message = relationship("TicketMessage", back_populates="attachments")
     user = relationship("User")
 
+class TicketNotification(Base):
+    __tablename__ = "ticket_notifications"
+    
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    ticket_id = Column(String, ForeignKey("support_tickets.id", ondelete="CASCADE"), index=True)
+    message_id = Column(String, ForeignKey("ticket_messages.id", ondelete="SET NULL"), nullable=True)
+    event = Column(String, nullable=False)  # new_ticket, new_message, ticket_resolved
+    status = Column(String, nullable=False, default="pending")  # pending, sending, sent, coalesced, failed
+    attempts = Column(Integer, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=True)  # End of the digest window, then retry schedule
+    claimed_at = Column(DateTime(timezone=True), nullable=True)  # When the dispatcher moved it to "sending"
+    customer_sent_at = Column(DateTime(timezone=True), nullable=True)  # Customer email delivered, not resent on retry
+    admin_sent_at = Column(DateTime(timezone=True), nullable=True)  # Support team email delivered (new_ticket only)
+    error_message = Column(Text, nullable=True)
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Relationships
+    ticket = relationship("SupportTicket")
+    
+    __table_args__ = (
+        Index("ix_ticket_notifications_status_next_attempt", "status", "next_attempt_at"),
+    )
+
 class KnowledgeBaseCategory(Base):
     __tablename__ = "kb_categories"
     
@@ -132,6 +156,9 @@ class ChatbotConversation(Base):
     user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=True)
     session_id = Column(String, nullable=False)
     title = Column(String, nullable=True)
+    summary = Column(Text, nullable=True)  # Rolling summary of the messages older than the history window
+    summarized_count = Column(Integer, default=0)  # Number of leading messages folded into the summary
+    summary_tokens = Column(Integer, nullable=True)
     metadata = Column(JSON, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
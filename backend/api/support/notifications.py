@@ -0,0 +1,361 @@
+import asyncio
+import logging
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from config import settings
+from mailer import SMTPBatchSender
+from . import models
+from ..auth.models import User
+
+logger = logging.getLogger(__name__)
+
+# (notification group, to the support team, recipient, subject, content)
+TicketEmail = Tuple[List[models.TicketNotification], bool, str, str, str]
+
+# Retry schedule: 30s, 1m, 2m, 4m... capped at one hour
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 3600
+
+# Events whose notifications are coalesced per ticket within the digest window
+DIGEST_EVENTS = {"new_message"}
+
+def queue_ticket_notification(db: Session, ticket_id: str, event: str, message_id: Optional[str] = None) -> models.TicketNotification:
+    """
+    Add a pending ticket notification to the outbox (the caller commits)
+    
+    Replies wait for the digest window so the ones that follow on the same
+    ticket go out in the same email.
+    """
+    next_attempt_at = None
+    if event in DIGEST_EVENTS and settings.TICKET_NOTIFICATION_DIGEST_WINDOW > 0:
+        next_attempt_at = datetime.utcnow() + timedelta(seconds=settings.TICKET_NOTIFICATION_DIGEST_WINDOW)
+    
+    notification = models.TicketNotification(
+        id=str(uuid.uuid4()),
+        ticket_id=ticket_id,
+        message_id=message_id,
+        event=event,
+        status="pending",
+        attempts=0,
+        next_attempt_at=next_attempt_at
+    )
+    
+    db.add(notification)
+    
+    return notification
+
+def render_ticket_email(
+    event: str,
+    ticket: models.SupportTicket,
+    user: User,
+    messages: List[models.TicketMessage],
+    admin: bool = False
+) -> Tuple[str, str]:
+    """
+    Return the subject and text content of a ticket email
+    """
+    if event == "new_ticket":
+        if admin:
+            return (
+                f"New Support Ticket: {ticket.reference_number}",
+                f"{user.full_name or user.email} opened ticket {ticket.reference_number}: {ticket.subject}\n\n{ticket.description}"
+            )
+        return (
+            f"Support Ticket Created: {ticket.reference_number}",
+            f"Hi {user.full_name or ''},\n\nWe received your ticket \"{ticket.subject}\" and will get back to you soon.\n"
+            f"Reference: {ticket.reference_number}"
+        )
+    
+    if event == "ticket_resolved":
+        return (
+            f"Ticket Resolved: {ticket.reference_number}",
+            f"Hi {user.full_name or ''},\n\nYour ticket \"{ticket.subject}\" has been resolved.\n"
+            f"Reference: {ticket.reference_number}"
+        )
+    
+    # new_message, possibly a digest of several replies
+    subject = f"New Message on Ticket: {ticket.reference_number}"
+    if len(messages) > 1:
+        subject = f"{len(messages)} New Messages on Ticket: {ticket.reference_number}"
+    body = "\n\n---\n\n".join(message.message for message in messages)
+    return (
+        subject,
+        f"Hi {user.full_name or ''},\n\nThere is new activity on your ticket \"{ticket.subject}\":\n\n{body}\n\n"
+        f"Reference: {ticket.reference_number}"
+    )
+
+class TicketNotificationDispatcher:
+    """
+    Deliver queued support ticket notifications outside the request path.
+    
+    Ticket services write `TicketNotification` rows (the outbox) in the
+    transaction of the ticket change; this worker claims due rows in
+    batches, merges the pending replies of a ticket into one digest email,
+    sends everything over one reused SMTP connection and reschedules
+    failures with exponential backoff. A claim is a lease: rows still
+    "sending" after NOTIFICATION_CLAIM_TIMEOUT are picked up again. The
+    customer and support team emails are tracked separately, so a retry
+    only resends the one that failed.
+    """
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        batch_size: int = settings.NOTIFICATION_BATCH_SIZE,
+        max_attempts: int = settings.NOTIFICATION_MAX_ATTEMPTS,
+        interval: int = settings.NOTIFICATION_DISPATCH_INTERVAL
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.interval = interval
+        self.task: Optional[asyncio.Task] = None
+
+    def claim_batch(self, db: Session) -> List[models.TicketNotification]:
+        """
+        Claim due pending notifications, plus the not yet due replies of the same tickets
+        
+        Notifications left in "sending" longer than the claim timeout, by a
+        dispatcher that crashed or was stopped mid-batch, are claimed again.
+        """
+        now = datetime.utcnow()
+        stale_before = now - timedelta(seconds=settings.NOTIFICATION_CLAIM_TIMEOUT)
+        notifications = db.query(models.TicketNotification).filter(
+            or_(
+                and_(
+                    models.TicketNotification.status == "pending",
+                    or_(
+                        models.TicketNotification.next_attempt_at.is_(None),
+                        models.TicketNotification.next_attempt_at <= now
+                    )
+                ),
+                and_(
+                    models.TicketNotification.status == "sending",
+                    or_(
+                        models.TicketNotification.claimed_at.is_(None),
+                        models.TicketNotification.claimed_at <= stale_before
+                    )
+                )
+            )
+        ).order_by(
+            models.TicketNotification.created_at
+        ).limit(self.batch_size).with_for_update(skip_locked=True).all()
+        
+        if not notifications:
+            return []
+        
+        digest_tickets = {n.ticket_id for n in notifications if n.event in DIGEST_EVENTS}
+        if digest_tickets:
+            claimed = {n.id for n in notifications}
+            notifications += [
+                n for n in db.query(models.TicketNotification).filter(
+                    models.TicketNotification.status == "pending",
+                    models.TicketNotification.event.in_(DIGEST_EVENTS),
+                    models.TicketNotification.ticket_id.in_(digest_tickets)
+                ).with_for_update(skip_locked=True)
+                if n.id not in claimed
+            ]
+        
+        for notification in notifications:
+            if notification.status == "sending":
+                logger.warning(f"Reclaiming ticket notification {notification.id} left in sending since {notification.claimed_at}")
+            notification.status = "sending"
+            notification.claimed_at = now
+        db.commit()
+        
+        # Reload the claimed rows expired by the commit with one query
+        ids = [notification.id for notification in notifications]
+        return db.query(models.TicketNotification).filter(models.TicketNotification.id.in_(ids)).all()
+
+    def load_context(
+        self, db: Session, notifications: List[models.TicketNotification]
+    ) -> Tuple[Dict[str, models.SupportTicket], Dict[str, User], Dict[str, models.TicketMessage]]:
+        """
+        Load the tickets, users and messages of a batch with one query each
+        """
+        ticket_ids = {n.ticket_id for n in notifications}
+        tickets = {
+            t.id: t for t in db.query(models.SupportTicket).filter(models.SupportTicket.id.in_(ticket_ids))
+        }
+        user_ids = {t.user_id for t in tickets.values()}
+        users = {
+            u.id: u for u in db.query(User).filter(User.id.in_(user_ids))
+        } if user_ids else {}
+        message_ids = {n.message_id for n in notifications if n.message_id}
+        messages = {
+            m.id: m for m in db.query(models.TicketMessage).filter(models.TicketMessage.id.in_(message_ids))
+        } if message_ids else {}
+        return tickets, users, messages
+
+    def group(self, notifications: List[models.TicketNotification]) -> List[List[models.TicketNotification]]:
+        """
+        Group notifications into emails: one per digest event and ticket, one per other notification
+        """
+        digests: Dict[Tuple[str, str], List[models.TicketNotification]] = defaultdict(list)
+        groups = []
+        for notification in sorted(notifications, key=lambda n: n.created_at):
+            if notification.event in DIGEST_EVENTS:
+                digests[(notification.ticket_id, notification.event)].append(notification)
+            else:
+                groups.append([notification])
+        return groups + list(digests.values())
+
+    def prepare_batch(
+        self, db: Session
+    ) -> Tuple[List[models.TicketNotification], List[List[models.TicketNotification]], List[TicketEmail]]:
+        """
+        Claim a batch and render its emails, returning the notifications, their groups and the emails to send
+        
+        Recipients a notification was already delivered to are skipped. This
+        only does blocking database work and runs in a worker thread.
+        """
+        notifications = self.claim_batch(db)
+        if not notifications:
+            return [], [], []
+        
+        tickets, users, messages = self.load_context(db, notifications)
+        
+        groups = []
+        emails = []
+        for group in self.group(notifications):
+            first = group[0]
+            ticket = tickets.get(first.ticket_id)
+            user = users.get(ticket.user_id) if ticket else None
+            if not ticket or not user:
+                for notification in group:
+                    self.mark_failed(notification, f"Ticket or user not found: {first.ticket_id}", final=True)
+                continue
+            
+            groups.append(group)
+            group_messages = sorted(
+                (messages[n.message_id] for n in group if n.message_id in messages),
+                key=lambda m: m.created_at
+            )
+            if any(n.customer_sent_at is None for n in group):
+                emails.append((group, False, user.email, *render_ticket_email(first.event, ticket, user, group_messages)))
+            if first.event == "new_ticket" and first.admin_sent_at is None:
+                emails.append((group, True, settings.SUPPORT_TEAM_EMAIL, *render_ticket_email(first.event, ticket, user, group_messages, admin=True)))
+        
+        return notifications, groups, emails
+
+    async def dispatch_once(self) -> int:
+        """
+        Deliver one batch of due notifications and return its size
+        
+        Database work runs in the default executor so the event loop only
+        waits on the SMTP sends.
+        """
+        loop = asyncio.get_running_loop()
+        db = self.session_factory()
+        try:
+            notifications, groups, emails = await loop.run_in_executor(None, self.prepare_batch, db)
+            if not notifications:
+                return 0
+            
+            await self.send_emails(groups, emails)
+            
+            await loop.run_in_executor(None, db.commit)
+            return len(notifications)
+        
+        except Exception as e:
+            logger.error(f"Error dispatching ticket notifications: {e}")
+            await loop.run_in_executor(None, db.rollback)
+            return 0
+        finally:
+            await loop.run_in_executor(None, db.close)
+
+    async def send_emails(self, groups: List[List[models.TicketNotification]], emails: List[TicketEmail]) -> None:
+        """
+        Send a batch of emails over one SMTP connection in a worker thread
+        """
+        errors: List[Optional[str]] = []
+        if emails:
+            def send_batch() -> List[Optional[str]]:
+                with SMTPBatchSender() as sender:
+                    return sender.send_many([(recipient, subject, content) for _, _, recipient, subject, content in emails])
+            
+            try:
+                errors = await asyncio.get_running_loop().run_in_executor(None, send_batch)
+            except Exception as e:
+                errors = [str(e)] * len(emails)
+        
+        # Record each delivered email, so a retry only resends the failed ones
+        failures: Dict[int, str] = {}
+        now = datetime.utcnow()
+        for (group, admin, _, _, _), error in zip(emails, errors):
+            if error:
+                failures.setdefault(id(group), error)
+                continue
+            for notification in group:
+                if admin:
+                    notification.admin_sent_at = now
+                else:
+                    notification.customer_sent_at = now
+        
+        # A group succeeds once all of its emails went out
+        for group in groups:
+            error = failures.get(id(group))
+            for position, notification in enumerate(group):
+                if error:
+                    self.mark_failed(notification, error)
+                else:
+                    self.mark_sent(notification, coalesced=position > 0)
+
+    def mark_sent(self, notification: models.TicketNotification, coalesced: bool = False) -> None:
+        notification.status = "coalesced" if coalesced else "sent"
+        notification.sent_at = datetime.utcnow()
+        notification.error_message = None
+
+    def mark_failed(self, notification: models.TicketNotification, error: str, final: bool = False) -> None:
+        """
+        Record a delivery failure and schedule a retry with exponential backoff
+        """
+        notification.attempts = (notification.attempts or 0) + 1
+        notification.error_message = error
+        
+        if final or notification.attempts >= self.max_attempts:
+            notification.status = "failed"
+            notification.next_attempt_at = None
+            logger.error(f"Ticket notification {notification.id} failed permanently: {error}")
+        else:
+            delay = min(RETRY_BASE_SECONDS * 2 ** (notification.attempts - 1), RETRY_MAX_SECONDS)
+            notification.status = "pending"
+            notification.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
+            logger.warning(f"Ticket notification {notification.id} failed, retrying in {delay}s: {error}")
+
+    async def run(self) -> None:
+        """
+        Dispatch batches until cancelled, sleeping only when the outbox is empty
+        """
+        while True:
+            try:
+                processed = await self.dispatch_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Ticket notification dispatcher error: {e}")
+                processed = 0
+            
+            if processed < self.batch_size:
+                await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_event_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+ticket_notification_dispatcher = TicketNotificationDispatcher()
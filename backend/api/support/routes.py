@@ -1,5 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query, status, UploadFile, File, Form
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, status, UploadFile, File, Form
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
 from datetime import datetime
@@ -37,24 +37,14 @@ async def get_support_tickets(
 @router.post("/tickets", response_model=schemas.SupportTicketResponse)
 async def create_support_ticket(
     ticket: schemas.SupportTicketCreate,
-    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
     Create a new support ticket
     """
-    db_ticket = services.create_support_ticket(db, ticket=ticket, user_id=current_user.id)
-    
-    # Send notification in background
-    background_tasks.add_task(
-        services.send_ticket_notification,
-        db=db,
-        ticket_id=db_ticket.id,
-        notification_type="new_ticket"
-    )
-    
-    return db_ticket
+    # The ticket and its notification are committed together
+    return services.create_support_ticket(db, ticket=ticket, user_id=current_user.id)
 
 @router.get("/tickets/{ticket_id}", response_model=schemas.SupportTicketDetailResponse)
 async def get_support_ticket(
@@ -75,7 +65,6 @@ async def get_support_ticket(
 async def update_support_ticket(
     ticket_id: str,
     ticket: schemas.SupportTicketUpdate,
-    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -86,24 +75,13 @@ async def update_support_ticket(
     if not db_ticket:
         raise HTTPException(status_code=404, detail="Support ticket not found")
     
-    updated_ticket = services.update_support_ticket(db, ticket_id=ticket_id, ticket=ticket)
-    
-    # If status changed to resolved, send notification
-    if ticket.status == "resolved" and db_ticket.status != "resolved":
-        background_tasks.add_task(
-            services.send_ticket_notification,
-            db=db,
-            ticket_id=ticket_id,
-            notification_type="ticket_resolved"
-        )
-    
-    return updated_ticket
+    # Resolving the ticket queues its notification in the same commit
+    return services.update_support_ticket(db, ticket_id=ticket_id, ticket=ticket)
 
 @router.post("/tickets/{ticket_id}/messages", response_model=schemas.TicketMessageResponse)
 async def create_ticket_message(
     ticket_id: str,
     message: schemas.TicketMessageCreate,
-    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -114,18 +92,8 @@ async def create_ticket_message(
     if not ticket:
         raise HTTPException(status_code=404, detail="Support ticket not found")
     
-    db_message = services.create_ticket_message(db, ticket_id=ticket_id, message=message, user_id=current_user.id)
-    
-    # Send notification in background
-    background_tasks.add_task(
-        services.send_ticket_notification,
-        db=db,
-        ticket_id=ticket_id,
-        notification_type="new_message",
-        message_id=db_message.id
-    )
-    
-    return db_message
+    # The message and its notification are committed together
+    return services.create_ticket_message(db, ticket_id=ticket_id, message=message, user_id=current_user.id)
 
 @router.post("/tickets/{ticket_id}/attachments", response_model=schemas.TicketAttachmentResponse)
 async def upload_ticket_attachment(
@@ -319,6 +287,36 @@ async def create_chatbot_message(
     
     return assistant_message
 
+@router.post("/chatbot/conversations/{conversation_id}/messages/stream")
+async def stream_chatbot_message(
+    conversation_id: str,
+    message: schemas.ChatbotMessageCreate,
+    current_user: Optional[User] = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Add a message to a chatbot conversation and stream the assistant response (server-sent events)
+    """
+    user_id = current_user.id if current_user else None
+    
+    conversation = services.get_chatbot_conversation(db, conversation_id=conversation_id, user_id=user_id)
+    if not conversation:
+        raise HTTPException(status_code=404, detail="Chatbot conversation not found")
+    
+    # Create user message
+    services.create_chatbot_message(
+        db, 
+        conversation_id=conversation_id,
+        role="user",
+        content=message.content
+    )
+    
+    return StreamingResponse(
+        services.stream_chatbot_response(db, conversation_id=conversation_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.post("/chatbot/query", response_model=schemas.ChatbotQueryResponse)
 async def query_chatbot(
     query: schemas.ChatbotQueryRequest,
@@ -328,4 +326,18 @@ async def query_chatbot(
     """
     Query the chatbot without creating a conversation
     """
-    return services.query_chatbot(db, query=query.query, user_id=current_user.id if current_user else None)
\ No newline at end of file
+    return services.query_chatbot(db, query=query.query, user_id=current_user.id if current_user else None)
+
+@router.post("/chatbot/query/stream")
+async def stream_chatbot_query(
+    query: schemas.ChatbotQueryRequest,
+    current_user: Optional[User] = Depends(get_current_user)
+):
+    """
+    Query the chatbot without creating a conversation and stream the answer (server-sent events)
+    """
+    return StreamingResponse(
+        services.stream_chatbot_query(query.query),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
\ No newline at end of file
@@ -0,0 +1,310 @@
+import bisect
+import heapq
+import math
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from config import settings
+from . import models
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Title and tag matches weigh this many times a body match
+TITLE_WEIGHT = 3
+
+# Query terms of at least this length also match longer terms they start
+# with ("ship" finds "shipping"), scored at PREFIX_WEIGHT of an exact match
+PREFIX_MIN_LENGTH = 3
+PREFIX_WEIGHT = 0.6
+PREFIX_MAX_EXPANSIONS = 50
+
+# Article columns that affect the search index
+INDEXED_FIELDS = ("title", "content", "excerpt", "slug", "tags", "category_id", "is_published")
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercase, strip accents and split text into search terms
+    """
+    folded = unicodedata.normalize("NFKD", text.lower())
+    folded = "".join(c for c in folded if not unicodedata.combining(c))
+    return [token for token in TOKEN_PATTERN.findall(folded) if len(token) > 1]
+
+class InvertedIndex:
+    """
+    In-memory inverted index ranking documents with BM25.
+    
+    The vocabulary is also kept sorted so query terms can be expanded to
+    the indexed terms they are a prefix of. Not thread-safe on its own;
+    owners serialize writes.
+    """
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.terms: List[str] = []
+        self.lengths: Dict[str, int] = {}
+        self.doc_terms: Dict[str, List[str]] = {}
+        self.total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    def add(self, doc_id: str, tokens: List[str]) -> None:
+        self.remove(doc_id)
+        counts = Counter(tokens)
+        for term, tf in counts.items():
+            if term not in self.postings:
+                self.postings[term] = {}
+                bisect.insort(self.terms, term)
+            self.postings[term][doc_id] = tf
+        self.doc_terms[doc_id] = list(counts)
+        self.lengths[doc_id] = len(tokens)
+        self.total_length += len(tokens)
+
+    def remove(self, doc_id: str) -> None:
+        terms = self.doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            posting = self.postings[term]
+            del posting[doc_id]
+            if not posting:
+                del self.postings[term]
+                del self.terms[bisect.bisect_left(self.terms, term)]
+        self.total_length -= self.lengths.pop(doc_id)
+
+    def search(
+        self,
+        tokens: List[str],
+        limit: Optional[int] = None,
+        accept: Optional[Callable[[str], bool]] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        Return (doc_id, score) pairs by descending BM25 score
+        """
+        count = len(self.lengths)
+        if not count:
+            return []
+        
+        average_length = self.total_length / count or 1
+        scores: Dict[str, float] = defaultdict(float)
+        for token in set(tokens):
+            # Each query term adds its best exact or prefix match per document
+            best: Dict[str, float] = {}
+            for term, weight in self.expand(token):
+                posting = self.postings[term]
+                idf = math.log(1 + (count - len(posting) + 0.5) / (len(posting) + 0.5))
+                for doc_id, tf in posting.items():
+                    norm = self.k1 * (1 - self.b + self.b * self.lengths[doc_id] / average_length)
+                    score = weight * idf * tf * (self.k1 + 1) / (tf + norm)
+                    if score > best.get(doc_id, 0.0):
+                        best[doc_id] = score
+            for doc_id, score in best.items():
+                scores[doc_id] += score
+        
+        ranked = [(doc_id, score) for doc_id, score in scores.items() if accept is None or accept(doc_id)]
+        if limit is not None:
+            return heapq.nlargest(limit, ranked, key=lambda item: item[1])
+        return sorted(ranked, key=lambda item: item[1], reverse=True)
+
+    def expand(self, token: str) -> List[Tuple[str, float]]:
+        """
+        Indexed terms matching a query term with their weight: the term itself, then longer terms it prefixes
+        """
+        matches = [(token, 1.0)] if token in self.postings else []
+        if len(token) >= PREFIX_MIN_LENGTH:
+            start = bisect.bisect_right(self.terms, token)
+            for term in self.terms[start:start + PREFIX_MAX_EXPANSIONS]:
+                if not term.startswith(token):
+                    break
+                matches.append((term, PREFIX_WEIGHT))
+        return matches
+
+def article_tokens(title: str, content: Optional[str], excerpt: Optional[str], tags: Optional[List[str]]) -> List[str]:
+    return (
+        tokenize(title) * TITLE_WEIGHT
+        + tokenize(" ".join(tags or [])) * TITLE_WEIGHT
+        + tokenize(excerpt or "")
+        + tokenize(content or "")
+    )
+
+class KBSearchIndex:
+    """
+    Full-text index of published knowledge base articles.
+    
+    Built from the database on first use and kept current by the session
+    hooks below as articles are created, edited, published or deleted in
+    this process. Once older than `max_age` seconds it is rebuilt in a
+    background thread, so edits made by other workers show up too while
+    requests keep searching the current index.
+    """
+    def __init__(self, max_age: int = settings.KB_INDEX_MAX_AGE, session_factory=SessionLocal):
+        self.max_age = max_age
+        self.session_factory = session_factory
+        self.index = InvertedIndex()
+        self.articles: Dict[str, Dict[str, Any]] = {}
+        self.built_at: Optional[float] = None
+        self.rebuilding = False
+        self.lock = threading.RLock()
+
+    @property
+    def built(self) -> bool:
+        return self.built_at is not None
+
+    def ensure_built(self, db: Session) -> None:
+        """
+        Build the index on first use, and start a background rebuild once it is stale
+        """
+        if self.built_at is None:
+            self.rebuild(db)
+        elif time.monotonic() - self.built_at > self.max_age:
+            with self.lock:
+                if self.rebuilding:
+                    return
+                self.rebuilding = True
+            threading.Thread(target=self.rebuild_in_background, name="kb-index-rebuild", daemon=True).start()
+
+    def rebuild_in_background(self) -> None:
+        db = self.session_factory()
+        try:
+            self.rebuild(db)
+        except Exception as e:
+            logger.error(f"Error rebuilding the knowledge base search index: {e}")
+        finally:
+            db.close()
+            with self.lock:
+                self.rebuilding = False
+
+    def rebuild(self, db: Session) -> None:
+        rows = db.query(
+            models.KnowledgeBaseArticle.id,
+            models.KnowledgeBaseArticle.title,
+            models.KnowledgeBaseArticle.content,
+            models.KnowledgeBaseArticle.excerpt,
+            models.KnowledgeBaseArticle.slug,
+            models.KnowledgeBaseArticle.tags,
+            models.KnowledgeBaseArticle.category_id
+        ).filter(models.KnowledgeBaseArticle.is_published == True).all()
+        
+        index = InvertedIndex()
+        articles = {}
+        for row in rows:
+            index.add(row.id, article_tokens(row.title, row.content, row.excerpt, row.tags))
+            articles[row.id] = self.summarize(row._asdict())
+        
+        with self.lock:
+            self.index = index
+            self.articles = articles
+            self.built_at = time.monotonic()
+        logger.info(f"Knowledge base search index built with {len(articles)} articles")
+
+    def summarize(self, article: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "id": article["id"],
+            "title": article["title"],
+            "excerpt": article["excerpt"] or article["content"][:100] + "...",
+            "url": f"/kb/articles/{article['slug']}",
+            "category_id": article["category_id"],
+            "tags": article["tags"] or []
+        }
+
+    def upsert(self, article: Dict[str, Any]) -> None:
+        """
+        Index an article snapshot, or drop it if it is no longer published
+        """
+        if not article["is_published"]:
+            self.remove(article["id"])
+            return
+        
+        tokens = article_tokens(article["title"], article["content"], article["excerpt"], article["tags"])
+        with self.lock:
+            self.index.add(article["id"], tokens)
+            self.articles[article["id"]] = self.summarize(article)
+
+    def remove(self, article_id: str) -> None:
+        with self.lock:
+            self.index.remove(article_id)
+            self.articles.pop(article_id, None)
+
+    def search(
+        self,
+        db: Session,
+        query: str,
+        limit: int = 10,
+        offset: int = 0,
+        category_id: Optional[str] = None,
+        tag: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Return article summaries matching the query, most relevant first
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        
+        self.ensure_built(db)
+
+        def accept(article_id: str) -> bool:
+            article = self.articles[article_id]
+            if category_id and article["category_id"] != category_id:
+                return False
+            return not tag or tag in article["tags"]
+        
+        with self.lock:
+            ranked = self.index.search(tokens, limit=offset + limit, accept=accept)
+            return [self.articles[article_id] for article_id, _ in ranked[offset:]]
+
+kb_search_index = KBSearchIndex()
+
+def collect_kb_changes(session: Session, flush_context) -> None:
+    """
+    Snapshot knowledge base articles changed in this flush for the search index
+    
+    Snapshots are applied after commit (and dropped on rollback), so the
+    index never sees uncommitted edits.
+    """
+    if not kb_search_index.built:
+        return
+    
+    changes = session.info.setdefault("kb_index_changes", {})
+    for obj in session.new:
+        if isinstance(obj, models.KnowledgeBaseArticle):
+            changes[obj.id] = {field: getattr(obj, field) for field in ("id",) + INDEXED_FIELDS}
+    
+    for obj in session.dirty:
+        if isinstance(obj, models.KnowledgeBaseArticle):
+            state = inspect(obj)
+            if any(state.attrs[field].history.has_changes() for field in INDEXED_FIELDS):
+                changes[obj.id] = {field: getattr(obj, field) for field in ("id",) + INDEXED_FIELDS}
+    
+    for obj in session.deleted:
+        if isinstance(obj, models.KnowledgeBaseArticle):
+            changes[obj.id] = None
+
+def apply_kb_changes(session: Session) -> None:
+    changes = session.info.pop("kb_index_changes", None)
+    if not changes:
+        return
+    for article_id, article in changes.items():
+        if article is None:
+            kb_search_index.remove(article_id)
+        else:
+            kb_search_index.upsert(article)
+
+def discard_kb_changes(session: Session) -> None:
+    session.info.pop("kb_index_changes", None)
+
+event.listen(Session, "after_flush", collect_kb_changes)
+event.listen(Session, "after_commit", apply_kb_changes)
+event.listen(Session, "after_rollback", discard_kb_changes)
@@ -1,6 +1,6 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import func, desc, asc
-from typing import List, Optional, Dict, Any, BinaryIO
+from typing import List, Optional, Dict, Any, BinaryIO, Iterator
 from datetime import datetime, timedelta
 import uuid
 import logging
@@ -10,20 +10,33 @@ import string
 import os
 import io
 import re
+from concurrent.futures import ThreadPoolExecutor
 
+from database import SessionLocal
+from llm import llm_gateway
 from . import models, schemas
+from .search import kb_search_index
+from .embeddings import kb_embedding_index
+from .history import history_manager
+from .notifications import queue_ticket_notification
 from ..auth.models import User
-from ...clients.openai import OpenAIClient
-from ...clients.email import EmailClient
 from ...clients.storage import StorageClient
 
 logger = logging.getLogger(__name__)
 
 # Initialize clients
-openai_client = OpenAIClient()
-email_client = EmailClient()
 storage_client = StorageClient()
 
+# Runs knowledge base lookups alongside chatbot generation
+kb_lookup_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="kb-lookup")
+
+CHATBOT_SYSTEM_PROMPT = "You are a helpful assistant for DropFlow Pro, a dropshipping platform. You can help with questions about dropshipping, e-commerce, product sourcing, and using the DropFlow Pro platform."
+
+# Reciprocal rank fusion constant for merging keyword and semantic KB matches
+RRF_RANK_OFFSET = 60
+
+CHATBOT_FALLBACK_RESPONSE = "I'm sorry, I'm having trouble generating a response right now. Please try again later or contact our support team for assistance."
+
 def get_support_tickets(
     db: Session, 
     user_id: str, 
@@ -82,11 +95,9 @@ def create_support_ticket(db: Session, ticket: schemas.SupportTicketCreate, user
     )
     
     db.add(db_ticket)
-    db.commit()
-    db.refresh(db_ticket)
     
     # Create initial message from ticket description
-    create_ticket_message(
+    add_ticket_message(
         db,
         ticket_id=db_ticket.id,
         message=schemas.TicketMessageCreate(
@@ -96,6 +107,12 @@ def create_support_ticket(db: Session, ticket: schemas.SupportTicketCreate, user
         user_id=user_id
     )
     
+    # Queue notification in the same transaction, sent by the ticket notification dispatcher
+    queue_ticket_notification(db, ticket_id=db_ticket.id, event="new_ticket")
+    
+    db.commit()
+    db.refresh(db_ticket)
+    
     return db_ticket
 
 def update_support_ticket(db: Session, ticket_id: str, ticket: schemas.SupportTicketUpdate) -> models.SupportTicket:
@@ -120,6 +137,7 @@ def update_support_ticket(db: Session, ticket_id: str, ticket: schemas.SupportTi
         # If status changed to resolved, set resolved_at timestamp
         if ticket.status == models.TicketStatus.resolved and old_status != models.TicketStatus.resolved:
             db_ticket.resolved_at = datetime.utcnow()
+            queue_ticket_notification(db, ticket_id=ticket_id, event="ticket_resolved")
         # If status changed from resolved, clear resolved_at timestamp
         elif old_status == models.TicketStatus.resolved and ticket.status != models.TicketStatus.resolved:
             db_ticket.resolved_at = None
@@ -150,6 +168,20 @@ def create_ticket_message(db: Session, ticket_id: str, message: schemas.TicketMe
     """
     Create a new ticket message
     """
+    db_message = add_ticket_message(db, ticket_id=ticket_id, message=message, user_id=user_id)
+    
+    # Queue notification in the same transaction; replies within the digest window are sent as one email
+    queue_ticket_notification(db, ticket_id=ticket_id, event="new_message", message_id=db_message.id)
+    
+    db.commit()
+    db.refresh(db_message)
+    
+    return db_message
+
+def add_ticket_message(db: Session, ticket_id: str, message: schemas.TicketMessageCreate, user_id: str) -> models.TicketMessage:
+    """
+    Add a ticket message and update its ticket (the caller commits)
+    """
     db_message = models.TicketMessage(
         id=str(uuid.uuid4()),
         ticket_id=ticket_id,
@@ -170,9 +202,6 @@ def create_ticket_message(db: Session, ticket_id: str, message: schemas.TicketMe
         
         ticket.updated_at = datetime.utcnow()
     
-    db.commit()
-    db.refresh(db_message)
-    
     return db_message
 
 def create_ticket_attachment(
@@ -221,75 +250,6 @@ def upload_attachment(file_content: bytes, file_name: str, ticket_id: str) -> st
     # Return mock URL
     return f"/api/support/attachments/{ticket_id}/{unique_filename}"
 
-def send_ticket_notification(db: Session, ticket_id: str, notification_type: str, message_id: Optional[str] = None) -> None:
-    """
-    Send a notification for a ticket event
-    """
-    ticket = db.query(models.SupportTicket).filter(models.SupportTicket.id == ticket_id).first()
-    if not ticket:
-        logger.error(f"Ticket not found for notification: {ticket_id}")
-        return
-    
-    # Get user
-    user = db.query(User).filter(User.id == ticket.user_id).first()
-    if not user:
-        logger.error(f"User not found for ticket notification: {ticket.user_id}")
-        return
-    
-    # Get message if provided
-    message = None
-    if message_id:
-        message = db.query(models.TicketMessage).filter(models.TicketMessage.id == message_id).first()
-    
-    # Prepare notification data
-    notification_data = {
-        "ticket_id": ticket.id,
-        "reference_number": ticket.reference_number,
-        "subject": ticket.subject,
-        "status": ticket.status,
-        "user_email": user.email,
-        "user_name": user.full_name,
-        "message": message.message if message else None,
-        "notification_type": notification_type
-    }
-    
-    # Send email notification
-    try:
-        if notification_type == "new_ticket":
-            email_client.send_email(
-                to=user.email,
-                subject=f"Support Ticket Created: {ticket.reference_number}",
-                template="new_ticket",
-                template_data=notification_data
-            )
-            
-            # Also notify support team
-            email_client.send_email(
-                to="support@dropflow.pro",
-                subject=f"New Support Ticket: {ticket.reference_number}",
-                template="new_ticket_admin",
-                template_data=notification_data
-            )
-        
-        elif notification_type == "new_message":
-            email_client.send_email(
-                to=user.email,
-                subject=f"New Message on Ticket: {ticket.reference_number}",
-                template="new_message",
-                template_data=notification_data
-            )
-        
-        elif notification_type == "ticket_resolved":
-            email_client.send_email(
-                to=user.email,
-                subject=f"Ticket Resolved: {ticket.reference_number}",
-                template="ticket_resolved",
-                template_data=notification_data
-            )
-    
-    except Exception as e:
-        logger.error(f"Error sending ticket notification: {e}")
-
 def generate_reference_number() -> str:
     """
     Generate a unique reference number for a ticket
@@ -334,7 +294,22 @@ def get_kb_articles(
 ) -> List[models.KnowledgeBaseArticle]:
     """
     Get knowledge base articles
+    
+    With `search`, articles come from the full-text index ranked by relevance.
     """
+    if search:
+        ranked = kb_search_index.search(db, search, limit=limit, offset=offset, category_id=category_id, tag=tag)
+        if not ranked:
+            return []
+        
+        articles = {
+            article.id: article
+            for article in db.query(models.KnowledgeBaseArticle).filter(
+                models.KnowledgeBaseArticle.id.in_([a["id"] for a in ranked])
+            )
+        }
+        return [articles[a["id"]] for a in ranked if a["id"] in articles]
+    
     query = db.query(models.KnowledgeBaseArticle).filter(models.KnowledgeBaseArticle.is_published == True)
     
     if category_id:
@@ -344,14 +319,6 @@ def get_kb_articles(
         # Filter by tag (JSON array contains)
         query = query.filter(models.KnowledgeBaseArticle.tags.contains([tag]))
     
-    if search:
-        # Search in title and content
-        search_term = f"%{search}%"
-        query = query.filter(
-            (models.KnowledgeBaseArticle.title.ilike(search_term)) | 
-            (models.KnowledgeBaseArticle.content.ilike(search_term))
-        )
-    
     query = query.order_by(models.KnowledgeBaseArticle.created_at.desc())
     query = query.offset(offset).limit(limit)
     
@@ -486,39 +453,29 @@ def create_chatbot_message(db: Session, conversation_id: str, role: str, content
     
     return db_message
 
-def generate_chatbot_response(db: Session, conversation_id: str) -> models.ChatbotMessage:
+def build_chatbot_history(db: Session, conversation_id: str) -> List[Dict[str, str]]:
     """
-    Generate a response from the chatbot
+    Build the OpenAI messages for a conversation
+    
+    Recent messages are sent verbatim and older ones as a rolling summary,
+    see `ConversationHistoryManager`.
     """
     # Get conversation
     conversation = db.query(models.ChatbotConversation).filter(models.ChatbotConversation.id == conversation_id).first()
     if not conversation:
         raise ValueError(f"Chatbot conversation not found: {conversation_id}")
     
-    # Get conversation history
-    messages = db.query(models.ChatbotMessage).filter(
-        models.ChatbotMessage.conversation_id == conversation_id
-    ).order_by(models.ChatbotMessage.created_at).all()
-    
-    # Prepare conversation history for OpenAI
-    history = []
-    
-    # Add system message
-    history.append({
-        "role": "system",
-        "content": "You are a helpful assistant for DropFlow Pro, a dropshipping platform. You can help with questions about dropshipping, e-commerce, product sourcing, and using the DropFlow Pro platform."
-    })
-    
-    # Add conversation history
-    for msg in messages:
-        history.append({
-            "role": msg.role,
-            "content": msg.content
-        })
+    return history_manager.build(db, conversation, CHATBOT_SYSTEM_PROMPT)
+
+def generate_chatbot_response(db: Session, conversation_id: str) -> models.ChatbotMessage:
+    """
+    Generate a response from the chatbot
+    """
+    history = build_chatbot_history(db, conversation_id)
     
     # Generate response using OpenAI
     try:
-        response = openai_client.generate_chat_completion(history)
+        response = llm_gateway.generate_chat_completion(history, feature="chatbot")
         
         # Create assistant message
         return create_chatbot_message(db, conversation_id=conversation_id, role="assistant", content=response)
@@ -531,85 +488,141 @@ def generate_chatbot_response(db: Session, conversation_id: str) -> models.Chatb
             db, 
             conversation_id=conversation_id, 
             role="assistant", 
-            content="I'm sorry, I'm having trouble generating a response right now. Please try again later or contact our support team for assistance."
+            content=CHATBOT_FALLBACK_RESPONSE
         )
 
+def stream_chatbot_response(db: Session, conversation_id: str) -> Iterator[str]:
+    """
+    Stream a chatbot response as server-sent events
+    
+    Emits one "token" event per generated chunk, then a "done" event with
+    the id of the assistant message, which is persisted once at the end.
+    """
+    history = build_chatbot_history(db, conversation_id)
+    
+    chunks = []
+    try:
+        for chunk in llm_gateway.stream_chat_completion(history, feature="chatbot"):
+            chunks.append(chunk)
+            yield sse_event("token", {"content": chunk})
+    except Exception as e:
+        logger.error(f"Error streaming chatbot response: {e}")
+        if not chunks:
+            chunks.append(CHATBOT_FALLBACK_RESPONSE)
+            yield sse_event("token", {"content": CHATBOT_FALLBACK_RESPONSE})
+    
+    message = create_chatbot_message(db, conversation_id=conversation_id, role="assistant", content="".join(chunks))
+    yield sse_event("done", {"message_id": message.id})
+
+def build_query_messages(query: str) -> List[Dict[str, str]]:
+    """
+    Build the OpenAI messages for a one-off chatbot query
+    """
+    return [
+        {
+            "role": "system",
+            "content": CHATBOT_SYSTEM_PROMPT
+        },
+        {
+            "role": "user",
+            "content": query
+        }
+    ]
+
+def load_related_kb_articles(query: str) -> List[Dict[str, Any]]:
+    """
+    Find related KB articles with a dedicated session, so it can run in another thread
+    """
+    db = SessionLocal()
+    try:
+        return find_related_kb_articles(db, query)
+    finally:
+        db.close()
+
 def query_chatbot(db: Session, query: str, user_id: Optional[str] = None) -> Dict[str, Any]:
     """
     Query the chatbot without creating a conversation
     """
+    # Find related KB articles while the response is generated
+    articles_future = kb_lookup_executor.submit(load_related_kb_articles, query)
+    
     try:
-        # Prepare query for OpenAI
-        messages = [
-            {
-                "role": "system",
-                "content": "You are a helpful assistant for DropFlow Pro, a dropshipping platform. You can help with questions about dropshipping, e-commerce, product sourcing, and using the DropFlow Pro platform."
-            },
-            {
-                "role": "user",
-                "content": query
-            }
-        ]
-        
         # Generate response using OpenAI
-        response = openai_client.generate_chat_completion(messages)
-        
-        # Find related KB articles
-        related_articles = find_related_kb_articles(db, query)
+        response = llm_gateway.generate_chat_completion(build_query_messages(query), feature="chatbot_query")
         
         return {
             "response": response,
-            "related_articles": related_articles
+            "related_articles": articles_future.result()
         }
     
     except Exception as e:
         logger.error(f"Error querying chatbot: {e}")
         
         return {
-            "response": "I'm sorry, I'm having trouble generating a response right now. Please try again later or contact our support team for assistance.",
+            "response": CHATBOT_FALLBACK_RESPONSE,
             "related_articles": []
         }
 
-def find_related_kb_articles(db: Session, query: str, limit: int = 3) -> List[Dict[str, Any]]:
+def stream_chatbot_query(query: str) -> Iterator[str]:
     """
-    Find knowledge base articles related to a query
+    Stream a chatbot answer as server-sent events, then the related KB articles in the "done" event
     """
-    # In a real implementation, this would use a search index or vector similarity
-    # For now, we'll use a simple keyword search
+    articles_future = kb_lookup_executor.submit(load_related_kb_articles, query)
     
-    # Extract keywords from query
-    keywords = re.findall(r'\b\w{3,}\b', query.lower())
+    try:
+        for chunk in llm_gateway.stream_chat_completion(build_query_messages(query), feature="chatbot_query"):
+            yield sse_event("token", {"content": chunk})
+    except Exception as e:
+        logger.error(f"Error streaming chatbot query: {e}")
+        yield sse_event("error", {"detail": CHATBOT_FALLBACK_RESPONSE})
     
-    if not keywords:
-        return []
+    try:
+        related_articles = articles_future.result()
+    except Exception as e:
+        logger.error(f"Error finding related KB articles: {e}")
+        related_articles = []
     
-    # Search for articles containing these keywords
-    articles = []
+    yield sse_event("done", {"related_articles": related_articles})
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    """
+    Format a server-sent event
+    """
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+def find_related_kb_articles(db: Session, query: str, limit: int = 3) -> List[Dict[str, Any]]:
+    """
+    Find knowledge base articles related to a query, most relevant first
     
-    for keyword in keywords:
-        search_term = f"%{keyword}%"
-        results = db.query(models.KnowledgeBaseArticle).filter(
-            models.KnowledgeBaseArticle.is_published == True,
-            (models.KnowledgeBaseArticle.title.ilike(search_term)) | 
-            (models.KnowledgeBaseArticle.content.ilike(search_term))
-        ).limit(limit).all()
-        
-        for article in results:
-            if article.id not in [a["id"] for a in articles]:
-                articles.append({
-                    "id": article.id,
-                    "title": article.title,
-                    "excerpt": article.excerpt or article.content[:100] + "...",
-                    "url": f"/kb/articles/{article.slug}"
-                })
-            
-            if len(articles) >= limit:
-                break
-        
-        if len(articles) >= limit:
-            break
+    Keyword (BM25) and semantic (embedding) matches are merged with
+    reciprocal rank fusion, so paraphrased questions still find articles.
+    """
+    kb_search_index.ensure_built(db)
     
-    return articles
+    keyword_matches = [article["id"] for article in kb_search_index.search(db, query, limit=limit * 3)]
+    semantic_matches = [
+        article_id for article_id, _ in kb_embedding_index.search(
+            query, limit=limit * 3, accept=lambda article_id: article_id in kb_search_index.articles
+        )
+    ]
+    
+    fused: Dict[str, float] = {}
+    for matches in (keyword_matches, semantic_matches):
+        for rank, article_id in enumerate(matches):
+            fused[article_id] = fused.get(article_id, 0) + 1 / (RRF_RANK_OFFSET + rank)
+    
+    related = []
+    for article_id in sorted(fused, key=fused.get, reverse=True)[:limit]:
+        article = kb_search_index.articles.get(article_id)
+        if article:
+            related.append({
+                "id": article["id"],
+                "title": article["title"],
+                "excerpt": article["excerpt"],
+                "url": article["url"]
+            })
+    
+    return related
 
 def generate_conversation_title(content: str) -> str:
     """
@@ -0,0 +1,309 @@
+import asyncio
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import List, Optional, Dict, Any, Tuple
+
+import aiohttp
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from config import settings
+from mailer import SMTPBatchSender
+from . import models, services
+from ..orders.models import Order
+
+logger = logging.getLogger(__name__)
+
+# Retry schedule: 30s, 1m, 2m, 4m... capped at one hour
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 3600
+
+EMAIL_SUBJECTS = {
+    "delivery": "Votre commande a été livrée",
+    "exception": "Problème de livraison",
+}
+
+class NotificationDispatcher:
+    """
+    Deliver queued tracking notifications outside the tracking refresh path.
+    
+    `check_and_send_notifications` only writes `TrackingNotification` rows
+    with status "pending" (the outbox); this worker claims them in batches,
+    sends emails over one reused SMTP connection and webhooks through a
+    pooled aiohttp session capped per endpoint, and reschedules failures
+    with exponential backoff. A claim is a lease: rows still "sending" after
+    NOTIFICATION_CLAIM_TIMEOUT are picked up again.
+    """
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        batch_size: int = settings.NOTIFICATION_BATCH_SIZE,
+        max_attempts: int = settings.NOTIFICATION_MAX_ATTEMPTS,
+        interval: int = settings.NOTIFICATION_DISPATCH_INTERVAL
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.interval = interval
+        self.http_session: Optional[aiohttp.ClientSession] = None
+        self.task: Optional[asyncio.Task] = None
+
+    async def get_http_session(self) -> aiohttp.ClientSession:
+        if self.http_session is None or self.http_session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=settings.NOTIFICATION_WEBHOOK_CONCURRENCY,
+                limit_per_host=settings.NOTIFICATION_WEBHOOK_PER_HOST
+            )
+            self.http_session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=settings.NOTIFICATION_WEBHOOK_TIMEOUT)
+            )
+        return self.http_session
+
+    def claim_batch(self, db: Session) -> List[models.TrackingNotification]:
+        """
+        Claim due pending notifications by moving them to "sending"
+        
+        Notifications left in "sending" longer than the claim timeout, by a
+        dispatcher that crashed or was stopped mid-batch, are claimed again.
+        """
+        now = datetime.utcnow()
+        stale_before = now - timedelta(seconds=settings.NOTIFICATION_CLAIM_TIMEOUT)
+        notifications = db.query(models.TrackingNotification).filter(
+            or_(
+                and_(
+                    models.TrackingNotification.status == "pending",
+                    or_(
+                        models.TrackingNotification.next_attempt_at.is_(None),
+                        models.TrackingNotification.next_attempt_at <= now
+                    )
+                ),
+                and_(
+                    models.TrackingNotification.status == "sending",
+                    or_(
+                        models.TrackingNotification.claimed_at.is_(None),
+                        models.TrackingNotification.claimed_at <= stale_before
+                    )
+                )
+            )
+        ).order_by(
+            models.TrackingNotification.created_at
+        ).limit(self.batch_size).with_for_update(skip_locked=True).all()
+        
+        if not notifications:
+            return []
+        
+        for notification in notifications:
+            if notification.status == "sending":
+                logger.warning(f"Reclaiming notification {notification.id} left in sending since {notification.claimed_at}")
+            notification.status = "sending"
+            notification.claimed_at = now
+        db.commit()
+        
+        # Reload the claimed rows expired by the commit with one query
+        ids = [notification.id for notification in notifications]
+        return db.query(models.TrackingNotification).filter(models.TrackingNotification.id.in_(ids)).all()
+
+    def load_context(
+        self, db: Session, notifications: List[models.TrackingNotification]
+    ) -> Tuple[Dict[str, models.Tracking], Dict[str, Order]]:
+        """
+        Load the trackings and orders of a batch with one query each
+        """
+        tracking_ids = {n.tracking_id for n in notifications}
+        trackings = {
+            t.id: t for t in db.query(models.Tracking).filter(models.Tracking.id.in_(tracking_ids))
+        }
+        order_ids = {t.order_id for t in trackings.values() if t.order_id}
+        orders = {
+            o.id: o for o in db.query(Order).filter(Order.id.in_(order_ids))
+        } if order_ids else {}
+        return trackings, orders
+
+    def prepare_batch(
+        self, db: Session
+    ) -> Tuple[
+        List[models.TrackingNotification],
+        List[Tuple[models.TrackingNotification, str]],
+        List[Tuple[models.TrackingNotification, Dict[str, Any]]]
+    ]:
+        """
+        Claim a batch and render its notifications, returning the emails and webhooks to send
+        
+        This only does blocking database work and runs in a worker thread.
+        """
+        notifications = self.claim_batch(db)
+        if not notifications:
+            return [], [], []
+        
+        trackings, orders = self.load_context(db, notifications)
+        
+        emails = []
+        webhooks = []
+        for notification in notifications:
+            tracking = trackings.get(notification.tracking_id)
+            if not tracking:
+                self.mark_failed(notification, f"Tracking not found: {notification.tracking_id}", final=True)
+                continue
+            order = orders.get(tracking.order_id) if tracking.order_id else None
+            
+            try:
+                if notification.type == "email":
+                    content = services.prepare_email_notification(tracking, order, notification.trigger_event)
+                    emails.append((notification, content))
+                elif notification.type == "webhook":
+                    content = services.prepare_webhook_notification(tracking, order, notification.trigger_event)
+                    webhooks.append((notification, content))
+                elif notification.type == "sms":
+                    content = services.prepare_sms_notification(tracking, order, notification.trigger_event)
+                    services.send_sms_notification(notification.recipient, content)
+                    self.mark_sent(notification, content)
+                elif notification.type == "push":
+                    content = services.prepare_push_notification(tracking, order, notification.trigger_event)
+                    services.send_push_notification(notification.recipient, content)
+                    self.mark_sent(notification, content)
+                else:
+                    self.mark_failed(notification, f"Unsupported notification type: {notification.type}", final=True)
+            except Exception as e:
+                self.mark_failed(notification, str(e))
+        
+        return notifications, emails, webhooks
+
+    async def dispatch_once(self) -> int:
+        """
+        Deliver one batch of due notifications and return its size
+        
+        Database work runs in the default executor so the event loop only
+        waits on the network sends.
+        """
+        loop = asyncio.get_running_loop()
+        db = self.session_factory()
+        try:
+            notifications, emails, webhooks = await loop.run_in_executor(None, self.prepare_batch, db)
+            if not notifications:
+                return 0
+            
+            await asyncio.gather(
+                self.send_emails(emails),
+                self.send_webhooks(webhooks)
+            )
+            
+            await loop.run_in_executor(None, db.commit)
+            return len(notifications)
+        
+        except Exception as e:
+            logger.error(f"Error dispatching tracking notifications: {e}")
+            await loop.run_in_executor(None, db.rollback)
+            return 0
+        finally:
+            await loop.run_in_executor(None, db.close)
+
+    async def send_emails(self, emails: List[Tuple[models.TrackingNotification, str]]) -> None:
+        """
+        Send a batch of emails over one SMTP connection in a worker thread
+        """
+        if not emails:
+            return
+
+        def send_batch() -> List[Optional[str]]:
+            with SMTPBatchSender() as sender:
+                return sender.send_many([
+                    (
+                        notification.recipient,
+                        EMAIL_SUBJECTS.get(notification.trigger_event, "Mise à jour de livraison"),
+                        content
+                    )
+                    for notification, content in emails
+                ])
+        
+        try:
+            errors = await asyncio.get_running_loop().run_in_executor(None, send_batch)
+        except Exception as e:
+            errors = [str(e)] * len(emails)
+        
+        for (notification, content), error in zip(emails, errors):
+            if error:
+                self.mark_failed(notification, error)
+            else:
+                self.mark_sent(notification, content)
+
+    async def send_webhooks(self, webhooks: List[Tuple[models.TrackingNotification, Dict[str, Any]]]) -> None:
+        """
+        Post webhooks concurrently through the pooled HTTP session
+        """
+        if not webhooks:
+            return
+        
+        session = await self.get_http_session()
+
+        async def post(notification: models.TrackingNotification, content: Dict[str, Any]) -> None:
+            try:
+                async with session.post(notification.recipient, data=json.dumps(content, default=str),
+                                        headers={"Content-Type": "application/json"}) as response:
+                    if response.status >= 400:
+                        text = await response.text()
+                        raise ValueError(f"Webhook request failed: {response.status} {text[:200]}")
+                self.mark_sent(notification, content)
+            except Exception as e:
+                self.mark_failed(notification, f"Webhook request error: {e}")
+        
+        await asyncio.gather(*(post(notification, content) for notification, content in webhooks))
+
+    def mark_sent(self, notification: models.TrackingNotification, content: Any) -> None:
+        notification.status = "sent"
+        notification.content = content if isinstance(content, str) else json.dumps(content, default=str)
+        notification.sent_at = datetime.utcnow()
+        notification.error_message = None
+
+    def mark_failed(self, notification: models.TrackingNotification, error: str, final: bool = False) -> None:
+        """
+        Record a delivery failure and schedule a retry with exponential backoff
+        """
+        notification.attempts = (notification.attempts or 0) + 1
+        notification.error_message = error
+        
+        if final or notification.attempts >= self.max_attempts:
+            notification.status = "failed"
+            notification.next_attempt_at = None
+            logger.error(f"Notification {notification.id} failed permanently: {error}")
+        else:
+            delay = min(RETRY_BASE_SECONDS * 2 ** (notification.attempts - 1), RETRY_MAX_SECONDS)
+            notification.status = "pending"
+            notification.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
+            logger.warning(f"Notification {notification.id} failed, retrying in {delay}s: {error}")
+
+    async def run(self) -> None:
+        """
+        Dispatch batches until cancelled, sleeping only when the outbox is empty
+        """
+        while True:
+            try:
+                processed = await self.dispatch_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Notification dispatcher error: {e}")
+                processed = 0
+            
+            if processed < self.batch_size:
+                await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_event_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        
+        if self.http_session is not None and not self.http_session.closed:
+            await self.http_session.close()
+
+notification_dispatcher = NotificationDispatcher()
@@ -46,6 +46,9 @@ class Tracking(Base):
     last_checked = Column(DateTime(timezone=True), nullable=True)
     provider = Column(Enum(TrackingProvider), default=TrackingProvider.seventeen_track)
     external_id = Column(String, nullable=True)
+    events_fingerprint = Column(String, nullable=True)  # Hash of the last provider event set
+    events_count = Column(Integer, default=0)
+    last_event_at = Column(DateTime(timezone=True), nullable=True)
     metadata = Column(JSON, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -79,11 +82,14 @@ class TrackingNotification(Base):
     tracking_id = Column(String, ForeignKey("trackings.id", ondelete="CASCADE"))
     type = Column(String, nullable=False)  # email, sms, push, webhook
     recipient = Column(String, nullable=False)
-    status = Column(String, nullable=False)  # pending, sent, failed
+    status = Column(String, nullable=False, index=True)  # pending, sent, failed
     trigger_event = Column(String, nullable=False)  # status_change, delivery, exception, etc.
     content = Column(Text, nullable=True)
     sent_at = Column(DateTime(timezone=True), nullable=True)
     error_message = Column(Text, nullable=True)
+    attempts = Column(Integer, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=True)  # Outbox retry schedule
+    claimed_at = Column(DateTime(timezone=True), nullable=True)  # When the dispatcher moved it to "sending"
     metadata = Column(JSON, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
@@ -96,7 +96,6 @@ async def refresh_tracking(
 async def send_tracking_notification(
     tracking_id: str,
     notification: schemas.NotificationCreate,
-    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -107,7 +106,7 @@ async def send_tracking_notification(
     if not tracking:
         raise HTTPException(status_code=404, detail="Tracking not found")
     
-    # Create notification
+    # Queue notification, the notification dispatcher sends it
     db_notification = services.create_tracking_notification(
         db, 
         tracking_id=tracking_id,
@@ -116,13 +115,6 @@ async def send_tracking_notification(
         trigger_event="manual"
     )
     
-    # Send notification in background
-    background_tasks.add_task(
-        services.send_tracking_notification,
-        db=db,
-        notification_id=db_notification.id
-    )
-    
     return db_notification
 
 @router.delete("/{tracking_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -176,12 +168,9 @@ async def create_batch_trackings(
     """
     Create multiple trackings
     """
-    db_trackings = []
+    db_trackings = services.create_trackings_bulk(db, trackings=trackings, user_id=current_user.id)
     
-    for tracking_data in trackings:
-        db_tracking = services.create_tracking(db, tracking=tracking_data, user_id=current_user.id)
-        db_trackings.append(db_tracking)
-        
+    for db_tracking in db_trackings:
         # Check tracking status in background
         background_tasks.add_task(
             services.check_tracking_status,
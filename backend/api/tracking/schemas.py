@@ -185,6 +185,7 @@ class BatchImportResponse(BaseModel):
     success: bool
     total: int
     imported: int
+    duplicates: int = 0
     failed: int
     tracking_ids: List[str]
     errors: Optional[List[Dict[str, Any]]] = None
\ No newline at end of file
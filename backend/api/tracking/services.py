@@ -1,26 +1,54 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc, asc
+from sqlalchemy import event, func, desc, asc
 from typing import List, Optional, Dict, Any, Tuple
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import uuid
+from itertools import chain
+import hashlib
 import csv
 import io
 import logging
-import requests
 import json
-from requests.exceptions import RequestException
 
+from config import settings as app_settings
+from cache import TTLCache
+from utils import CarrierClassifier, DEFAULT_CARRIER_PATTERNS
 from . import models, schemas
 from ..orders.models import Order
-from ...clients.tracking import SeventeenTrackClient, AftershipClient, ShippoClient, EasypostClient
 
 logger = logging.getLogger(__name__)
 
-# Initialize tracking clients
-seventeen_track_client = SeventeenTrackClient()
-aftership_client = AftershipClient()
-shippo_client = ShippoClient()
-easypost_client = EasypostClient()
+# Client class of each provider with an API; the others use mock data
+PROVIDER_CLIENT_CLASSES = {
+    models.TrackingProvider.seventeen_track: "SeventeenTrackClient",
+    models.TrackingProvider.aftership: "AftershipClient",
+    models.TrackingProvider.shippo: "ShippoClient",
+    models.TrackingProvider.easypost: "EasypostClient"
+}
+
+# Provider clients, created on first use; entries can be replaced to route
+# refreshes elsewhere (the refresh benchmark points them at a local stand-in)
+provider_clients: Dict[models.TrackingProvider, Any] = {}
+
+def get_provider_client(provider: models.TrackingProvider) -> Any:
+    """
+    Get the API client of a tracking provider, or None for providers without one
+    """
+    if provider in provider_clients:
+        return provider_clients[provider]
+    if provider not in PROVIDER_CLIENT_CLASSES:
+        return None
+    
+    from ...clients import tracking as tracking_clients
+    
+    return provider_clients.setdefault(provider, getattr(tracking_clients, PROVIDER_CLIENT_CLASSES[provider])())
+
+# Read-through caches for rows read on every tracking refresh
+tracking_settings_cache = TTLCache("tracking_settings", ttl=app_settings.TRACKING_SETTINGS_CACHE_TTL)
+carrier_cache = TTLCache("carriers", ttl=app_settings.CARRIER_CACHE_TTL, maxsize=4)
+
+# Keep IN (...) lists below SQLite's bound parameter limit
+IN_CLAUSE_CHUNK_SIZE = 500
 
 def get_trackings(
     db: Session, 
@@ -73,24 +101,12 @@ def create_tracking(db: Session, tracking: schemas.TrackingCreate, user_id: str)
     if existing_tracking:
         return existing_tracking
     
-    # Get carrier code if not provided
-    carrier_code = None
-    if tracking.carrier:
-        # Look up carrier code
-        carrier_info = db.query(models.CarrierInfo).filter(models.CarrierInfo.name == tracking.carrier).first()
-        if carrier_info:
-            carrier_code = carrier_info.code
-    
     # Create tracking
-    db_tracking = models.Tracking(
-        id=str(uuid.uuid4()),
+    db_tracking = build_tracking(
+        tracking,
         user_id=user_id,
-        order_id=tracking.order_id,
-        tracking_number=tracking.tracking_number,
-        carrier=tracking.carrier,
-        carrier_code=carrier_code or tracking.carrier_code,
-        provider=tracking.provider,
-        status=models.TrackingStatus.pending
+        carriers=get_cached_carriers(db),
+        detected=get_carrier_classifier(db).classify(tracking.tracking_number)
     )
     
     db.add(db_tracking)
@@ -101,12 +117,102 @@ def create_tracking(db: Session, tracking: schemas.TrackingCreate, user_id: str)
     if tracking.order_id:
         order = db.query(Order).filter(Order.id == tracking.order_id).first()
         if order:
-            order.tracking_number = tracking.tracking_number
-            order.carrier = tracking.carrier
+            order.tracking_number = db_tracking.tracking_number
+            order.carrier = db_tracking.carrier
             db.commit()
     
     return db_tracking
 
+def build_tracking(
+    tracking: schemas.TrackingCreate,
+    user_id: str,
+    carriers: Dict[str, schemas.CarrierInfoResponse],
+    detected: Optional[Tuple[str, str]] = None
+) -> models.Tracking:
+    """
+    Build a new tracking row, filling the carrier from the number format when not provided
+    """
+    carrier = tracking.carrier
+    detected_code = None
+    
+    if not carrier and detected:
+        carrier, detected_code = detected
+    
+    # Look up carrier code
+    carrier_info = carriers.get(carrier) if carrier else None
+    carrier_code = (carrier_info.code if carrier_info else None) or tracking.carrier_code or detected_code
+    
+    return models.Tracking(
+        id=str(uuid.uuid4()),
+        user_id=user_id,
+        order_id=tracking.order_id,
+        tracking_number=tracking.tracking_number,
+        carrier=carrier,
+        carrier_code=carrier_code,
+        provider=tracking.provider,
+        status=models.TrackingStatus.pending
+    )
+
+def create_trackings_bulk(db: Session, trackings: List[schemas.TrackingCreate], user_id: str) -> List[models.Tracking]:
+    """
+    Create many trackings at once
+    
+    Existing numbers are looked up in chunks, carriers are detected for the
+    whole list in one pass and new rows are inserted in a single commit.
+    Returns one tracking per distinct tracking number, in input order.
+    """
+    existing, created = insert_trackings(db, trackings=trackings, user_id=user_id)
+    return [existing.get(number) or created[number] for number in dict.fromkeys(t.tracking_number for t in trackings)]
+
+def insert_trackings(
+    db: Session, trackings: List[schemas.TrackingCreate], user_id: str
+) -> Tuple[Dict[str, models.Tracking], Dict[str, models.Tracking]]:
+    """
+    Insert the trackings whose numbers the user doesn't have yet
+    
+    Returns the already existing and the newly created trackings, keyed by tracking number.
+    """
+    unique = {}
+    for tracking in trackings:
+        unique.setdefault(tracking.tracking_number, tracking)
+    numbers = list(unique)
+    
+    existing = {}
+    for i in range(0, len(numbers), IN_CLAUSE_CHUNK_SIZE):
+        chunk = numbers[i:i + IN_CLAUSE_CHUNK_SIZE]
+        for db_tracking in db.query(models.Tracking).filter(
+            models.Tracking.user_id == user_id,
+            models.Tracking.tracking_number.in_(chunk)
+        ):
+            existing[db_tracking.tracking_number] = db_tracking
+    
+    new_numbers = [number for number in numbers if number not in existing]
+    carriers = get_cached_carriers(db)
+    detected = get_carrier_classifier(db).classify_many(new_numbers)
+    
+    created = {
+        number: build_tracking(unique[number], user_id=user_id, carriers=carriers, detected=detected.get(number))
+        for number in new_numbers
+    }
+    db.add_all(created.values())
+    
+    # Update orders with tracking info
+    by_order = {t.order_id: t for t in created.values() if t.order_id}
+    order_ids = list(by_order)
+    for i in range(0, len(order_ids), IN_CLAUSE_CHUNK_SIZE):
+        for order in db.query(Order).filter(Order.id.in_(order_ids[i:i + IN_CLAUSE_CHUNK_SIZE])):
+            order.tracking_number = by_order[order.id].tracking_number
+            order.carrier = by_order[order.id].carrier
+    
+    db.commit()
+    
+    # Reload the new rows with one query per chunk instead of one refresh each
+    created_ids = [t.id for t in created.values()]
+    for i in range(0, len(created_ids), IN_CLAUSE_CHUNK_SIZE):
+        db.query(models.Tracking).filter(models.Tracking.id.in_(created_ids[i:i + IN_CLAUSE_CHUNK_SIZE])).all()
+    
+    return existing, created
+
 def update_tracking(db: Session, tracking_id: str, tracking: schemas.TrackingUpdate) -> models.Tracking:
     """
     Update a tracking
@@ -180,25 +286,9 @@ def check_tracking_status(db: Session, tracking_id: str) -> models.Tracking:
         db.commit()
         
         # Get tracking data from provider
-        tracking_data = None
-        
-        if tracking.provider == models.TrackingProvider.seventeen_track:
-            tracking_data = seventeen_track_client.get_tracking(
-                tracking_number=tracking.tracking_number,
-                carrier_code=tracking.carrier_code
-            )
-        elif tracking.provider == models.TrackingProvider.aftership:
-            tracking_data = aftership_client.get_tracking(
-                tracking_number=tracking.tracking_number,
-                carrier_code=tracking.carrier_code
-            )
-        elif tracking.provider == models.TrackingProvider.shippo:
-            tracking_data = shippo_client.get_tracking(
-                tracking_number=tracking.tracking_number,
-                carrier_code=tracking.carrier_code
-            )
-        elif tracking.provider == models.TrackingProvider.easypost:
-            tracking_data = easypost_client.get_tracking(
+        client = get_provider_client(tracking.provider)
+        if client is not None:
+            tracking_data = client.get_tracking(
                 tracking_number=tracking.tracking_number,
                 carrier_code=tracking.carrier_code
             )
@@ -220,6 +310,7 @@ def check_tracking_status(db: Session, tracking_id: str) -> models.Tracking:
         
     except Exception as e:
         logger.error(f"Error checking tracking status: {e}")
+        db.rollback()
         return tracking
 
 def update_tracking_from_data(db: Session, tracking: models.Tracking, tracking_data: Dict[str, Any]) -> None:
@@ -259,89 +350,148 @@ def update_tracking_from_data(db: Session, tracking: models.Tracking, tracking_d
     db.commit()
     db.refresh(tracking)
 
+def _event_status_value(status: Any) -> str:
+    """
+    Normalize an event status (enum or raw string) to its string value
+    """
+    return status.value if isinstance(status, models.TrackingStatus) else str(status)
+
+def _event_timestamp(timestamp: datetime) -> datetime:
+    """
+    Normalize an event timestamp to a naive UTC datetime for comparisons
+    """
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
+
+def _event_key(status: Any, timestamp: datetime) -> Tuple[str, str]:
+    """
+    Build the deduplication key of a tracking event
+    """
+    return (_event_status_value(status), _event_timestamp(timestamp).isoformat())
+
+def compute_events_fingerprint(events: List[Dict[str, Any]]) -> str:
+    """
+    Compute an order-independent fingerprint of a provider event list
+    """
+    keys = sorted({_event_key(e.get("status"), e.get("timestamp")) for e in events})
+    digest = hashlib.sha1()
+    for status, timestamp in keys:
+        digest.update(f"{status}|{timestamp}\n".encode())
+    return digest.hexdigest()
+
 def process_tracking_events(db: Session, tracking: models.Tracking, events: List[Dict[str, Any]]) -> None:
     """
     Process tracking events
+    
+    The event set stored on the tracking is summarized by the fingerprint of
+    the last provider payload, a count and the latest event timestamp, so
+    unchanged payloads are skipped and payloads that only append events are
+    detected without loading `tracking.events`. Anything else, such as a
+    rewritten older event, is diffed against the stored event keys.
     """
-    # Get existing events
-    existing_events = {
-        (event.status, event.timestamp.isoformat()): event
-        for event in tracking.events
-    }
+    fingerprint = compute_events_fingerprint(events)
+    if tracking.events_fingerprint == fingerprint:
+        return
     
-    # Process new events
+    # Deduplicate the provider payload itself
+    incoming = {}
     for event_data in events:
-        # Create a unique key for this event
-        event_key = (event_data.get("status"), event_data.get("timestamp").isoformat())
-        
-        # Skip if event already exists
-        if event_key in existing_events:
-            continue
-        
-        # Create new event
-        event = models.TrackingEvent(
-            id=str(uuid.uuid4()),
-            tracking_id=tracking.id,
-            status=event_data.get("status"),
-            status_description=event_data.get("status_description"),
-            location=event_data.get("location"),
-            timestamp=event_data.get("timestamp"),
-            message=event_data.get("message"),
-            metadata=event_data.get("metadata")
-        )
-        
-        db.add(event)
+        incoming.setdefault(_event_key(event_data.get("status"), event_data.get("timestamp")), event_data)
+    
+    last_event_at = _event_timestamp(tracking.last_event_at) if tracking.last_event_at else None
+    known_count = tracking.events_count or 0
+    
+    # The stored fingerprint is that of the previous payload, so the events up
+    # to the last stored one match it exactly when the provider only appended
+    previous = [e for e in incoming.values() if _event_timestamp(e["timestamp"]) <= last_event_at] if last_event_at else None
+    
+    if previous is not None and compute_events_fingerprint(previous) == tracking.events_fingerprint:
+        # Provider only appended events after the last one we stored
+        new_events = [e for e in incoming.values() if _event_timestamp(e["timestamp"]) > last_event_at]
+    elif tracking.events_count == 0 and tracking.events_fingerprint is None:
+        # First sync of a tracking created with the fingerprint columns
+        new_events = list(incoming.values())
+    else:
+        # Fall back to diffing against the stored event keys only
+        existing_keys = {
+            _event_key(status, timestamp)
+            for status, timestamp in db.query(
+                models.TrackingEvent.status,
+                models.TrackingEvent.timestamp
+            ).filter(models.TrackingEvent.tracking_id == tracking.id)
+        }
+        known_count = len(existing_keys)
+        new_events = [e for key, e in incoming.items() if key not in existing_keys]
     
-    db.commit()
+    if new_events:
+        db.bulk_insert_mappings(models.TrackingEvent, [
+            {
+                "id": str(uuid.uuid4()),
+                "tracking_id": tracking.id,
+                "status": event_data.get("status"),
+                "status_description": event_data.get("status_description"),
+                "location": event_data.get("location"),
+                "timestamp": event_data.get("timestamp"),
+                "message": event_data.get("message"),
+                "metadata": event_data.get("metadata")
+            }
+            for event_data in new_events
+        ])
+        newest = max(_event_timestamp(e["timestamp"]) for e in new_events)
+        if not last_event_at or newest > last_event_at:
+            tracking.last_event_at = newest
+    
+    tracking.events_count = known_count + len(new_events)
+    tracking.events_fingerprint = fingerprint
 
 def check_and_send_notifications(db: Session, tracking: models.Tracking) -> None:
     """
-    Check if notifications should be sent and send them
+    Check if notifications should be sent and queue them
+    
+    Notifications are only written to the outbox here; delivery is handled
+    by the notification dispatcher so slow recipients never block a refresh.
     """
     # Get user's tracking settings
-    settings = get_tracking_settings(db, user_id=tracking.user_id)
+    settings = get_cached_tracking_settings(db, user_id=tracking.user_id)
     if not settings or not settings.notify_customer:
         return
     
-    # Get order if available
-    order = None
-    if tracking.order_id:
-        order = db.query(Order).filter(Order.id == tracking.order_id).first()
+    notification_types = settings.notification_types or []
+    queued = False
     
     # Check for status changes that trigger notifications
-    if tracking.status == models.TrackingStatus.delivered:
-        # Delivery notification
-        if "email" in settings.notification_types and order and order.customer_email:
-            create_and_send_notification(
-                db,
-                tracking_id=tracking.id,
-                notification_type="email",
-                recipient=order.customer_email,
-                trigger_event="delivery"
-            )
-    
-    elif tracking.status == models.TrackingStatus.exception:
-        # Exception notification
-        if "email" in settings.notification_types and order and order.customer_email:
-            create_and_send_notification(
+    if tracking.status in (models.TrackingStatus.delivered, models.TrackingStatus.exception) and "email" in notification_types:
+        # Get order if available
+        order = None
+        if tracking.order_id:
+            order = db.query(Order).filter(Order.id == tracking.order_id).first()
+        
+        if order and order.customer_email:
+            queue_notification(
                 db,
                 tracking_id=tracking.id,
                 notification_type="email",
                 recipient=order.customer_email,
-                trigger_event="exception"
+                trigger_event="delivery" if tracking.status == models.TrackingStatus.delivered else "exception"
             )
+            queued = True
     
     # Always send webhook if configured
     if settings.webhook_url:
-        create_and_send_notification(
+        queue_notification(
             db,
             tracking_id=tracking.id,
             notification_type="webhook",
             recipient=settings.webhook_url,
             trigger_event="status_update"
         )
+        queued = True
+    
+    if queued:
+        db.commit()
 
-def create_and_send_notification(
+def queue_notification(
     db: Session,
     tracking_id: str,
     notification_type: str,
@@ -349,81 +499,22 @@ def create_and_send_notification(
     trigger_event: str
 ) -> models.TrackingNotification:
     """
-    Create and send a tracking notification
+    Add a pending tracking notification to the outbox (the caller commits)
     """
-    # Create notification
     notification = models.TrackingNotification(
         id=str(uuid.uuid4()),
         tracking_id=tracking_id,
         type=notification_type,
         recipient=recipient,
         status="pending",
-        trigger_event=trigger_event
+        trigger_event=trigger_event,
+        attempts=0
     )
     
     db.add(notification)
-    db.commit()
-    db.refresh(notification)
-    
-    # Send notification
-    send_tracking_notification(db, notification_id=notification.id)
     
     return notification
 
-def send_tracking_notification(db: Session, notification_id: str) -> None:
-    """
-    Send a tracking notification
-    """
-    notification = db.query(models.TrackingNotification).filter(models.TrackingNotification.id == notification_id).first()
-    if not notification:
-        logger.error(f"Notification not found: {notification_id}")
-        return
-    
-    try:
-        # Get tracking
-        tracking = db.query(models.Tracking).filter(models.Tracking.id == notification.tracking_id).first()
-        if not tracking:
-            raise ValueError(f"Tracking not found: {notification.tracking_id}")
-        
-        # Get order if available
-        order = None
-        if tracking.order_id:
-            order = db.query(Order).filter(Order.id == tracking.order_id).first()
-        
-        # Prepare notification content
-        if notification.type == "email":
-            content = prepare_email_notification(tracking, order, notification.trigger_event)
-            send_email_notification(notification.recipient, content)
-        
-        elif notification.type == "sms":
-            content = prepare_sms_notification(tracking, order, notification.trigger_event)
-            send_sms_notification(notification.recipient, content)
-        
-        elif notification.type == "push":
-            content = prepare_push_notification(tracking, order, notification.trigger_event)
-            send_push_notification(notification.recipient, content)
-        
-        elif notification.type == "webhook":
-            content = prepare_webhook_notification(tracking, order, notification.trigger_event)
-            send_webhook_notification(notification.recipient, content)
-        
-        else:
-            raise ValueError(f"Unsupported notification type: {notification.type}")
-        
-        # Update notification
-        notification.status = "sent"
-        notification.content = content
-        notification.sent_at = datetime.utcnow()
-        db.commit()
-        
-    except Exception as e:
-        logger.error(f"Error sending notification: {e}")
-        
-        # Update notification with error
-        notification.status = "failed"
-        notification.error_message = str(e)
-        db.commit()
-
 def prepare_email_notification(tracking: models.Tracking, order: Optional[Order], trigger_event: str) -> str:
     """
     Prepare email notification content
@@ -539,29 +630,83 @@ def send_push_notification(recipient: str, content: Dict[str, Any]) -> None:
     # For now, just log it
     logger.info(f"Sending push notification to {recipient}: {content['title']}")
 
-def send_webhook_notification(webhook_url: str, content: Dict[str, Any]) -> None:
+def get_tracking_settings(db: Session, user_id: str) -> Optional[models.TrackingSettings]:
     """
-    Send webhook notification
+    Get tracking settings for a user
     """
-    try:
-        response = requests.post(
-            webhook_url,
-            json=content,
-            headers={"Content-Type": "application/json"},
-            timeout=10
-        )
-        
-        if not response.ok:
-            raise ValueError(f"Webhook request failed: {response.status_code} {response.text}")
+    return db.query(models.TrackingSettings).filter(models.TrackingSettings.user_id == user_id).first()
+
+def get_cached_tracking_settings(db: Session, user_id: str) -> Optional[schemas.TrackingSettingsResponse]:
+    """
+    Get a read-only snapshot of a user's tracking settings through the cache
+    
+    Used on the refresh path; missing settings are cached too so users
+    without settings don't cost a query per tracking either.
+    """
+    def load() -> Optional[schemas.TrackingSettingsResponse]:
+        db_settings = get_tracking_settings(db, user_id=user_id)
+        return schemas.TrackingSettingsResponse.from_orm(db_settings) if db_settings else None
+    
+    return tracking_settings_cache.get_or_load(user_id, load)
+
+def get_cached_carriers(db: Session) -> Dict[str, schemas.CarrierInfoResponse]:
+    """
+    Get active carriers keyed by name through the cache
+    """
+    def load() -> Dict[str, schemas.CarrierInfoResponse]:
+        return {
+            carrier.name: schemas.CarrierInfoResponse.from_orm(carrier)
+            for carrier in get_carriers(db, active_only=True)
+        }
+    
+    return carrier_cache.get_or_load("active", load)
+
+def get_carrier_classifier(db: Session) -> CarrierClassifier:
+    """
+    Get the carrier classifier built from CarrierInfo patterns through the cache
+    
+    Carriers declare their format as `metadata["tracking_number_pattern"]`;
+    built-in formats are kept for carriers that don't.
+    """
+    def load() -> CarrierClassifier:
+        patterns = []
+        for carrier in get_cached_carriers(db).values():
+            pattern = (carrier.metadata or {}).get("tracking_number_pattern")
+            if pattern:
+                patterns.append((carrier.name, carrier.code, pattern))
         
-    except RequestException as e:
-        raise ValueError(f"Webhook request error: {e}")
+        configured = {name for name, _, _ in patterns}
+        patterns.extend(p for p in DEFAULT_CARRIER_PATTERNS if p[0] not in configured)
+        return CarrierClassifier(patterns)
+    
+    return carrier_cache.get_or_load("classifier", load)
 
-def get_tracking_settings(db: Session, user_id: str) -> Optional[models.TrackingSettings]:
+def invalidate_carrier_cache() -> None:
     """
-    Get tracking settings for a user
+    Drop cached carriers after CarrierInfo rows change
     """
-    return db.query(models.TrackingSettings).filter(models.TrackingSettings.user_id == user_id).first()
+    carrier_cache.clear()
+
+def collect_carrier_changes(session: Session, flush_context) -> None:
+    """
+    Flag sessions that flushed CarrierInfo changes so the cache is dropped on commit
+    """
+    if any(
+        isinstance(obj, models.CarrierInfo)
+        for obj in chain(session.new, session.dirty, session.deleted)
+    ):
+        session.info["carrier_changes"] = True
+
+def apply_carrier_changes(session: Session) -> None:
+    if session.info.pop("carrier_changes", False):
+        invalidate_carrier_cache()
+
+def discard_carrier_changes(session: Session) -> None:
+    session.info.pop("carrier_changes", None)
+
+event.listen(Session, "after_flush", collect_carrier_changes)
+event.listen(Session, "after_commit", apply_carrier_changes)
+event.listen(Session, "after_rollback", discard_carrier_changes)
 
 def create_tracking_settings(db: Session, user_id: str) -> models.TrackingSettings:
     """
@@ -580,6 +725,8 @@ def create_tracking_settings(db: Session, user_id: str) -> models.TrackingSettin
     db.commit()
     db.refresh(settings)
     
+    tracking_settings_cache.invalidate(user_id)
+    
     return settings
 
 def update_tracking_settings(db: Session, settings_id: str, settings: schemas.TrackingSettingsUpdate) -> models.TrackingSettings:
@@ -614,6 +761,8 @@ def update_tracking_settings(db: Session, settings_id: str, settings: schemas.Tr
     db.commit()
     db.refresh(db_settings)
     
+    tracking_settings_cache.invalidate(db_settings.user_id)
+    
     return db_settings
 
 def get_carriers(db: Session, country: Optional[str] = None, active_only: bool = True) -> List[models.CarrierInfo]:
@@ -754,6 +903,8 @@ def create_tracking_notification(
 ) -> models.TrackingNotification:
     """
     Create a tracking notification
+    
+    The notification is queued as "pending" and delivered by the notification dispatcher.
     """
     notification = models.TrackingNotification(
         id=str(uuid.uuid4()),
@@ -780,11 +931,10 @@ def import_trackings_from_csv(db: Session, file_content: bytes, user_id: str) ->
         reader = csv.DictReader(io.StringIO(csv_content))
         rows = list(reader)
         
-        # Process each row
-        imported = 0
+        # Validate rows
         failed = 0
-        tracking_ids = []
         errors = []
+        valid_trackings = []
         
         for row in rows:
             try:
@@ -793,18 +943,13 @@ def import_trackings_from_csv(db: Session, file_content: bytes, user_id: str) ->
                 if not tracking_number:
                     raise ValueError("Tracking number is required")
                 
-                # Create tracking
-                tracking_data = schemas.TrackingCreate(
+                valid_trackings.append((row, schemas.TrackingCreate(
                     tracking_number=tracking_number,
                     carrier=row.get('carrier'),
                     carrier_code=row.get('carrier_code'),
                     order_id=row.get('order_id'),
                     provider=row.get('provider', 'seventeen_track')
-                )
-                
-                tracking = create_tracking(db, tracking=tracking_data, user_id=user_id)
-                tracking_ids.append(tracking.id)
-                imported += 1
+                )))
                 
             except Exception as e:
                 failed += 1
@@ -813,10 +958,38 @@ def import_trackings_from_csv(db: Session, file_content: bytes, user_id: str) ->
                     "error": str(e)
                 })
         
+        # Create trackings in one batch; if the batch fails, retry row by row
+        # so each failing row is reported with its own error
+        try:
+            results = [insert_trackings(db, trackings=[tracking for _, tracking in valid_trackings], user_id=user_id)]
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Bulk CSV import failed, importing row by row: {e}")
+            results = []
+            for row, tracking in valid_trackings:
+                try:
+                    results.append(insert_trackings(db, trackings=[tracking], user_id=user_id))
+                except Exception as e:
+                    db.rollback()
+                    failed += 1
+                    errors.append({
+                        "row": row,
+                        "error": str(e)
+                    })
+        
+        # Rows whose number already existed, or appeared earlier in the file, are duplicates
+        imported = sum(len(created) for _, created in results)
+        trackings = {}
+        for existing, created in results:
+            trackings.update(existing)
+            trackings.update(created)
+        tracking_ids = [tracking.id for tracking in trackings.values()]
+        
         return {
             "success": True,
             "total": len(rows),
             "imported": imported,
+            "duplicates": len(rows) - failed - imported,
             "failed": failed,
             "tracking_ids": tracking_ids,
             "errors": errors
@@ -828,6 +1001,7 @@ def import_trackings_from_csv(db: Session, file_content: bytes, user_id: str) ->
             "success": False,
             "total": 0,
             "imported": 0,
+            "duplicates": 0,
             "failed": 0,
             "tracking_ids": [],
             "errors": [{"error": str(e)}]
@@ -1,9 +1,10 @@
-from sqlalchemy import Column, String, Integer, Float, DateTime, ForeignKey, Boolean, Text, JSON, Enum
+from sqlalchemy import Column, String, Integer, Float, DateTime, ForeignKey, Boolean, Text, JSON, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
 import uuid
 import enum
+from datetime import datetime
 
 class CompetitionLevel(str, enum.Enum):
     low = "low"
@@ -30,12 +31,21 @@ class WinnerProduct(Base):
     social_proof = Column(JSON, nullable=True)  # Object with reviews, rating, orders
     ad_spend = Column(JSON, nullable=True)  # Object with ad spend by platform
     metadata = Column(JSON, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow, server_default=func.now())  # Set in Python so SQLite stores the format cursors bind
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relationships
     user = relationship("User", back_populates="winner_products")
     product = relationship("Product", back_populates="winner_data")
+    
+    __table_args__ = (
+        Index("ix_winner_products_user_competition", "user_id", "competition_level"),
+        # Keyset pagination: one index per whitelisted sort key, id as tie-breaker
+        Index("ix_winner_products_user_score", "user_id", "winner_score", "id"),
+        Index("ix_winner_products_user_profit", "user_id", "profit_potential", "id"),
+        Index("ix_winner_products_user_created", "user_id", "created_at", "id"),
+        Index("ix_winner_products_user_category_score", "user_id", "category", "winner_score", "id"),
+    )
 
 class MarketTrend(Base):
     __tablename__ = "market_trends"
@@ -54,6 +64,7 @@ class MarketTrend(Base):
     season_end = Column(String, nullable=True)  # Month or date
     source = Column(String, nullable=True)  # Where this trend was detected
     is_public = Column(Boolean, default=False)
+    trend_key = Column(String, nullable=True, index=True)  # "kind:term" for shared detected trends
     metadata = Column(JSON, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -106,6 +117,23 @@ class WinnerDetectionResult(Base):
     job = relationship("WinnerDetectionJob", back_populates="results")
     winner_product = relationship("WinnerProduct")
 
+class WinnerRescoreQueue(Base):
+    __tablename__ = "winner_rescore_queue"
+    
+    # Products whose scoring inputs changed since their winner score was computed
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    product_id = Column(String, nullable=False, index=True)
+    user_id = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class UserTrendReference(Base):
+    __tablename__ = "user_trend_references"
+    
+    # Shared detected trends (user_id NULL on the trend) a user has detected
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    trend_id = Column(String, ForeignKey("market_trends.id", ondelete="CASCADE"), primary_key=True, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
 # Add relationships to User and Product models
 from ..auth.models import User
 from ..products.models import Product
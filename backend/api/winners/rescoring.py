@@ -0,0 +1,237 @@
+import asyncio
+import logging
+import math
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from config import settings
+from . import models, services
+from .scoring import ProductRow, score_batch
+from ..products.models import Product
+
+logger = logging.getLogger(__name__)
+
+# Product columns that feed the winner score
+RESCORE_FIELDS = ("price", "original_price", "category", "supplier")
+
+def products_with_winners(connection, product_ids: List[str]) -> set:
+    """
+    Return the subset of product ids that have winner products
+    """
+    found = set()
+    for i in range(0, len(product_ids), services.ID_CHUNK_SIZE):
+        found.update(connection.execute(
+            select(models.WinnerProduct.product_id).where(
+                models.WinnerProduct.product_id.in_(product_ids[i:i + services.ID_CHUNK_SIZE])
+            ).distinct()
+        ).scalars())
+    return found
+
+def queue_changed_products(session: Session, flush_context) -> None:
+    """
+    Record products whose scoring inputs changed in this flush
+    
+    Runs on every session flush, so product edits, imports and store syncs
+    all feed the re-scoring queue without each code path opting in. Only
+    products that have winner products are queued.
+    """
+    changed = {}
+    for obj in session.dirty:
+        if isinstance(obj, Product):
+            state = inspect(obj)
+            if any(state.attrs[field].history.has_changes() for field in RESCORE_FIELDS):
+                changed[obj.id] = obj.user_id
+    
+    if changed:
+        connection = session.connection()
+        with_winners = products_with_winners(connection, list(changed))
+        if with_winners:
+            connection.execute(models.WinnerRescoreQueue.__table__.insert(), [
+                {"product_id": product_id, "user_id": user_id}
+                for product_id, user_id in changed.items() if product_id in with_winners
+            ])
+
+event.listen(Session, "after_flush", queue_changed_products)
+
+def rescore_queued_products(db: Session, batch_size: int = settings.WINNER_RESCORE_BATCH_SIZE) -> int:
+    """
+    Re-score one batch of queued products and update their winner products in bulk
+    
+    Each winner is re-scored with the detection settings of the job that
+    created it (default settings for winners created outside a job) and its
+    reasons and analysis are regenerated. Job winners whose new score falls
+    below the job's `min_score` are removed; winners the user saved
+    themselves are kept with the lower score and flagged with
+    `below_min_score` in their metadata. Returns the number of queue
+    entries consumed.
+    """
+    entries = db.query(
+        models.WinnerRescoreQueue.id,
+        models.WinnerRescoreQueue.product_id,
+        models.WinnerRescoreQueue.user_id
+    ).order_by(models.WinnerRescoreQueue.id).limit(batch_size).all()
+    
+    if not entries:
+        return 0
+    
+    # Owners queued per product; None means the change was queued without one
+    queued_users: Dict[str, set] = defaultdict(set)
+    for _, product_id, user_id in entries:
+        queued_users[product_id].add(user_id)
+    product_ids = list(queued_users)
+    
+    # winner id -> (product id, metadata, detection settings of its job, whether a job created it)
+    winners: Dict[str, Tuple[str, Optional[Dict[str, Any]], Dict[str, Any], bool]] = {}
+    rows: Dict[str, ProductRow] = {}
+    for i in range(0, len(product_ids), services.ID_CHUNK_SIZE):
+        chunk_ids = product_ids[i:i + services.ID_CHUNK_SIZE]
+        for winner_id, product_id, user_id, metadata, job_id, job_settings in db.query(
+            models.WinnerProduct.id,
+            models.WinnerProduct.product_id,
+            models.WinnerProduct.user_id,
+            models.WinnerProduct.metadata,
+            models.WinnerDetectionJob.id,
+            models.WinnerDetectionJob.settings
+        ).outerjoin(
+            models.WinnerDetectionResult, models.WinnerDetectionResult.winner_product_id == models.WinnerProduct.id
+        ).outerjoin(
+            models.WinnerDetectionJob, models.WinnerDetectionJob.id == models.WinnerDetectionResult.job_id
+        ).filter(
+            models.WinnerProduct.product_id.in_(chunk_ids)
+        ):
+            users = queued_users[product_id]
+            if None not in users and user_id not in users:
+                continue
+            detection_settings = (job_settings or {}).get("detection_settings") or {}
+            winners.setdefault(winner_id, (product_id, metadata, detection_settings, job_id is not None))
+        
+        # Only products that still have winner rows need a new score
+        chunk = set(chunk_ids)
+        scored_ids = list({product_id for product_id, *_ in winners.values() if product_id in chunk})
+        if scored_ids:
+            for values in db.query(*services.PRODUCT_ROW_COLUMNS).filter(Product.id.in_(scored_ids)):
+                row = ProductRow(*values)
+                rows[row.id] = row
+    
+    # Score the winners of each distinct detection settings as one batch
+    by_settings: Dict[str, Tuple[Dict[str, Any], List[str]]] = {}
+    for winner_id, (product_id, _, detection_settings, _) in winners.items():
+        if product_id in rows:
+            by_settings.setdefault(services.settings_hash(detection_settings), (detection_settings, []))[1].append(winner_id)
+    
+    now = datetime.utcnow()
+    updates = []
+    removed = []
+    for detection_settings, winner_ids in by_settings.values():
+        group_rows = [rows[winners[winner_id][0]] for winner_id in winner_ids]
+        noise, rngs = services.scoring_noise(group_rows, detection_settings)
+        scored = score_batch(group_rows, detection_settings, noise=noise)
+        
+        for winner_id, row, rng, score, competition_level, is_winner, margin in zip(
+            winner_ids, group_rows, rngs, scored["score"].tolist(), scored["competition_level"].tolist(),
+            scored["is_winner"].tolist(), scored["margin"].tolist()
+        ):
+            _, metadata, _, detected = winners[winner_id]
+            if not is_winner and detected:
+                removed.append(winner_id)
+                continue
+            
+            metadata = dict(metadata or {})
+            metadata["analysis"] = services.generate_analysis(row, score, competition_level, is_winner)
+            metadata["rescored_at"] = now.isoformat()
+            if is_winner:
+                metadata.pop("below_min_score", None)
+            else:
+                metadata["below_min_score"] = True
+            updates.append({
+                "id": winner_id,
+                "winner_score": score,
+                "competition_level": competition_level,
+                "profit_potential": None if math.isnan(margin) else margin,
+                "reasons": services.generate_reasons(row, score, competition_level, rng=rng),
+                "metadata": metadata,
+                "price": row.price,
+                "category": row.category,
+                "supplier": row.supplier,
+                "updated_at": now
+            })
+    
+    if updates:
+        db.bulk_update_mappings(models.WinnerProduct, updates)
+    
+    for i in range(0, len(removed), services.ID_CHUNK_SIZE):
+        chunk_ids = removed[i:i + services.ID_CHUNK_SIZE]
+        db.query(models.WinnerDetectionResult).filter(
+            models.WinnerDetectionResult.winner_product_id.in_(chunk_ids)
+        ).update({"winner_product_id": None}, synchronize_session=False)
+        db.query(models.WinnerProduct).filter(
+            models.WinnerProduct.id.in_(chunk_ids)
+        ).delete(synchronize_session=False)
+    
+    db.query(models.WinnerRescoreQueue).filter(
+        models.WinnerRescoreQueue.id.in_([entry_id for entry_id, _, _ in entries])
+    ).delete(synchronize_session=False)
+    db.commit()
+    
+    if removed:
+        logger.info(f"Removed {len(removed)} detected winner products that fell below their minimum score")
+    
+    return len(entries)
+
+class WinnerRescoreWorker:
+    """
+    Periodically drain the re-scoring queue so winner scores follow product changes
+    """
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        batch_size: int = settings.WINNER_RESCORE_BATCH_SIZE,
+        interval: int = settings.WINNER_RESCORE_INTERVAL
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.interval = interval
+        self.task: Optional[asyncio.Task] = None
+
+    def drain(self) -> int:
+        db = self.session_factory()
+        total = 0
+        try:
+            while True:
+                processed = rescore_queued_products(db, self.batch_size)
+                total += processed
+                if processed < self.batch_size:
+                    return total
+        except Exception as e:
+            logger.error(f"Error re-scoring winner products: {e}")
+            db.rollback()
+            return total
+        finally:
+            db.close()
+
+    async def run(self) -> None:
+        while True:
+            processed = await asyncio.get_running_loop().run_in_executor(None, self.drain)
+            if processed:
+                logger.info(f"Re-scored {processed} queued product changes")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_event_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+winner_rescore_worker = WinnerRescoreWorker()
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query, status
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query, Response, status
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
@@ -13,8 +13,10 @@ router = APIRouter()
 
 @router.get("/products", response_model=List[schemas.WinnerProductResponse])
 async def get_winner_products(
+    response: Response,
     limit: int = Query(10, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from the X-Next-Cursor header of the previous page"),
     category: Optional[str] = Query(None),
     competition_level: Optional[str] = Query(None),
     min_score: Optional[int] = Query(None, ge=0, le=100),
@@ -26,17 +28,26 @@ async def get_winner_products(
     """
     Get winner products for the current user
     """
-    return services.get_winner_products(
-        db, 
-        user_id=current_user.id,
-        limit=limit,
-        offset=offset,
-        category=category,
-        competition_level=competition_level,
-        min_score=min_score,
-        sort_by=sort_by,
-        sort_order=sort_order
-    )
+    try:
+        products = services.get_winner_products(
+            db, 
+            user_id=current_user.id,
+            limit=limit,
+            offset=offset,
+            category=category,
+            competition_level=competition_level,
+            min_score=min_score,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if len(products) == limit:
+        response.headers["X-Next-Cursor"] = services.encode_winner_cursor(products[-1], sort_by)
+    
+    return products
 
 @router.get("/products/{product_id}", response_model=schemas.WinnerProductDetailResponse)
 async def get_winner_product(
@@ -185,6 +196,9 @@ async def get_market_trend(
     Get market trend details
     """
     trend = services.get_market_trend(db, trend_id=trend_id, user_id=current_user.id)
+    if not trend:
+        # Check if it's a shared trend the user detected
+        trend = services.get_referenced_market_trend(db, trend_id=trend_id, user_id=current_user.id)
     if not trend:
         # Check if it's a public trend
         trend = services.get_public_market_trend(db, trend_id=trend_id)
@@ -220,7 +234,11 @@ async def delete_market_trend(
     """
     db_trend = services.get_market_trend(db, trend_id=trend_id, user_id=current_user.id)
     if not db_trend:
-        raise HTTPException(status_code=404, detail="Market trend not found")
+        # Shared detected trends are only removed from the user's trends
+        if not services.get_referenced_market_trend(db, trend_id=trend_id, user_id=current_user.id):
+            raise HTTPException(status_code=404, detail="Market trend not found")
+        services.remove_trend_reference(db, trend_id=trend_id, user_id=current_user.id)
+        return JSONResponse(status_code=status.HTTP_204_NO_CONTENT, content={})
     
     services.delete_market_trend(db, trend_id=trend_id)
     return JSONResponse(status_code=status.HTTP_204_NO_CONTENT, content={})
@@ -125,6 +125,7 @@ class WinnerDetectionSettings(BaseModel):
     min_profit_potential: Optional[float] = None
     max_competition_level: Optional[CompetitionLevel] = None
     auto_create_winners: Optional[bool] = True
+    deterministic: Optional[bool] = True  # Seed analyses by product and settings so they can be cached
 
 class WinnerDetectionCreate(BaseModel):
     product_ids: Optional[List[str]] = None
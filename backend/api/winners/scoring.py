@@ -0,0 +1,84 @@
+import numpy as np
+from typing import List, Optional, Dict, Any, NamedTuple
+
+# Heuristic inputs shared by the single-product and batch scorers
+TRENDING_CATEGORIES = ["Électronique", "Smart Home", "Fitness", "Beauty", "Eco-friendly"]
+PREMIUM_SUPPLIERS = ["BigBuy", "Spocket"]
+
+# Margin thresholds (percent) and the score bonus they earn, highest first
+MARGIN_BONUSES = [(200, 20), (150, 15), (100, 10), (50, 5)]
+
+COMPETITION_LEVELS = np.array(["low", "medium", "high"])
+COMPETITION_VALUES = {"low": 1, "medium": 2, "high": 3}
+
+class ProductRow(NamedTuple):
+    """
+    Column subset of a Product needed for scoring and winner creation
+    """
+    id: str
+    title: str
+    description: Optional[str]
+    price: Optional[float]
+    original_price: Optional[float]
+    images: Optional[List[str]]
+    supplier: Optional[str]
+    category: Optional[str]
+
+def encode(values: List[Optional[str]], members: List[str]) -> np.ndarray:
+    """
+    Return a boolean mask of which values belong to members, via category codes
+    """
+    uniques, codes = np.unique(np.array([v or "" for v in values], dtype=object), return_inverse=True)
+    return np.isin(uniques, members)[codes]
+
+def score_batch(
+    rows: List[ProductRow],
+    settings: Dict[str, Any],
+    noise: Optional[np.ndarray] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Score a batch of products with the winner heuristic as array expressions
+    
+    Mirrors `services.analyze_product` row for row; `noise` is the per-row
+    score jitter (zeros when omitted).
+    """
+    n = len(rows)
+    price = np.array([r.price or 0 for r in rows], dtype=np.float64)
+    original_price = np.array([r.original_price or 0 for r in rows], dtype=np.float64)
+    
+    has_margin = (price != 0) & (original_price != 0)
+    margin = np.full(n, np.nan)
+    np.divide((price - original_price) * 100, original_price, out=margin, where=has_margin)
+    
+    score = np.full(n, 50, dtype=np.int64)
+    score += np.select(
+        [has_margin & (margin > threshold) for threshold, _ in MARGIN_BONUSES],
+        [bonus for _, bonus in MARGIN_BONUSES],
+        0
+    )
+    
+    min_profit_potential = settings.get("min_profit_potential")
+    if min_profit_potential is not None:
+        score -= np.where(has_margin & (margin < min_profit_potential), 20, 0)
+    
+    score += np.where(encode([r.category for r in rows], TRENDING_CATEGORIES), 10, 0)
+    score += np.where(encode([r.supplier for r in rows], PREMIUM_SUPPLIERS), 5, 0)
+    
+    if noise is not None:
+        score += noise
+    
+    score = np.clip(score, 0, 100)
+    
+    # Competition level index: 0 low, 1 medium, 2 high
+    competition = np.select([score >= 80, score >= 60], [0, 1], 2)
+    
+    max_competition_level = settings.get("max_competition_level")
+    if max_competition_level:
+        score -= np.where(competition + 1 > COMPETITION_VALUES[max_competition_level], 10, 0)
+    
+    return {
+        "score": score,
+        "margin": margin,
+        "competition_level": COMPETITION_LEVELS[competition],
+        "is_winner": score >= settings.get("min_score", 70)
+    }
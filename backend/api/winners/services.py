@@ -1,20 +1,73 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc, asc
+from sqlalchemy import func, desc, asc, tuple_, literal
 from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime, timedelta
 import uuid
 import logging
 import json
 import random
+import hashlib
+import base64
+import threading
+from functools import lru_cache
+import numpy as np
 
+from config import settings as app_settings
+from cache import TTLCache
 from . import models, schemas
+from .scoring import ProductRow, score_batch, TRENDING_CATEGORIES, PREMIUM_SUPPLIERS
 from ..products.models import Product
-from ...clients.openai import OpenAIClient
 
 logger = logging.getLogger(__name__)
 
-# Initialize OpenAI client
-openai_client = OpenAIClient()
+# Memoized analyses keyed by (product fingerprint, settings hash)
+analysis_cache = TTLCache("winner_analysis", ttl=app_settings.WINNER_ANALYSIS_CACHE_TTL, maxsize=app_settings.WINNER_ANALYSIS_CACHE_SIZE)
+
+# Detected trend ids shared by all users, keyed by normalized (kind, term)
+trend_cache = TTLCache("market_trends", ttl=app_settings.MARKET_TREND_CACHE_TTL, maxsize=10000)
+
+# Striped locks so concurrent detections of a (kind, term) compute it once;
+# a fixed pool keeps memory bounded however many distinct terms are detected
+TREND_LOCK_STRIPES = 64
+_trend_locks = [threading.Lock() for _ in range(TREND_LOCK_STRIPES)]
+
+# Products scored per batch by winner detection jobs
+DETECTION_CHUNK_SIZE = 2000
+
+# Keep IN (...) lists below SQLite's bound parameter limit
+ID_CHUNK_SIZE = 500
+
+# Sort keys accepted by `get_winner_products`, each backed by a (user_id, key, id) index
+WINNER_SORT_COLUMNS = {
+    "winner_score": models.WinnerProduct.winner_score,
+    "profit_potential": models.WinnerProduct.profit_potential,
+    "created_at": models.WinnerProduct.created_at,
+}
+
+# Sort keys whose column may be NULL; those rows are listed last, by id
+NULLABLE_SORT_KEYS = {"profit_potential", "created_at"}
+
+def encode_winner_cursor(product: models.WinnerProduct, sort_by: str) -> str:
+    """
+    Build the opaque keyset cursor pointing after a winner product
+    """
+    value = getattr(product, sort_by)
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    token = json.dumps([value, product.id]).encode()
+    return base64.urlsafe_b64encode(token).decode()
+
+def decode_winner_cursor(cursor: str, sort_by: str) -> Tuple[Any, str]:
+    """
+    Decode a keyset cursor into (sort value, product id)
+    """
+    try:
+        value, product_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if sort_by == "created_at" and value is not None:
+            value = datetime.fromisoformat(value)
+    except Exception:
+        raise ValueError("Invalid cursor")
+    return value, product_id
 
 def get_winner_products(
     db: Session, 
@@ -25,11 +78,22 @@ def get_winner_products(
     competition_level: Optional[str] = None,
     min_score: Optional[int] = None,
     sort_by: str = "winner_score",
-    sort_order: str = "desc"
+    sort_order: str = "desc",
+    cursor: Optional[str] = None
 ) -> List[models.WinnerProduct]:
     """
     Get winner products for a user
+    
+    With a `cursor` (see `encode_winner_cursor`) the page starts right after
+    the referenced product and `offset` is ignored, so deep pages are read
+    straight from the sort index instead of skipping rows: the rows with a
+    value are a row-value range `(key, id) < (:value, :id)` in the index
+    order, and the rows without one, listed last, a range on id.
     """
+    column = WINNER_SORT_COLUMNS.get(sort_by)
+    if column is None:
+        raise ValueError(f"Invalid sort field: {sort_by}")
+    
     query = db.query(models.WinnerProduct).filter(models.WinnerProduct.user_id == user_id)
     
     if category:
@@ -41,15 +105,39 @@ def get_winner_products(
     if min_score is not None:
         query = query.filter(models.WinnerProduct.winner_score >= min_score)
     
-    # Apply sorting
-    if sort_order.lower() == "asc":
-        query = query.order_by(asc(getattr(models.WinnerProduct, sort_by)))
+    descending = sort_order.lower() != "asc"
+    direction = desc if descending else asc
+    nullable = sort_by in NULLABLE_SORT_KEYS
+    
+    if not cursor:
+        if offset:
+            # Offset pages: NULLs last in both directions and id as tie-breaker
+            return query.order_by(
+                direction(column).nullslast(), direction(models.WinnerProduct.id)
+            ).offset(offset).limit(limit).all()
+        value, last_id = None, None
     else:
-        query = query.order_by(desc(getattr(models.WinnerProduct, sort_by)))
-    
-    query = query.offset(offset).limit(limit)
-    
-    return query.all()
+        value, last_id = decode_winner_cursor(cursor, sort_by)
+    
+    products = []
+    if not cursor or value is not None:
+        page = query
+        if nullable:
+            page = page.filter(column.isnot(None))
+        if cursor:
+            # Bound through the column type so the value compares in the stored format
+            key, bound = tuple_(column, models.WinnerProduct.id), tuple_(literal(value, column.type), last_id)
+            page = page.filter(key < bound if descending else key > bound)
+        products = page.order_by(direction(column), direction(models.WinnerProduct.id)).limit(limit).all()
+    
+    if nullable and len(products) < limit:
+        # Continue into the trailing rows without a value
+        tail = query.filter(column.is_(None))
+        if cursor and value is None:
+            tail = tail.filter(models.WinnerProduct.id < last_id if descending else models.WinnerProduct.id > last_id)
+        products += tail.order_by(direction(models.WinnerProduct.id)).limit(limit - len(products)).all()
+    
+    return products
 
 def get_winner_product(db: Session, product_id: str, user_id: str) -> Optional[models.WinnerProduct]:
     """
@@ -172,11 +260,11 @@ def get_market_trends(
     if include_public:
         # Get both user's trends and public trends
         query = db.query(models.MarketTrend).filter(
-            (models.MarketTrend.user_id == user_id) | (models.MarketTrend.is_public == True)
+            user_trends_filter(db, user_id) | (models.MarketTrend.is_public == True)
         )
     else:
         # Get only user's trends
-        query = db.query(models.MarketTrend).filter(models.MarketTrend.user_id == user_id)
+        query = db.query(models.MarketTrend).filter(user_trends_filter(db, user_id))
     
     if category:
         query = query.filter(models.MarketTrend.category == category)
@@ -186,6 +274,15 @@ def get_market_trends(
     
     return query.all()
 
+def user_trends_filter(db: Session, user_id: str):
+    """
+    Filter matching trends owned by a user or shared trends they detected
+    """
+    referenced = db.query(models.UserTrendReference.trend_id).filter(
+        models.UserTrendReference.user_id == user_id
+    )
+    return (models.MarketTrend.user_id == user_id) | models.MarketTrend.id.in_(referenced)
+
 def get_market_trend(db: Session, trend_id: str, user_id: str) -> Optional[models.MarketTrend]:
     """
     Get a market trend by ID
@@ -195,6 +292,27 @@ def get_market_trend(db: Session, trend_id: str, user_id: str) -> Optional[model
         models.MarketTrend.user_id == user_id
     ).first()
 
+def get_referenced_market_trend(db: Session, trend_id: str, user_id: str) -> Optional[models.MarketTrend]:
+    """
+    Get a shared detected trend referenced by a user
+    """
+    return db.query(models.MarketTrend).join(
+        models.UserTrendReference, models.UserTrendReference.trend_id == models.MarketTrend.id
+    ).filter(
+        models.MarketTrend.id == trend_id,
+        models.UserTrendReference.user_id == user_id
+    ).first()
+
+def remove_trend_reference(db: Session, trend_id: str, user_id: str) -> None:
+    """
+    Remove a shared detected trend from a user's trends
+    """
+    db.query(models.UserTrendReference).filter(
+        models.UserTrendReference.trend_id == trend_id,
+        models.UserTrendReference.user_id == user_id
+    ).delete(synchronize_session=False)
+    db.commit()
+
 def get_public_market_trend(db: Session, trend_id: str) -> Optional[models.MarketTrend]:
     """
     Get a public market trend by ID
@@ -299,30 +417,37 @@ def delete_market_trend(db: Session, trend_id: str) -> None:
 def create_winner_detection_job(db: Session, detection: schemas.WinnerDetectionCreate, user_id: str) -> models.WinnerDetectionJob:
     """
     Create a new winner detection job
+    
+    For `all_products` the job only stores the selection; matching products
+    are streamed when the job is processed, so job rows stay small whatever
+    the catalog size.
     """
-    # Determine products to analyze
-    product_ids = []
+    detection_settings = detection.settings.dict() if detection.settings else {}
     
     if detection.all_products:
-        # Get all user's products
-        products = db.query(Product).filter(Product.user_id == user_id).all()
-        product_ids = [product.id for product in products]
-    elif detection.product_ids:
+        job_settings = {
+            "selection": {"all_products": True},
+            "detection_settings": detection_settings
+        }
+        total_products = 0  # Counted when processing starts
+    else:
         # Use specified product IDs
-        product_ids = detection.product_ids
+        product_ids = detection.product_ids or []
+        job_settings = {
+            "product_ids": product_ids,
+            "detection_settings": detection_settings
+        }
+        total_products = len(product_ids)
     
     # Create job
     db_job = models.WinnerDetectionJob(
         id=str(uuid.uuid4()),
         user_id=user_id,
         status="pending",
-        total_products=len(product_ids),
+        total_products=total_products,
         processed_products=0,
         winners_found=0,
-        settings={
-            "product_ids": product_ids,
-            "detection_settings": detection.settings.dict() if detection.settings else {}
-        }
+        settings=job_settings
     )
     
     db.add(db_job)
@@ -343,6 +468,11 @@ def get_winner_detection_job(db: Session, job_id: str, user_id: str) -> Optional
 def process_winner_detection_job(db: Session, job_id: str) -> None:
     """
     Process a winner detection job
+    
+    Products are loaded in chunks as plain columns (listed ids in IN
+    batches, `all_products` selections by keyset pagination), scored with
+    array expressions (see `scoring.score_batch`) and their results and
+    winner products are bulk-inserted with one commit per chunk.
     """
     job = db.query(models.WinnerDetectionJob).filter(models.WinnerDetectionJob.id == job_id).first()
     if not job:
@@ -357,63 +487,27 @@ def process_winner_detection_job(db: Session, job_id: str) -> None:
     try:
         # Get settings
         settings = job.settings.get("detection_settings", {}) if job.settings else {}
-        product_ids = job.settings.get("product_ids", []) if job.settings else []
         
-        # Process each product
-        for product_id in product_ids:
+        if job.settings and job.settings.get("selection"):
+            job.total_products = filter_detection_products(
+                db.query(func.count(Product.id)).filter(Product.user_id == job.user_id), settings
+            ).scalar()
+            db.commit()
+            batches = stream_selected_products(db, job.user_id, settings)
+        else:
+            product_ids = job.settings.get("product_ids", []) if job.settings else []
+            batches = iter_listed_products(db, product_ids, settings)
+        
+        for rows, processed in batches:
             try:
-                # Get product
-                product = db.query(Product).filter(Product.id == product_id).first()
-                if not product:
-                    logger.warning(f"Product not found: {product_id}")
-                    continue
-                
-                # Apply category filter if specified
-                if settings.get("categories") and product.category not in settings.get("categories"):
-                    continue
-                
-                # Apply supplier filter if specified
-                if settings.get("suppliers") and product.supplier not in settings.get("suppliers"):
-                    continue
-                
-                # Analyze product
-                analysis = analyze_product(product, settings)
-                
-                # Create detection result
-                result = models.WinnerDetectionResult(
-                    id=str(uuid.uuid4()),
-                    job_id=job.id,
-                    product_id=product.id,
-                    is_winner=analysis["is_winner"],
-                    score=analysis["score"],
-                    analysis=analysis["analysis"],
-                    reasons=analysis["reasons"]
-                )
-                
-                db.add(result)
-                db.commit()
-                
-                # If it's a winner and auto-create is enabled, create winner product
-                if analysis["is_winner"] and settings.get("auto_create_winners", True):
-                    winner_product = create_winner_product_from_analysis(db, product, analysis, job.user_id)
-                    
-                    # Update result with winner product ID
-                    result.winner_product_id = winner_product.id
-                    db.commit()
-                    
-                    # Increment winners found
-                    job.winners_found += 1
-                
-                # Increment processed products
-                job.processed_products += 1
-                db.commit()
-                
+                job.winners_found += score_and_store_products(db, job, rows, settings)
             except Exception as e:
-                logger.error(f"Error processing product {product_id}: {e}")
-                
-                # Increment processed products
-                job.processed_products += 1
-                db.commit()
+                logger.error(f"Error processing a batch of {len(rows)} products: {e}")
+                db.rollback()
+            
+            # Increment processed products
+            job.processed_products += processed
+            db.commit()
         
         # Update job status
         job.status = "completed"
@@ -429,9 +523,186 @@ def process_winner_detection_job(db: Session, job_id: str) -> None:
         job.completed_at = datetime.utcnow()
         db.commit()
 
+def filter_detection_products(query, settings: Dict[str, Any]):
+    """
+    Apply the category and supplier filters of detection settings to a product query
+    """
+    if settings.get("categories"):
+        query = query.filter(Product.category.in_(settings.get("categories")))
+    
+    if settings.get("suppliers"):
+        query = query.filter(Product.supplier.in_(settings.get("suppliers")))
+    
+    return query
+
+def stream_selected_products(db: Session, user_id: str, settings: Dict[str, Any]):
+    """
+    Yield (rows, processed count) batches of a user's matching products by keyset pagination on id
+    """
+    last_id = None
+    while True:
+        query = filter_detection_products(
+            db.query(*PRODUCT_ROW_COLUMNS).filter(Product.user_id == user_id), settings
+        )
+        if last_id is not None:
+            query = query.filter(Product.id > last_id)
+        
+        rows = [ProductRow(*row) for row in query.order_by(Product.id).limit(DETECTION_CHUNK_SIZE)]
+        if not rows:
+            return
+        
+        yield rows, len(rows)
+        last_id = rows[-1].id
+
+def iter_listed_products(db: Session, product_ids: List[str], settings: Dict[str, Any]):
+    """
+    Yield (rows, processed count) batches of explicitly listed products
+    """
+    for i in range(0, len(product_ids), ID_CHUNK_SIZE):
+        chunk_ids = product_ids[i:i + ID_CHUNK_SIZE]
+        query = filter_detection_products(db.query(*PRODUCT_ROW_COLUMNS).filter(Product.id.in_(chunk_ids)), settings)
+        yield [ProductRow(*row) for row in query], len(chunk_ids)
+
+def settings_hash(settings: Dict[str, Any]) -> str:
+    """
+    Stable hash of detection settings
+    """
+    return hashlib.sha1(json.dumps(settings or {}, sort_keys=True, default=str).encode()).hexdigest()
+
+def product_fingerprint(product: Product) -> str:
+    """
+    Hash of the product attributes the analysis depends on
+    """
+    key = f"{product.id}|{product.price}|{product.original_price}|{product.category}|{product.supplier}"
+    return hashlib.sha1(key.encode()).hexdigest()
+
+def analysis_rng(product_id: str, settings_key: str, deterministic: bool = True) -> random.Random:
+    """
+    Random source of one product analysis, seeded by product and settings in deterministic mode
+    """
+    if not deterministic:
+        return random.Random()
+    return random.Random(int(hashlib.sha1(f"{product_id}|{settings_key}".encode()).hexdigest()[:16], 16))
+
+def scoring_noise(rows: List[ProductRow], settings: Dict[str, Any]) -> Tuple[np.ndarray, List[random.Random]]:
+    """
+    Per-product score jitter for batch scoring, plus the random source to continue each analysis with
+    """
+    settings_key = settings_hash(settings)
+    deterministic = settings.get("deterministic", True)
+    rngs = [analysis_rng(row.id, settings_key, deterministic) for row in rows]
+    
+    # Randomize a bit to simulate AI variability
+    return np.array([rng.randint(-5, 5) for rng in rngs], dtype=np.int64), rngs
+
+PRODUCT_ROW_COLUMNS = (
+    Product.id,
+    Product.title,
+    Product.description,
+    Product.price,
+    Product.original_price,
+    Product.images,
+    Product.supplier,
+    Product.category
+)
+
+def score_and_store_products(
+    db: Session,
+    job: models.WinnerDetectionJob,
+    rows: List[ProductRow],
+    settings: Dict[str, Any]
+) -> int:
+    """
+    Score a batch of products and bulk-insert detection results and winners
+    
+    Returns the number of winners found (the caller commits).
+    """
+    if not rows:
+        return 0
+    
+    settings_key = settings_hash(settings)
+    deterministic = settings.get("deterministic", True)
+    auto_create = settings.get("auto_create_winners", True)
+    
+    # Reuse memoized analyses of unchanged products
+    analyses = {}
+    fingerprints = {row.id: product_fingerprint(row) for row in rows}
+    if deterministic:
+        for row in rows:
+            cached = analysis_cache.get((fingerprints[row.id], settings_key))
+            if cached is not None:
+                analyses[row.id] = cached
+    
+    pending = [row for row in rows if row.id not in analyses]
+    if pending:
+        noise, rngs = scoring_noise(pending, settings)
+        scored = score_batch(pending, settings, noise=noise)
+        
+        for row, rng, score, competition_level, is_winner in zip(
+            pending, rngs, scored["score"].tolist(), scored["competition_level"].tolist(), scored["is_winner"].tolist()
+        ):
+            analysis = {
+                "is_winner": is_winner,
+                "score": score,
+                "analysis": generate_analysis(row, score, competition_level, is_winner),
+                "reasons": generate_reasons(row, score, competition_level, rng=rng),
+                "competition_level": competition_level
+            }
+            analyses[row.id] = analysis
+            if deterministic:
+                analysis_cache.set((fingerprints[row.id], settings_key), analysis)
+    
+    results = []
+    winners = []
+    winners_found = 0
+    
+    for row in rows:
+        analysis = analyses[row.id]
+        is_winner = analysis["is_winner"]
+        winners_found += is_winner
+        
+        winner_product_id = None
+        if is_winner and auto_create:
+            winner = winner_product_values(row, analysis, job.user_id)
+            winners.append(winner)
+            winner_product_id = winner["id"]
+        
+        results.append({
+            "id": str(uuid.uuid4()),
+            "job_id": job.id,
+            "product_id": row.id,
+            "is_winner": is_winner,
+            "score": analysis["score"],
+            "analysis": analysis["analysis"],
+            "reasons": analysis["reasons"],
+            "winner_product_id": winner_product_id
+        })
+    
+    if winners:
+        db.bulk_insert_mappings(models.WinnerProduct, winners)
+    db.bulk_insert_mappings(models.WinnerDetectionResult, results)
+    
+    return winners_found
+
 def analyze_product(product: Product, settings: Dict[str, Any]) -> Dict[str, Any]:
     """
     Analyze a product for winner potential
+    
+    In deterministic mode (the default, `settings["deterministic"]`) the
+    result only depends on the product and the settings, so it is memoized.
+    """
+    settings_key = settings_hash(settings)
+    if not settings.get("deterministic", True):
+        return compute_product_analysis(product, settings, analysis_rng(product.id, settings_key, deterministic=False))
+    
+    return analysis_cache.get_or_load(
+        (product_fingerprint(product), settings_key),
+        lambda: compute_product_analysis(product, settings, analysis_rng(product.id, settings_key))
+    )
+
+def compute_product_analysis(product: Product, settings: Dict[str, Any], rng: random.Random) -> Dict[str, Any]:
+    """
+    Compute the winner analysis of a product
     """
     # In a real implementation, this would use AI to analyze the product
     # For now, we'll use a simple heuristic
@@ -460,17 +731,15 @@ def analyze_product(product: Product, settings: Dict[str, Any]) -> Dict[str, Any
             base_score -= 20
     
     # Adjust score based on category
-    trending_categories = ["Électronique", "Smart Home", "Fitness", "Beauty", "Eco-friendly"]
-    if product.category in trending_categories:
+    if product.category in TRENDING_CATEGORIES:
         base_score += 10
     
     # Adjust score based on supplier
-    premium_suppliers = ["BigBuy", "Spocket"]
-    if product.supplier in premium_suppliers:
+    if product.supplier in PREMIUM_SUPPLIERS:
         base_score += 5
     
     # Randomize a bit to simulate AI variability
-    base_score += random.randint(-5, 5)
+    base_score += rng.randint(-5, 5)
     
     # Ensure score is within bounds
     score = max(0, min(100, base_score))
@@ -489,7 +758,7 @@ def analyze_product(product: Product, settings: Dict[str, Any]) -> Dict[str, Any
         score -= 10
     
     # Generate reasons
-    reasons = generate_reasons(product, score, competition_level)
+    reasons = generate_reasons(product, score, competition_level, rng=rng)
     
     # Determine if it's a winner
     min_score = settings.get("min_score", 70)
@@ -517,7 +786,7 @@ def competition_level_value(level: str) -> int:
     else:  # high
         return 3
 
-def generate_reasons(product: Product, score: int, competition_level: str) -> List[str]:
+def generate_reasons(product: Product, score: int, competition_level: str, rng: Optional[random.Random] = None) -> List[str]:
     """
     Generate reasons for winner score
     """
@@ -563,8 +832,9 @@ def generate_reasons(product: Product, score: int, competition_level: str) -> Li
     ]
     
     # Add 2-3 random reasons
-    num_random = random.randint(2, 3)
-    random_reasons = random.sample(potential_reasons, num_random)
+    rng = rng or random
+    num_random = rng.randint(2, 3)
+    random_reasons = rng.sample(potential_reasons, num_random)
     reasons.extend(random_reasons)
     
     return reasons
@@ -573,6 +843,13 @@ def generate_analysis(product: Product, score: int, competition_level: str, is_w
     """
     Generate analysis text
     """
+    return analysis_text(score, competition_level, is_winner)
+
+@lru_cache(maxsize=1024)
+def analysis_text(score: int, competition_level: str, is_winner: bool) -> Optional[str]:
+    """
+    Build the analysis text for a score (only depends on its arguments, so it is memoized)
+    """
     if is_winner:
         if score >= 90:
             return f"Ce produit a un potentiel exceptionnel avec un score de {score}/100. La combinaison d'une marge élevée, d'une demande forte et d'une concurrence {competition_level} en fait un excellent candidat pour votre boutique. Nous recommandons de l'ajouter immédiatement à votre catalogue et de commencer à le promouvoir."
@@ -597,6 +874,18 @@ def create_winner_product_from_analysis(
     """
     Create a winner product from analysis results
     """
+    db_product = models.WinnerProduct(**winner_product_values(product, analysis, user_id))
+    
+    db.add(db_product)
+    db.commit()
+    db.refresh(db_product)
+    
+    return db_product
+
+def winner_product_values(product: Product, analysis: Dict[str, Any], user_id: str) -> Dict[str, Any]:
+    """
+    Build the column values of a winner product from analysis results
+    """
     # Calculate profit potential
     profit_potential = None
     if product.price is not None and product.original_price is not None and product.original_price > 0:
@@ -616,35 +905,28 @@ def create_winner_product_from_analysis(
         "tiktok": random.randint(3000, 15000)
     }
     
-    # Create winner product
-    db_product = models.WinnerProduct(
-        id=str(uuid.uuid4()),
-        user_id=user_id,
-        product_id=product.id,
-        title=product.title,
-        description=product.description,
-        price=product.price,
-        images=product.images,
-        supplier=product.supplier,
-        category=product.category,
-        winner_score=analysis["score"],
-        reasons=analysis["reasons"],
-        market_trends=generate_market_trends(product.category),
-        competition_level=analysis["competition_level"],
-        profit_potential=profit_potential,
-        social_proof=social_proof,
-        ad_spend=ad_spend,
-        metadata={
+    return {
+        "id": str(uuid.uuid4()),
+        "user_id": user_id,
+        "product_id": product.id,
+        "title": product.title,
+        "description": product.description,
+        "price": product.price,
+        "images": product.images,
+        "supplier": product.supplier,
+        "category": product.category,
+        "winner_score": analysis["score"],
+        "reasons": analysis["reasons"],
+        "market_trends": generate_market_trends(product.category),
+        "competition_level": analysis["competition_level"],
+        "profit_potential": profit_potential,
+        "social_proof": social_proof,
+        "ad_spend": ad_spend,
+        "metadata": {
             "analysis": analysis["analysis"],
             "detection_date": datetime.utcnow().isoformat()
         }
-    )
-    
-    db.add(db_product)
-    db.commit()
-    db.refresh(db_product)
-    
-    return db_product
+    }
 
 def generate_market_trends(category: Optional[str]) -> List[str]:
     """
@@ -761,55 +1043,154 @@ def analyze_product_winner_potential(db: Session, product_id: str, user_id: str)
 def detect_market_trends(db: Session, detection: schemas.TrendDetectionCreate, user_id: str) -> List[models.MarketTrend]:
     """
     Detect market trends
+    
+    Trends are computed once per normalized (kind, term) and stored as shared
+    rows; each user only gets references to them, so identical detections
+    from many users reuse the same computation and rows until the TTL expires.
     """
     # In a real implementation, this would use AI to analyze market data
     # For now, we'll return mock trends
     
-    trends = []
+    lookups = []
     
     # Generate trends based on niche or categories
     if detection.niche:
-        trends.extend(generate_trends_for_niche(detection.niche, detection.max_results or 5))
+        lookups.append(("niche", detection.niche, detection.max_results or 5))
     
     if detection.categories:
         for category in detection.categories:
-            trends.extend(generate_trends_for_category(category, (detection.max_results or 10) // len(detection.categories)))
+            lookups.append(("category", category, (detection.max_results or 10) // len(detection.categories)))
     
     if detection.keywords:
         for keyword in detection.keywords:
-            trends.extend(generate_trends_for_keyword(keyword, (detection.max_results or 10) // len(detection.keywords)))
+            lookups.append(("keyword", keyword, (detection.max_results or 10) // len(detection.keywords)))
     
     # If no specific inputs, generate general trends
     if not detection.niche and not detection.categories and not detection.keywords:
-        trends.extend(generate_general_trends(detection.max_results or 10))
-    
-    # Create trend objects
-    db_trends = []
-    for trend_data in trends:
-        db_trend = models.MarketTrend(
-            id=str(uuid.uuid4()),
-            user_id=user_id,
-            name=trend_data["name"],
-            description=trend_data["description"],
-            category=trend_data["category"],
-            growth_rate=trend_data["growth_rate"],
-            competition_level=trend_data["competition_level"],
-            opportunity_score=trend_data["opportunity_score"],
-            related_keywords=trend_data["related_keywords"],
-            seasonal=trend_data["seasonal"],
-            season_start=trend_data["season_start"],
-            season_end=trend_data["season_end"],
-            source="ai_detection",
-            is_public=False
+        lookups.append(("general", "", detection.max_results or 10))
+    
+    trend_ids = []
+    for kind, term, count in lookups:
+        if count > 0:
+            trend_ids.extend(get_shared_trend_ids(db, kind, term, count))
+    trend_ids = list(dict.fromkeys(trend_ids))
+    
+    if not trend_ids:
+        return []
+    
+    # Reference the shared trends from the user's trends
+    existing = {
+        row.trend_id for row in db.query(models.UserTrendReference.trend_id).filter(
+            models.UserTrendReference.user_id == user_id,
+            models.UserTrendReference.trend_id.in_(trend_ids)
         )
+    }
+    db.bulk_insert_mappings(models.UserTrendReference, [
+        {"user_id": user_id, "trend_id": trend_id}
+        for trend_id in trend_ids if trend_id not in existing
+    ])
+    db.commit()
+    
+    trends = {
+        trend.id: trend
+        for trend in db.query(models.MarketTrend).filter(models.MarketTrend.id.in_(trend_ids))
+    }
+    return [trends[trend_id] for trend_id in trend_ids if trend_id in trends]
+
+def normalize_trend_term(term: str) -> str:
+    """
+    Normalize a trend term for cache keys (case and whitespace insensitive)
+    """
+    return " ".join(term.split()).lower()
+
+def get_trend_lock(key: Tuple[str, str]) -> threading.Lock:
+    """
+    Get the lock coalescing detections of a (kind, term)
+    
+    Terms hashing to the same stripe share a lock, which only serializes
+    their detections.
+    """
+    return _trend_locks[hash(key) % TREND_LOCK_STRIPES]
+
+def get_shared_trend_ids(db: Session, kind: str, term: str, count: int) -> List[str]:
+    """
+    Get the ids of the shared trends for a (kind, term), computing them at most once per TTL
+    
+    Looks in the process cache, then for fresh shared rows in the database
+    (written by another worker), and only then generates and stores new ones.
+    """
+    key = (kind, normalize_trend_term(term))
+    
+    trend_ids = trend_cache.get(key)
+    if trend_ids is not None and len(trend_ids) >= count:
+        return trend_ids[:count]
+    
+    with get_trend_lock(key):
+        # A concurrent detection of the same term may have filled the cache while we waited
+        trend_ids = trend_cache.get(key)
+        if trend_ids is not None and len(trend_ids) >= count:
+            return trend_ids[:count]
         
-        db.add(db_trend)
-        db.commit()
-        db.refresh(db_trend)
+        trend_key = f"{kind}:{key[1]}"
+        cutoff = datetime.utcnow() - timedelta(seconds=trend_cache.ttl)
+        trend_ids = [
+            row.id for row in db.query(models.MarketTrend.id).filter(
+                models.MarketTrend.trend_key == trend_key,
+                models.MarketTrend.user_id.is_(None),
+                models.MarketTrend.created_at >= cutoff
+            ).order_by(models.MarketTrend.created_at.desc(), models.MarketTrend.id).limit(count)
+        ]
         
-        db_trends.append(db_trend)
+        if len(trend_ids) < count:
+            trend_ids = store_shared_trends(db, trend_key, generate_trends(kind, term, count))
+        
+        trend_cache.set(key, trend_ids)
+    
+    return trend_ids[:count]
+
+def generate_trends(kind: str, term: str, count: int) -> List[Dict[str, Any]]:
+    """
+    Generate trends for a detection kind
+    """
+    if kind == "category":
+        return generate_trends_for_category(term, count)
+    if kind == "keyword":
+        return generate_trends_for_keyword(term, count)
+    if kind == "niche":
+        return generate_trends_for_niche(term, count)
+    return generate_general_trends(count)
+
+def store_shared_trends(db: Session, trend_key: str, trends: List[Dict[str, Any]]) -> List[str]:
+    """
+    Insert detected trends as shared rows (no owner) and return their ids
+    
+    Committed right away so detections waiting on the same term in other
+    sessions can reference them.
+    """
+    rows = [
+        {
+            "id": str(uuid.uuid4()),
+            "user_id": None,
+            "name": trend_data["name"],
+            "description": trend_data["description"],
+            "category": trend_data["category"],
+            "growth_rate": trend_data["growth_rate"],
+            "competition_level": trend_data["competition_level"],
+            "opportunity_score": trend_data["opportunity_score"],
+            "related_keywords": trend_data["related_keywords"],
+            "seasonal": trend_data["seasonal"],
+            "season_start": trend_data.get("season_start"),
+            "season_end": trend_data.get("season_end"),
+            "source": "ai_detection",
+            "is_public": False,
+            "trend_key": trend_key
+        }
+        for trend_data in trends
+    ]
+    db.bulk_insert_mappings(models.MarketTrend, rows)
+    db.commit()
     
-    return db_trends
+    return [row["id"] for row in rows]
 
 def generate_trends_for_niche(niche: str, count: int) -> List[Dict[str, Any]]:
     """
@@ -985,39 +1366,45 @@ def get_winner_stats(db: Session, user_id: str) -> Dict[str, Any]:
     """
     Get winner statistics
     """
-    # Get total winners
-    total_winners = db.query(models.WinnerProduct).filter(models.WinnerProduct.user_id == user_id).count()
-    
-    # Get average score
-    average_score_result = db.query(func.avg(models.WinnerProduct.winner_score)).filter(
-        models.WinnerProduct.user_id == user_id
-    ).scalar()
-    average_score = float(average_score_result) if average_score_result else 0
-    
-    # Get winners by competition level
-    by_competition_level = {}
-    for level in models.CompetitionLevel:
-        count = db.query(models.WinnerProduct).filter(
-            models.WinnerProduct.user_id == user_id,
-            models.WinnerProduct.competition_level == level
-        ).count()
-        by_competition_level[level] = count
-    
-    # Get winners by category
-    category_counts = db.query(
+    # Count and score winners per (competition level, category) in one grouped query
+    groups = db.query(
+        models.WinnerProduct.competition_level,
         models.WinnerProduct.category,
-        func.count(models.WinnerProduct.id).label('count')
+        func.count(models.WinnerProduct.id),
+        func.sum(models.WinnerProduct.winner_score)
     ).filter(
-        models.WinnerProduct.user_id == user_id,
-        models.WinnerProduct.category.isnot(None)
-    ).group_by(models.WinnerProduct.category).all()
+        models.WinnerProduct.user_id == user_id
+    ).group_by(
+        models.WinnerProduct.competition_level,
+        models.WinnerProduct.category
+    ).all()
+    
+    total_winners = 0
+    total_score = 0
+    by_competition_level = {level: 0 for level in models.CompetitionLevel}
+    by_category = {}
+    
+    for competition_level, category, count, score_sum in groups:
+        total_winners += count
+        total_score += score_sum or 0
+        
+        if competition_level is not None:
+            by_competition_level[competition_level] = by_competition_level.get(competition_level, 0) + count
+        
+        if category is not None:
+            by_category[category] = by_category.get(category, 0) + count
     
-    by_category = {category: count for category, count in category_counts}
+    average_score = float(total_score) / total_winners if total_winners else 0
     
     # Get top trends
     top_trends = []
-    trends = db.query(models.MarketTrend).filter(
-        (models.MarketTrend.user_id == user_id) | (models.MarketTrend.is_public == True)
+    trends = db.query(
+        models.MarketTrend.id,
+        models.MarketTrend.name,
+        models.MarketTrend.opportunity_score,
+        models.MarketTrend.growth_rate
+    ).filter(
+        user_trends_filter(db, user_id) | (models.MarketTrend.is_public == True)
     ).order_by(models.MarketTrend.opportunity_score.desc()).limit(5).all()
     
     for trend in trends:
@@ -1030,7 +1417,13 @@ def get_winner_stats(db: Session, user_id: str) -> Dict[str, Any]:
     
     # Get recent winners
     recent_winners = []
-    winners = db.query(models.WinnerProduct).filter(
+    winners = db.query(
+        models.WinnerProduct.id,
+        models.WinnerProduct.title,
+        models.WinnerProduct.winner_score,
+        models.WinnerProduct.profit_potential,
+        models.WinnerProduct.created_at
+    ).filter(
         models.WinnerProduct.user_id == user_id
     ).order_by(models.WinnerProduct.created_at.desc()).limit(5).all()
     
@@ -0,0 +1,58 @@
+"""
+Chatbot time-to-first-byte benchmark against the local fake LLM server.
+
+Compares a blocking chat completion with a streamed one through the LLM
+gateway, as used by the support chatbot endpoints, and reports time to
+first byte and total time:
+
+    python -m benchmarks.chatbot_stream --requests 50 --first-token-ms 200 --token-ms 15 --words 200
+"""
+import argparse
+import statistics
+import time
+from typing import List, Tuple
+
+from llm import LLMGateway
+from benchmarks.fake_llm import FakeLLMServer, FakeLLMClient
+
+def measure(gateway: LLMGateway, index: int, stream: bool) -> Tuple[float, float]:
+    messages = [
+        {"role": "system", "content": "You are a helpful assistant for DropFlow Pro."},
+        {"role": "user", "content": f"How do I import product {index} from AliExpress?"}
+    ]
+    start = time.perf_counter()
+    if not stream:
+        gateway.generate_chat_completion(messages, feature="bench", use_cache=False)
+        elapsed = time.perf_counter() - start
+        return elapsed, elapsed
+    
+    first_byte = None
+    for _ in gateway.stream_chat_completion(messages, feature="bench", use_cache=False):
+        if first_byte is None:
+            first_byte = time.perf_counter() - start
+    return first_byte, time.perf_counter() - start
+
+def report(label: str, timings: List[Tuple[float, float]]) -> None:
+    first_bytes = [first for first, _ in timings]
+    totals = [total for _, total in timings]
+    print(
+        f"{label:>9}  ttfb p50 {statistics.median(first_bytes) * 1000:7.1f} ms  "
+        f"total p50 {statistics.median(totals) * 1000:7.1f} ms"
+    )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Chatbot streaming time-to-first-byte benchmark")
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--first-token-ms", type=float, default=200)
+    parser.add_argument("--token-ms", type=float, default=15)
+    parser.add_argument("--words", type=int, default=200)
+    args = parser.parse_args()
+    
+    server = FakeLLMServer(first_token_ms=args.first_token_ms, token_ms=args.token_ms, words=args.words).start()
+    gateway = LLMGateway(client=FakeLLMClient(server.url))
+    
+    try:
+        report("blocking", [measure(gateway, index, stream=False) for index in range(args.requests)])
+        report("streamed", [measure(gateway, index, stream=True) for index in range(args.requests)])
+    finally:
+        server.stop()
@@ -0,0 +1,172 @@
+"""
+Local fake of the OpenAI completion APIs.
+
+Answers `POST /v1/completions` and `POST /v1/chat/completions` with
+deterministic text after a configurable time to first token and per-token
+delay, so LLM call paths can be tested and benchmarked offline:
+
+    python -m benchmarks.fake_llm --port 8901 --first-token-ms 300 --token-ms 15
+"""
+import argparse
+import hashlib
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List
+import logging
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+PACKED_PATTERN = re.compile(r"Answer each of the (\d+) numbered prompts")
+
+def fake_answer(prompt: str, words: int) -> str:
+    """
+    Stable pseudo-answer for a prompt
+    """
+    digest = hashlib.md5(prompt.encode()).hexdigest()
+    return " ".join(f"w{digest[i % 32]}{i}" for i in range(words))
+
+def build_response_text(prompt: str, words: int) -> str:
+    # Packed requests (see llm.build_packed_prompt) get one answer per prompt
+    match = PACKED_PATTERN.search(prompt)
+    if match:
+        parts = prompt.split("### Prompt ")[1:]
+        return json.dumps([fake_answer(part, words) for part in parts[:int(match.group(1))]])
+    return fake_answer(prompt, words)
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug(format % args)
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        server = self.server
+        
+        if self.path == "/v1/chat/completions":
+            prompt = "\n".join(message["content"] for message in payload.get("messages", []))
+        elif self.path == "/v1/completions":
+            prompt = payload.get("prompt", "")
+        else:
+            self.send_error(404)
+            return
+        
+        with server.lock:
+            server.stats["requests"] += 1
+            server.stats["prompt_tokens"] += max(1, len(prompt) // 4)
+        
+        text = build_response_text(prompt, server.words)
+        tokens = re.findall(r"\S+\s*", text)
+        time.sleep(server.first_token_ms / 1000)
+        
+        if payload.get("stream"):
+            self.stream(tokens, chat=self.path == "/v1/chat/completions")
+            return
+        
+        time.sleep(server.token_ms * len(tokens) / 1000)
+        choice = {"message": {"role": "assistant", "content": text}} if self.path == "/v1/chat/completions" else {"text": text}
+        body = json.dumps({"choices": [choice], "usage": {"completion_tokens": len(tokens)}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def stream(self, tokens: List[str], chat: bool) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        for token in tokens:
+            choice = {"delta": {"content": token}} if chat else {"text": token}
+            self.wfile.write(f"data: {json.dumps({'choices': [choice]})}\n\n".encode())
+            self.wfile.flush()
+            time.sleep(self.server.token_ms / 1000)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+        self.close_connection = True
+
+class FakeLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, first_token_ms: float = 0,
+                 token_ms: float = 0, words: int = 40):
+        super().__init__((host, port), FakeLLMHandler)
+        self.first_token_ms = first_token_ms
+        self.token_ms = token_ms
+        self.words = words
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "prompt_tokens": 0}
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeLLMServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+class FakeLLMClient:
+    """
+    Drop-in for `OpenAIClient` talking to the fake server
+    """
+    def __init__(self, base_url: str, pool_size: int = 32):
+        self.base_url = base_url
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+
+    def generate_completion(self, prompt: str) -> str:
+        response = self.session.post(f"{self.base_url}/v1/completions", json={"prompt": prompt}, timeout=60)
+        response.raise_for_status()
+        return response.json()["choices"][0]["text"]
+
+    def generate_chat_completion(self, messages: List[Dict[str, Any]]) -> str:
+        response = self.session.post(f"{self.base_url}/v1/chat/completions", json={"messages": messages}, timeout=60)
+        response.raise_for_status()
+        return response.json()["choices"][0]["message"]["content"]
+
+    def stream_chat_completion(self, messages: List[Dict[str, Any]]) -> Iterator[str]:
+        response = self.session.post(
+            f"{self.base_url}/v1/chat/completions",
+            json={"messages": messages, "stream": True},
+            stream=True,
+            timeout=60
+        )
+        response.raise_for_status()
+        for line in response.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data: "):
+                continue
+            data = line[len("data: "):]
+            if data == "[DONE]":
+                break
+            content = json.loads(data)["choices"][0]["delta"].get("content")
+            if content:
+                yield content
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local fake OpenAI completion server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8901)
+    parser.add_argument("--first-token-ms", type=float, default=300)
+    parser.add_argument("--token-ms", type=float, default=15)
+    parser.add_argument("--words", type=int, default=40)
+    args = parser.parse_args()
+    
+    server = FakeLLMServer(args.host, args.port, args.first_token_ms, args.token_ms, args.words)
+    print(f"Fake LLM listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,78 @@
+"""
+LLM gateway benchmark against the local fake LLM server.
+
+Sends a workload of short prompts (with a share of repeats, as when many
+merchants ask the same question) from concurrent threads, once straight to
+the client and once through `LLMGateway` with packing and caching, and
+reports throughput, p50/p95 latency and requests reaching the model:
+
+    python -m benchmarks.llm_gateway --prompts 2000 --workers 32 --repeat-ratio 0.3
+"""
+import argparse
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+
+from llm import LLMGateway
+from benchmarks.fake_llm import FakeLLMServer, FakeLLMClient
+
+def build_workload(size: int, repeat_ratio: float, seed: int = 42) -> List[str]:
+    rng = random.Random(seed)
+    prompts = []
+    for index in range(size):
+        if prompts and rng.random() < repeat_ratio:
+            prompts.append(rng.choice(prompts))
+        else:
+            prompts.append(f"Classify the following query into one category.\nQuery: question {index} about order tracking\nCategory:")
+    return prompts
+
+def run(label: str, complete: Callable[[str], str], prompts: List[str], workers: int, server: FakeLLMServer) -> None:
+    def timed(prompt: str) -> float:
+        start = time.perf_counter()
+        complete(prompt)
+        return time.perf_counter() - start
+    
+    requests_before = server.stats["requests"]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        latencies = sorted(executor.map(timed, prompts))
+    elapsed = time.perf_counter() - start
+    
+    print(
+        f"{label:>8} n={len(prompts):<6} {len(prompts) / elapsed:8.1f} prompts/s  "
+        f"p50 {statistics.median(latencies) * 1000:7.1f} ms  "
+        f"p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:7.1f} ms  "
+        f"{server.stats['requests'] - requests_before:6d} LLM requests"
+    )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="LLM gateway packing and caching benchmark")
+    parser.add_argument("--prompts", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--repeat-ratio", type=float, default=0.3)
+    parser.add_argument("--first-token-ms", type=float, default=200)
+    parser.add_argument("--token-ms", type=float, default=2)
+    parser.add_argument("--pack-size", type=int, default=8)
+    parser.add_argument("--max-concurrency", type=int, default=8)
+    args = parser.parse_args()
+    
+    server = FakeLLMServer(first_token_ms=args.first_token_ms, token_ms=args.token_ms, words=5).start()
+    client = FakeLLMClient(server.url, pool_size=args.workers)
+    prompts = build_workload(args.prompts, args.repeat_ratio)
+    
+    try:
+        run("direct", client.generate_completion, prompts, args.workers, server)
+        
+        gateway = LLMGateway(client=client, max_concurrency=args.max_concurrency, pack_size=args.pack_size)
+        run("gateway", lambda prompt: gateway.generate_completion(prompt, feature="bench", pack=True), prompts, args.workers, server)
+        
+        metrics = gateway.metrics()["features"]["bench"]
+        print(
+            f"gateway: {metrics['llm_calls']} calls, {metrics['packed_prompts']} packed prompts, "
+            f"hit rate {metrics['cache_hit_rate']:.2f}, "
+            f"{metrics['prompt_tokens']} prompt / {metrics['completion_tokens']} completion tokens"
+        )
+    finally:
+        server.stop()
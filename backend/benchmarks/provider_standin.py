@@ -0,0 +1,225 @@
+"""
+Local stand-in for the 17TRACK and AfterShip tracking APIs.
+
+Serves deterministic tracking data over HTTP with configurable latency,
+rate limiting and error injection, so the tracking refresh path can be
+load-tested without network access:
+
+    python -m benchmarks.provider_standin --port 8900 --latency-ms 80 --error-rate 0.01
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+import logging
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Fixed reference time so repeated polls return identical payloads
+BASE_TIME = datetime(2026, 1, 1)
+
+STATUS_FLOW = ["info_received", "in_transit", "in_transit", "out_for_delivery", "delivered"]
+
+def build_events(tracking_number: str, max_events: int = 60) -> List[Dict[str, Any]]:
+    """
+    Build a stable event history for a tracking number (most recent first)
+    """
+    seed = int(hashlib.md5(tracking_number.encode()).hexdigest(), 16)
+    count = 1 + seed % max_events
+    start = BASE_TIME - timedelta(days=seed % 30)
+    
+    events = []
+    for index in range(count):
+        status = STATUS_FLOW[min(index * len(STATUS_FLOW) // count, len(STATUS_FLOW) - 1)]
+        if index == count - 1 and seed % 7 == 0:
+            status = "exception"
+        events.append({
+            "status": status,
+            "status_description": status.replace("_", " ").capitalize(),
+            "location": f"Hub {(seed >> index) % 97}",
+            "timestamp": (start + timedelta(hours=6 * index)).isoformat(),
+            "message": f"Scan {index + 1}"
+        })
+    events.reverse()
+    return events
+
+class RateLimiter:
+    """
+    Token bucket shared by all request threads
+    """
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def allow(self) -> bool:
+        if self.rate <= 0:
+            return True
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug(format % args)
+
+    def send_json(self, status: int, payload: Any) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def simulate(self) -> bool:
+        """
+        Apply latency, rate limiting and error injection; False if the request was rejected
+        """
+        server = self.server
+        server.stats["requests"] += 1
+        
+        if not server.rate_limiter.allow():
+            server.stats["rate_limited"] += 1
+            self.send_json(429, {"code": 429, "message": "Too many requests"})
+            return False
+        
+        if server.latency_ms:
+            time.sleep(max(0, random.gauss(server.latency_ms, server.latency_ms * 0.2)) / 1000)
+        
+        if server.error_rate and random.random() < server.error_rate:
+            server.stats["errors"] += 1
+            self.send_json(500, {"code": 500, "message": "Internal error"})
+            return False
+        
+        return True
+
+    def do_POST(self) -> None:
+        # 17TRACK: POST /track/v2/gettrackinfo  [{"number": "..."}]
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = json.loads(self.rfile.read(length) or b"[]")
+        
+        if self.path != "/track/v2/gettrackinfo":
+            self.send_json(404, {"code": 404, "message": "Not found"})
+            return
+        if not self.simulate():
+            return
+        
+        accepted = [
+            {"number": item["number"], "track_info": {"tracking": {"providers": [{"events": build_events(item["number"])}]}}}
+            for item in payload
+        ]
+        self.send_json(200, {"code": 0, "data": {"accepted": accepted, "rejected": []}})
+
+    def do_GET(self) -> None:
+        # AfterShip: GET /v4/trackings/{slug}/{tracking_number}
+        parts = self.path.strip("/").split("/")
+        if len(parts) != 4 or parts[:2] != ["v4", "trackings"]:
+            self.send_json(404, {"meta": {"code": 404}})
+            return
+        if not self.simulate():
+            return
+        
+        events = build_events(parts[3])
+        self.send_json(200, {
+            "meta": {"code": 200},
+            "data": {"tracking": {
+                "tracking_number": parts[3],
+                "slug": parts[2],
+                "tag": events[0]["status"],
+                "checkpoints": [
+                    {"tag": e["status"], "message": e["message"], "location": e["location"], "checkpoint_time": e["timestamp"]}
+                    for e in reversed(events)
+                ]
+            }}
+        })
+
+class ProviderStandIn(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency_ms: float = 0,
+                 rate_limit: float = 0, error_rate: float = 0):
+        super().__init__((host, port), StandInHandler)
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.rate_limiter = RateLimiter(rate_limit)
+        self.stats = {"requests": 0, "rate_limited": 0, "errors": 0}
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "ProviderStandIn":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+class StandInTrackingClient:
+    """
+    Minimal HTTP client for the stand-in, returning the tracking data shape
+    consumed by `services.update_tracking_from_data`
+    """
+    def __init__(self, base_url: str, provider: str = "17track", pool_size: int = 32):
+        self.base_url = base_url
+        self.provider = provider
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+
+    def get_tracking(self, tracking_number: str, carrier_code: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        if self.provider == "aftership":
+            response = self.session.get(f"{self.base_url}/v4/trackings/{carrier_code or 'auto'}/{tracking_number}", timeout=10)
+            response.raise_for_status()
+            checkpoints = response.json()["data"]["tracking"]["checkpoints"]
+            events = [
+                {"status": c["tag"], "location": c["location"], "message": c["message"], "timestamp": c["checkpoint_time"]}
+                for c in reversed(checkpoints)
+            ]
+        else:
+            response = self.session.post(f"{self.base_url}/track/v2/gettrackinfo", json=[{"number": tracking_number}], timeout=10)
+            response.raise_for_status()
+            events = response.json()["data"]["accepted"][0]["track_info"]["tracking"]["providers"][0]["events"]
+        
+        for event in events:
+            event["timestamp"] = datetime.fromisoformat(event["timestamp"])
+        
+        return {
+            "status": events[0]["status"],
+            "status_description": events[0].get("status_description"),
+            "carrier_code": carrier_code,
+            "events": events
+        }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local 17TRACK/AfterShip stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--rate-limit", type=float, default=0, help="Requests per second, 0 for unlimited")
+    parser.add_argument("--error-rate", type=float, default=0)
+    args = parser.parse_args()
+    
+    server = ProviderStandIn(args.host, args.port, args.latency_ms, args.rate_limit, args.error_rate)
+    print(f"Provider stand-in listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,141 @@
+"""
+End-to-end tracking refresh benchmark against the local provider stand-in.
+
+Seeds N trackings in a throwaway SQLite database, refreshes every one of
+them through `services.check_tracking_status` twice (first sync, then an
+unchanged re-poll) and reports throughput, p50/p95 latency and SQL
+statements per parcel. `check_tracking_status` logs and swallows errors,
+so a refresh only counts as a success if it stored the provider data;
+failures are reported separately and left out of the latency figures.
+Runs entirely on localhost:
+
+    python -m benchmarks.tracking_refresh --sizes 1000 10000 100000 --workers 16 --latency-ms 50
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from api.auth.models import User
+from api.tracking import models, services
+from benchmarks.provider_standin import ProviderStandIn, StandInTrackingClient
+
+class StatementCounter:
+    def __init__(self, engine):
+        self.count = 0
+        self.lock = threading.Lock()
+        event.listen(engine, "before_cursor_execute", self.on_execute)
+
+    def on_execute(self, *args) -> None:
+        with self.lock:
+            self.count += 1
+
+def seed(session_factory, size: int) -> List[str]:
+    db = session_factory()
+    try:
+        user = User(id=str(uuid.uuid4()), email=f"bench-{uuid.uuid4()}@dropflow.pro", hashed_password="x")
+        db.add(user)
+        db.commit()
+        
+        ids = [str(uuid.uuid4()) for _ in range(size)]
+        db.bulk_insert_mappings(models.Tracking, [
+            {
+                "id": tracking_id,
+                "user_id": user.id,
+                "tracking_number": f"RR{index:09d}FR",
+                "provider": models.TrackingProvider.seventeen_track,
+                "status": models.TrackingStatus.pending,
+                "events_count": 0
+            }
+            for index, tracking_id in enumerate(ids)
+        ])
+        db.commit()
+        return ids
+    finally:
+        db.close()
+
+def refresh_all(session_factory, tracking_ids: List[str], workers: int) -> List[Optional[float]]:
+    """
+    Refresh every tracking, returning each latency or None for a failed refresh
+    """
+    local = threading.local()
+
+    def refresh(tracking_id: str) -> Optional[float]:
+        if not hasattr(local, "db"):
+            local.db = session_factory()
+        started_at = datetime.utcnow()
+        start = time.perf_counter()
+        tracking = services.check_tracking_status(local.db, tracking_id=tracking_id)
+        elapsed = time.perf_counter() - start
+        # A failed refresh is rolled back, leaving last_update from an earlier sync
+        if tracking is None or not tracking.last_update or tracking.last_update < started_at:
+            return None
+        return elapsed
+    
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(refresh, tracking_ids))
+
+def report(label: str, size: int, elapsed: float, latencies: List[Optional[float]], statements: int) -> Dict[str, float]:
+    succeeded = sorted(latency for latency in latencies if latency is not None)
+    result = {
+        "throughput": len(succeeded) / elapsed,
+        "failed": size - len(succeeded),
+        "p50_ms": statistics.median(succeeded) * 1000 if succeeded else float("nan"),
+        "p95_ms": succeeded[max(int(len(succeeded) * 0.95) - 1, 0)] * 1000 if succeeded else float("nan"),
+        "statements_per_parcel": statements / size
+    }
+    print(
+        f"{label:>12} n={size:<7} {result['throughput']:9.1f} parcels/s  "
+        f"p50 {result['p50_ms']:7.2f} ms  p95 {result['p95_ms']:7.2f} ms  "
+        f"{result['statements_per_parcel']:5.1f} stmts/parcel  {result['failed']} failed"
+    )
+    return result
+
+def run(size: int, workers: int) -> None:
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    
+    tracking_ids = seed(session_factory, size)
+    counter = StatementCounter(engine)
+    
+    for label in ("first sync", "re-poll"):
+        counter.count = 0
+        start = time.perf_counter()
+        latencies = refresh_all(session_factory, tracking_ids, workers)
+        report(label, size, time.perf_counter() - start, latencies, counter.count)
+    
+    engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tracking refresh throughput benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--rate-limit", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0)
+    args = parser.parse_args()
+    
+    standin = ProviderStandIn(latency_ms=args.latency_ms, rate_limit=args.rate_limit, error_rate=args.error_rate).start()
+    
+    # Route the real refresh path to the stand-in instead of the provider APIs
+    services.provider_clients[models.TrackingProvider.seventeen_track] = StandInTrackingClient(standin.url, "17track", pool_size=args.workers)
+    services.provider_clients[models.TrackingProvider.aftership] = StandInTrackingClient(standin.url, "aftership", pool_size=args.workers)
+    
+    try:
+        for size in args.sizes:
+            run(size, args.workers)
+        print(f"stand-in: {standin.stats}")
+    finally:
+        standin.stop()
@@ -0,0 +1,146 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+import logging
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+INVALIDATION_CHANNEL = "dropflow:cache-invalidate"
+
+class TTLCache:
+    """
+    Thread-safe in-process LRU cache with per-entry expiry.
+    
+    Caches are registered by name so invalidations published by another
+    worker (through the optional Redis channel) reach the right instance.
+    Every invalidation bumps `version`, so a read-through load that started
+    before it is returned but not cached.
+    """
+    registry: Dict[str, "TTLCache"] = {}
+
+    def __init__(self, name: str, ttl: float = 300, maxsize: int = 10000):
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.version = 0
+        TTLCache.registry[name] = self
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+                return default
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        with self.lock:
+            self._store(key, value, ttl)
+
+    def _store(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        self.entries[key] = (time.monotonic() + (ttl if ttl is not None else self.ttl), value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Read-through lookup: return the cached value or load and cache it
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            version = self.version
+            value = loader()
+            with self.lock:
+                # Don't cache a value loaded before a concurrent invalidation
+                if self.version == version:
+                    self._store(key, value)
+        return value
+
+    def invalidate(self, key: Hashable, broadcast: bool = True) -> None:
+        with self.lock:
+            self.entries.pop(key, None)
+            self.version += 1
+        if broadcast:
+            publish_invalidation(self.name, key)
+
+    def clear(self, broadcast: bool = True) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.version += 1
+        if broadcast:
+            publish_invalidation(self.name, None)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0
+        }
+
+# Optional cross-worker invalidation over Redis pub/sub
+_redis_client = None
+_listener = None
+
+def publish_invalidation(cache_name: str, key: Optional[Hashable]) -> None:
+    if _redis_client is None:
+        return
+    try:
+        _redis_client.publish(INVALIDATION_CHANNEL, f"{cache_name}\t{'' if key is None else key}")
+    except Exception as e:
+        logger.error(f"Failed to publish cache invalidation: {e}")
+
+def _handle_invalidation(message: Dict[str, Any]) -> None:
+    data = message.get("data")
+    if isinstance(data, bytes):
+        data = data.decode()
+    if not isinstance(data, str) or "\t" not in data:
+        return
+    cache_name, key = data.split("\t", 1)
+    cache = TTLCache.registry.get(cache_name)
+    if cache is None:
+        return
+    if key:
+        cache.invalidate(key, broadcast=False)
+    else:
+        cache.clear(broadcast=False)
+
+def start_invalidation_listener() -> None:
+    """
+    Subscribe to invalidations from other workers when REDIS_URL is configured
+    """
+    global _redis_client, _listener
+    if not settings.REDIS_URL or _listener is not None:
+        return
+    try:
+        import redis
+        
+        _redis_client = redis.Redis.from_url(settings.REDIS_URL)
+        pubsub = _redis_client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{INVALIDATION_CHANNEL: _handle_invalidation})
+        _listener = pubsub.run_in_thread(sleep_time=1, daemon=True)
+        logger.info("Cache invalidation listener started")
+    except Exception as e:
+        logger.error(f"Failed to start cache invalidation listener: {e}")
+        _redis_client = None
+
+def stop_invalidation_listener() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
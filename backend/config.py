@@ -28,6 +28,11 @@ class Settings(BaseSettings):
     # Database settings
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./dropflow.db")
     
+    # Cache settings
+    REDIS_URL: Optional[str] = os.getenv("REDIS_URL")  # Enables cross-worker cache invalidation
+    TRACKING_SETTINGS_CACHE_TTL: int = int(os.getenv("TRACKING_SETTINGS_CACHE_TTL", "300"))
+    CARRIER_CACHE_TTL: int = int(os.getenv("CARRIER_CACHE_TTL", "3600"))
+    
     # Supabase settings
     SUPABASE_URL: str = os.getenv("SUPABASE_URL", "")
     SUPABASE_KEY: str = os.getenv("SUPABASE_KEY", "")
@@ -40,6 +45,23 @@ class Settings(BaseSettings):
     TRACKING_17TRACK_API_KEY: Optional[str] = os.getenv("TRACKING_17TRACK_API_KEY")
     OPENAI_API_KEY: Optional[str] = os.getenv("OPENAI_API_KEY")
     
+    # LLM gateway settings
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+    LLM_PACK_SIZE: int = int(os.getenv("LLM_PACK_SIZE", "8"))  # Prompts per packed request
+    LLM_PACK_WINDOW_MS: int = int(os.getenv("LLM_PACK_WINDOW_MS", "20"))
+    LLM_CACHE_TTL: int = int(os.getenv("LLM_CACHE_TTL", "3600"))
+    LLM_CACHE_SIZE: int = int(os.getenv("LLM_CACHE_SIZE", "10000"))
+    
+    # Chatbot history settings
+    CHATBOT_HISTORY_WINDOW: int = int(os.getenv("CHATBOT_HISTORY_WINDOW", "10"))  # Messages sent verbatim
+    CHATBOT_HISTORY_FOLD_BATCH: int = int(os.getenv("CHATBOT_HISTORY_FOLD_BATCH", "6"))  # Older messages folded into the summary at once
+    CHATBOT_HISTORY_TOKEN_BUDGET: int = int(os.getenv("CHATBOT_HISTORY_TOKEN_BUDGET", "3000"))
+    INTENT_CONFIDENCE_THRESHOLD: float = float(os.getenv("INTENT_CONFIDENCE_THRESHOLD", "0.5"))  # Below this the LLM classifies the query
+    
+    # Knowledge base search settings
+    KB_INDEX_MAX_AGE: int = int(os.getenv("KB_INDEX_MAX_AGE", "300"))  # Seconds before the KB search index is rebuilt
+    KB_EMBEDDINGS_PATH: str = os.getenv("KB_EMBEDDINGS_PATH", "./data/kb_embeddings")  # Built by python -m api.support.embeddings
+    
     # Stripe settings
     STRIPE_SECRET_KEY: Optional[str] = os.getenv("STRIPE_SECRET_KEY")
     STRIPE_PUBLISHABLE_KEY: Optional[str] = os.getenv("STRIPE_PUBLISHABLE_KEY")
@@ -53,6 +75,34 @@ class Settings(BaseSettings):
     EMAILS_FROM_NAME: Optional[str] = os.getenv("EMAILS_FROM_NAME", "DropFlow Pro")
     EMAILS_FROM_EMAIL: Optional[str] = os.getenv("EMAILS_FROM_EMAIL", "support@dropflow.pro")
     
+    # Notification dispatcher settings
+    NOTIFICATION_DISPATCH_INTERVAL: int = int(os.getenv("NOTIFICATION_DISPATCH_INTERVAL", "5"))
+    NOTIFICATION_BATCH_SIZE: int = int(os.getenv("NOTIFICATION_BATCH_SIZE", "200"))
+    NOTIFICATION_MAX_ATTEMPTS: int = int(os.getenv("NOTIFICATION_MAX_ATTEMPTS", "5"))
+    NOTIFICATION_CLAIM_TIMEOUT: int = int(os.getenv("NOTIFICATION_CLAIM_TIMEOUT", "600"))  # Seconds before a notification left in "sending" is claimed again
+    NOTIFICATION_WEBHOOK_TIMEOUT: int = int(os.getenv("NOTIFICATION_WEBHOOK_TIMEOUT", "10"))
+    NOTIFICATION_WEBHOOK_CONCURRENCY: int = int(os.getenv("NOTIFICATION_WEBHOOK_CONCURRENCY", "50"))
+    NOTIFICATION_WEBHOOK_PER_HOST: int = int(os.getenv("NOTIFICATION_WEBHOOK_PER_HOST", "4"))
+    TICKET_NOTIFICATION_DIGEST_WINDOW: int = int(os.getenv("TICKET_NOTIFICATION_DIGEST_WINDOW", "120"))  # Seconds replies on a ticket are coalesced, 0 sends each one
+    SUPPORT_TEAM_EMAIL: str = os.getenv("SUPPORT_TEAM_EMAIL", "support@dropflow.pro")
+    
+    # Winner re-scoring worker settings
+    WINNER_RESCORE_INTERVAL: int = int(os.getenv("WINNER_RESCORE_INTERVAL", "60"))
+    WINNER_RESCORE_BATCH_SIZE: int = int(os.getenv("WINNER_RESCORE_BATCH_SIZE", "2000"))
+    WINNER_ANALYSIS_CACHE_SIZE: int = int(os.getenv("WINNER_ANALYSIS_CACHE_SIZE", "50000"))
+    WINNER_ANALYSIS_CACHE_TTL: int = int(os.getenv("WINNER_ANALYSIS_CACHE_TTL", "86400"))
+    MARKET_TREND_CACHE_TTL: int = int(os.getenv("MARKET_TREND_CACHE_TTL", "21600"))
+    
+    # Social sync settings
+    SOCIAL_SYNC_MAX_WORKERS: int = int(os.getenv("SOCIAL_SYNC_MAX_WORKERS", "8"))
+    SOCIAL_SYNC_PER_PLATFORM: int = int(os.getenv("SOCIAL_SYNC_PER_PLATFORM", "2"))  # Concurrent syncs against one platform API, per process
+    SOCIAL_SYNC_INTERVAL: int = int(os.getenv("SOCIAL_SYNC_INTERVAL", "3600"))  # Accounts synced longer ago than this are due
+    SOCIAL_SYNC_CHECK_INTERVAL: int = int(os.getenv("SOCIAL_SYNC_CHECK_INTERVAL", "300"))
+    SOCIAL_SYNC_PAGE_SIZE: int = int(os.getenv("SOCIAL_SYNC_PAGE_SIZE", "100"))
+    SOCIAL_SYNC_LOOKBACK: int = int(os.getenv("SOCIAL_SYNC_LOOKBACK", "86400"))  # Seconds before the sync cursor read again for late posts
+    SOCIAL_ENGAGEMENT_REFRESH_DAYS: int = int(os.getenv("SOCIAL_ENGAGEMENT_REFRESH_DAYS", "7"))  # Older posts keep their last engagement
+    SOCIAL_ENGAGEMENT_BATCH_SIZE: int = int(os.getenv("SOCIAL_ENGAGEMENT_BATCH_SIZE", "100"))
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -1,4 +1,5 @@
 from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from config import settings
@@ -19,6 +20,21 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 # Create Base class
 Base = declarative_base()
 
+# INSERT constructs supporting ON CONFLICT, per dialect
+UPSERT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert
+}
+
+def upsert_insert(db, table):
+    """
+    INSERT for the session's database with on_conflict_do_update / on_conflict_do_nothing
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect not in UPSERT_INSERTS:
+        raise NotImplementedError(f"ON CONFLICT upserts are not supported on {dialect}")
+    return UPSERT_INSERTS[dialect](table)
+
 # Dependency to get DB session
 def get_db():
     db = SessionLocal()
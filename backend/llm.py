@@ -0,0 +1,357 @@
+import hashlib
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import logging
+
+from config import settings
+from cache import TTLCache
+from clients.openai import OpenAIClient
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+PACK_INSTRUCTIONS = (
+    "Answer each of the {count} numbered prompts below independently. "
+    "Reply with only a JSON array of {count} strings, where item i is the complete answer to prompt i."
+)
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count (about four characters per token) for metrics
+    """
+    return max(1, len(text) // 4)
+
+def normalize_prompt(text: str) -> str:
+    """
+    Normalize a prompt for cache lookups (case and whitespace insensitive)
+    """
+    return " ".join(text.split()).casefold()
+
+def build_packed_prompt(prompts: List[str]) -> str:
+    parts = [PACK_INSTRUCTIONS.format(count=len(prompts))]
+    for index, prompt in enumerate(prompts, 1):
+        parts.append(f"### Prompt {index}\n{prompt.strip()}")
+    return "\n\n".join(parts)
+
+def parse_packed_response(response: str, count: int) -> List[str]:
+    """
+    Extract the answers of a packed request, raising ValueError if the reply is malformed
+    """
+    start, end = response.find("["), response.rfind("]")
+    if start == -1 or end <= start:
+        raise ValueError("Packed response is not a JSON array")
+    
+    answers = json.loads(response[start:end + 1])
+    if not isinstance(answers, list) or len(answers) != count:
+        raise ValueError(f"Packed response has {len(answers) if isinstance(answers, list) else 0} answers, expected {count}")
+    
+    return [answer if isinstance(answer, str) else json.dumps(answer) for answer in answers]
+
+class LLMGateway:
+    """
+    Shared entry point for every LLM call made by the API.
+    
+    Exposes the `OpenAIClient` methods so modules can call it in place of
+    their own client, and adds on top of them:
+    
+    - a response cache keyed by a hash of the normalized prompt (or
+      messages), so changes in case or whitespace still hit,
+    - request packing: short completions submitted with `pack=True` within
+      `pack_window` seconds, or passed together to `generate_completions`,
+      are sent as one request answering up to `pack_size` prompts,
+    - a semaphore bounding concurrent requests to the model,
+    - per-feature request, cache, token and latency metrics.
+    """
+    def __init__(
+        self,
+        client: Optional[Any] = None,
+        max_concurrency: int = settings.LLM_MAX_CONCURRENCY,
+        pack_size: int = settings.LLM_PACK_SIZE,
+        pack_window: float = settings.LLM_PACK_WINDOW_MS / 1000,
+        cache_ttl: int = settings.LLM_CACHE_TTL,
+        cache_size: int = settings.LLM_CACHE_SIZE
+    ):
+        self.client = client or OpenAIClient()
+        self.max_concurrency = max_concurrency
+        self.semaphore = threading.BoundedSemaphore(max_concurrency)
+        self.pack_size = pack_size
+        self.pack_window = pack_window
+        self.cache = TTLCache("llm_responses", ttl=cache_ttl, maxsize=cache_size)
+        self.pending: Dict[str, List[Tuple[str, Future]]] = {}
+        self.pending_lock = threading.Lock()
+        self.features: Dict[str, Dict[str, Any]] = {}
+        self.metrics_lock = threading.Lock()
+
+    def generate_completion(
+        self,
+        prompt: str,
+        feature: str = "default",
+        use_cache: bool = True,
+        pack: bool = False
+    ) -> str:
+        """
+        Complete a prompt, from the cache when possible
+        
+        With `pack=True` the prompt may be answered as part of a packed
+        request together with prompts submitted concurrently for the same feature.
+        """
+        normalized = normalize_prompt(prompt)
+        key = self.cache_key("completion", normalized)
+        if use_cache:
+            cached = self.lookup(key, feature)
+            if cached is not _MISSING:
+                return cached
+        else:
+            self.record(feature, requests=1)
+        
+        if pack and self.pack_size > 1:
+            response = self.submit_packed(prompt, feature)
+        else:
+            response = self.call(feature, prompt, lambda: self.client.generate_completion(prompt))
+        
+        if use_cache:
+            self.cache.set(key, response)
+        return response
+
+    def generate_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        feature: str = "default",
+        use_cache: bool = True
+    ) -> str:
+        """
+        Complete a chat conversation, from the cache when possible
+        """
+        normalized = [(message["role"], normalize_prompt(message["content"])) for message in messages]
+        key = self.cache_key("chat", normalized)
+        if use_cache:
+            cached = self.lookup(key, feature)
+            if cached is not _MISSING:
+                return cached
+        else:
+            self.record(feature, requests=1)
+        
+        prompt_text = "\n".join(message["content"] for message in messages)
+        response = self.call(feature, prompt_text, lambda: self.client.generate_chat_completion(messages))
+        
+        if use_cache:
+            self.cache.set(key, response)
+        return response
+
+    def stream_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        feature: str = "default",
+        use_cache: bool = True
+    ) -> Iterator[str]:
+        """
+        Complete a chat conversation, yielding the response as it is generated
+        
+        Cached responses are yielded in one chunk; clients without streaming
+        support fall back to a single blocking completion. The concurrency
+        slot is held until the stream ends or is closed by the consumer.
+        """
+        normalized = [(message["role"], normalize_prompt(message["content"])) for message in messages]
+        key = self.cache_key("chat", normalized)
+        if use_cache:
+            cached = self.lookup(key, feature)
+            if cached is not _MISSING:
+                yield cached
+                return
+        else:
+            self.record(feature, requests=1)
+        
+        prompt_text = "\n".join(message["content"] for message in messages)
+        stream = getattr(self.client, "stream_chat_completion", None)
+        if stream is None:
+            response = self.call(feature, prompt_text, lambda: self.client.generate_chat_completion(messages))
+            yield response
+        else:
+            chunks = []
+            first_token = None
+            with self.semaphore:
+                start = time.perf_counter()
+                try:
+                    for chunk in stream(messages):
+                        if first_token is None:
+                            first_token = time.perf_counter() - start
+                        chunks.append(chunk)
+                        yield chunk
+                except Exception:
+                    self.record(feature, errors=1)
+                    raise
+                latency = time.perf_counter() - start
+            
+            response = "".join(chunks)
+            self.record(
+                feature,
+                llm_calls=1,
+                prompt_tokens=estimate_tokens(prompt_text),
+                completion_tokens=estimate_tokens(response),
+                latency=latency,
+                first_token=first_token
+            )
+        
+        if use_cache:
+            self.cache.set(key, response)
+
+    def lookup(self, key: str, feature: str) -> Any:
+        """
+        Find a cached response and record the request as a hit or a miss
+        """
+        cached = self.cache.get(key, _MISSING)
+        if cached is not _MISSING:
+            self.record(feature, requests=1, cache_hits=1)
+            return cached
+        
+        self.record(feature, requests=1)
+        return _MISSING
+
+    def generate_completions(self, prompts: List[str], feature: str = "default", use_cache: bool = True) -> List[str]:
+        """
+        Complete many prompts, packing the uncached ones into as few requests as possible
+        """
+        results: Dict[str, str] = {}
+        misses = []
+        for prompt in dict.fromkeys(prompts):
+            cached = self.cache.get(self.cache_key("completion", normalize_prompt(prompt)), _MISSING) if use_cache else _MISSING
+            if cached is _MISSING:
+                misses.append(prompt)
+            else:
+                results[prompt] = cached
+        self.record(feature, requests=len(prompts), cache_hits=len(prompts) - len(misses) if use_cache else 0)
+        
+        for prompt, response in zip(misses, self.complete_packed(misses, feature)):
+            results[prompt] = response
+            if use_cache:
+                self.cache.set(self.cache_key("completion", normalize_prompt(prompt)), response)
+        
+        return [results[prompt] for prompt in prompts]
+
+    def submit_packed(self, prompt: str, feature: str) -> str:
+        """
+        Queue a prompt for the next packed request of its feature and wait for its answer
+        
+        The first caller of a window waits `pack_window` seconds, then sends
+        everything queued meanwhile; the others just wait for their result.
+        """
+        future: Future = Future()
+        with self.pending_lock:
+            queue = self.pending.setdefault(feature, [])
+            queue.append((prompt, future))
+            leader = len(queue) == 1
+        
+        if leader:
+            time.sleep(self.pack_window)
+            with self.pending_lock:
+                batch = self.pending.pop(feature, [])
+            try:
+                responses = self.complete_packed([p for p, _ in batch], feature)
+                for (_, waiting), response in zip(batch, responses):
+                    waiting.set_result(response)
+            except Exception as e:
+                for _, waiting in batch:
+                    if not waiting.done():
+                        waiting.set_exception(e)
+        
+        return future.result()
+
+    def complete_packed(self, prompts: List[str], feature: str) -> List[str]:
+        """
+        Answer prompts with packed requests of up to `pack_size` prompts, sent concurrently
+        """
+        if not prompts:
+            return []
+        
+        packs = [prompts[i:i + self.pack_size] for i in range(0, len(prompts), self.pack_size)]
+        if len(packs) == 1:
+            return self.complete_pack(packs[0], feature)
+        
+        with ThreadPoolExecutor(max_workers=min(len(packs), self.max_concurrency)) as executor:
+            answers = executor.map(lambda pack: self.complete_pack(pack, feature), packs)
+            return [answer for pack_answers in answers for answer in pack_answers]
+
+    def complete_pack(self, prompts: List[str], feature: str) -> List[str]:
+        """
+        Answer one pack of prompts with a single request, or one by one if the reply can't be split
+        """
+        if len(prompts) == 1:
+            return [self.call(feature, prompts[0], lambda: self.client.generate_completion(prompts[0]))]
+        
+        packed = build_packed_prompt(prompts)
+        response = self.call(feature, packed, lambda: self.client.generate_completion(packed))
+        try:
+            answers = parse_packed_response(response, len(prompts))
+        except ValueError as e:
+            logger.warning(f"Unpacking {len(prompts)} {feature} prompts failed, sending them separately: {e}")
+            return [self.call(feature, prompt, lambda prompt=prompt: self.client.generate_completion(prompt)) for prompt in prompts]
+        
+        self.record(feature, packed_prompts=len(prompts))
+        return answers
+
+    def call(self, feature: str, prompt_text: str, request: Callable[[], str]) -> str:
+        """
+        Send one request to the model within the concurrency limit and record its metrics
+        """
+        with self.semaphore:
+            start = time.perf_counter()
+            try:
+                response = request()
+            except Exception:
+                self.record(feature, errors=1)
+                raise
+            latency = time.perf_counter() - start
+        
+        self.record(
+            feature,
+            llm_calls=1,
+            prompt_tokens=estimate_tokens(prompt_text),
+            completion_tokens=estimate_tokens(response or ""),
+            latency=latency
+        )
+        return response
+
+    def cache_key(self, kind: str, payload: Any) -> str:
+        return hashlib.sha256(json.dumps([kind, payload], sort_keys=True).encode()).hexdigest()
+
+    def record(self, feature: str, latency: Optional[float] = None, first_token: Optional[float] = None, **counters: int) -> None:
+        with self.metrics_lock:
+            stats = self.features.get(feature)
+            if stats is None:
+                stats = self.features[feature] = {
+                    "requests": 0, "cache_hits": 0, "llm_calls": 0, "packed_prompts": 0,
+                    "errors": 0, "prompt_tokens": 0, "completion_tokens": 0,
+                    "latencies": deque(maxlen=1000), "first_tokens": deque(maxlen=1000)
+                }
+            for name, value in counters.items():
+                stats[name] += value
+            if latency is not None:
+                stats["latencies"].append(latency)
+            if first_token is not None:
+                stats["first_tokens"].append(first_token)
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Per-feature request, cache, token and latency metrics
+        """
+        features = {}
+        with self.metrics_lock:
+            for feature, stats in self.features.items():
+                latencies = sorted(stats["latencies"])
+                first_tokens = sorted(stats["first_tokens"])
+                features[feature] = {
+                    **{name: value for name, value in stats.items() if name not in ("latencies", "first_tokens")},
+                    "cache_hit_rate": stats["cache_hits"] / stats["requests"] if stats["requests"] else 0,
+                    "latency_p50_ms": latencies[len(latencies) // 2] * 1000 if latencies else None,
+                    "latency_p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000 if latencies else None,
+                    "first_token_p50_ms": first_tokens[len(first_tokens) // 2] * 1000 if first_tokens else None
+                }
+        
+        return {"features": features, "cache": self.cache.stats()}
+
+llm_gateway = LLMGateway()
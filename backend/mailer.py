@@ -0,0 +1,77 @@
+import smtplib
+from email.message import EmailMessage
+from typing import List, Optional, Tuple
+import logging
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+class SMTPBatchSender:
+    """
+    Send many emails over a single reused SMTP connection.
+    
+    Use as a context manager; the connection is opened lazily on the first
+    message and reopened once if the server drops it mid-batch.
+    """
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None):
+        self.host = host or settings.SMTP_HOST
+        self.port = port or settings.SMTP_PORT
+        self.server: Optional[smtplib.SMTP] = None
+
+    def __enter__(self) -> "SMTPBatchSender":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def connect(self) -> None:
+        self.server = smtplib.SMTP(self.host, self.port, timeout=30)
+        self.server.starttls()
+        if settings.SMTP_USER:
+            self.server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
+
+    def close(self) -> None:
+        if self.server is not None:
+            try:
+                self.server.quit()
+            except smtplib.SMTPException:
+                pass
+            self.server = None
+
+    def send(self, recipient: str, subject: str, content: str) -> None:
+        """
+        Send one message, reconnecting once if the connection was dropped
+        """
+        if not self.host:
+            # No SMTP configured (development): just log it
+            logger.info(f"Sending email to {recipient}: {content[:50]}...")
+            return
+        
+        msg = EmailMessage()
+        msg.set_content(content)
+        msg["Subject"] = subject
+        msg["From"] = f"{settings.EMAILS_FROM_NAME} <{settings.EMAILS_FROM_EMAIL}>"
+        msg["To"] = recipient
+        
+        if self.server is None:
+            self.connect()
+        try:
+            self.server.send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            self.connect()
+            self.server.send_message(msg)
+
+    def send_many(self, messages: List[Tuple[str, str, str]]) -> List[Optional[str]]:
+        """
+        Send (recipient, subject, content) messages and return one error per message (None on success)
+        """
+        errors = []
+        for recipient, subject, content in messages:
+            try:
+                self.send(recipient, subject, content)
+                errors.append(None)
+            except Exception as e:
+                logger.error(f"Failed to send email to {recipient}: {e}")
+                errors.append(str(e))
+        return errors
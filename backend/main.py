@@ -9,6 +9,8 @@ import logging
 
 # Import modules
 from api.auth.routes import router as auth_router
+from api.auth.services import get_current_user
+from api.auth.models import User
 from api.crm.routes import router as crm_router
 from api.import.routes import router as import_router
 from api.seo.routes import router as seo_router
@@ -19,9 +21,15 @@ from api.analytics.routes import router as analytics_router
 from api.support.routes import router as support_router
 from api.legal.routes import router as legal_router
 from api.social.routes import router as social_router
+from api.tracking.dispatcher import notification_dispatcher
+from api.support.notifications import ticket_notification_dispatcher
+from api.social.sync import social_sync_worker
+from api.winners.rescoring import winner_rescore_worker
 
 from database import get_db, Base, engine
 from config import settings
+from cache import start_invalidation_listener, stop_invalidation_listener
+from llm import llm_gateway
 
 # Load environment variables
 load_dotenv()
@@ -51,6 +59,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Security
@@ -69,6 +78,22 @@ app.include_router(support_router, prefix="/api/support", tags=["Support"])
 app.include_router(legal_router, prefix="/api/legal", tags=["Legal"])
 app.include_router(social_router, prefix="/api/social", tags=["Social"])
 
+@app.on_event("startup")
+async def start_workers():
+    start_invalidation_listener()
+    notification_dispatcher.start()
+    ticket_notification_dispatcher.start()
+    winner_rescore_worker.start()
+    social_sync_worker.start()
+
+@app.on_event("shutdown")
+async def stop_workers():
+    await notification_dispatcher.stop()
+    await ticket_notification_dispatcher.stop()
+    await winner_rescore_worker.stop()
+    await social_sync_worker.stop()
+    stop_invalidation_listener()
+
 @app.get("/", tags=["Health"])
 async def root():
     return {"message": "Welcome to DropFlow Pro API", "version": "2.0.0"}
@@ -77,5 +102,13 @@ async def root():
 async def health_check():
     return {"status": "healthy", "environment": settings.ENVIRONMENT}
 
+@app.get("/metrics/llm", tags=["Health"])
+async def llm_metrics(current_user: User = Depends(get_current_user)):
+    # Gateway metrics cover every user's requests, so only admins can read them
+    if not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Only admins can view LLM metrics")
+    
+    return llm_gateway.metrics()
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
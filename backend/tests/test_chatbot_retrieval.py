@@ -0,0 +1,32 @@
+from api.support.chatbot import Chatbot
+
+ARTICLES = [
+    {
+        "id": "tracking",
+        "title": "Tracking your orders",
+        "content": "Follow every shipment from the supplier to your customer's door."
+    },
+    {
+        "id": "import",
+        "title": "How to import products",
+        "content": "Importing products from AliExpress and BigBuy takes a few clicks."
+    },
+    {
+        "id": "billing",
+        "title": "Managing your subscription",
+        "content": "Upgrade, downgrade or cancel your plan from the billing page."
+    },
+]
+
+def relevant_ids(query):
+    return [article["id"] for article in Chatbot(ARTICLES).find_relevant_articles(query)]
+
+def test_query_terms_match_plural_article_terms():
+    assert relevant_ids("track order") == ["tracking"]
+
+def test_query_terms_match_ing_article_terms():
+    assert relevant_ids("how to import product") == ["import"]
+    assert relevant_ids("track shipment") == ["tracking"]
+
+def test_unrelated_query_matches_nothing():
+    assert relevant_ids("refund dispute") == []
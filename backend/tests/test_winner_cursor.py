@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from api.winners import models, services
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+def add_winners(db, count, created=()):
+    """
+    Add `count` winners with the default created_at, then one per explicit value
+    """
+    values = [{}] * count + [{"created_at": created_at} for created_at in created]
+    for i, extra in enumerate(values):
+        db.add(models.WinnerProduct(
+            id=f"w{i}",
+            user_id="u1",
+            title=f"Winner {i}",
+            price=10.0,
+            winner_score=80,
+            **extra
+        ))
+    db.commit()
+
+def walk_pages(db, sort_order, limit=2):
+    seen = []
+    cursor = None
+    for _ in range(20):
+        page = services.get_winner_products(
+            db, "u1", limit=limit, offset=0, sort_by="created_at", sort_order=sort_order, cursor=cursor
+        )
+        seen += [product.id for product in page]
+        if len(page) < limit:
+            return seen
+        cursor = services.encode_winner_cursor(page[-1], "created_at")
+    pytest.fail(f"Cursor pagination did not terminate: {seen}")
+
+@pytest.mark.parametrize("sort_order", ["desc", "asc"])
+def test_created_at_cursor_walks_rows_created_together(db, sort_order):
+    # Inserted in one flush, so the default timestamps fall in the same second
+    add_winners(db, 6)
+    
+    seen = walk_pages(db, sort_order)
+    
+    assert sorted(seen) == [f"w{i}" for i in range(6)]
+
+@pytest.mark.parametrize("sort_order", ["desc", "asc"])
+def test_created_at_cursor_walks_rows_sharing_a_second(db, sort_order):
+    second = datetime(2026, 10, 1, 12, 0, 0)
+    add_winners(db, 0, [second] * 5 + [second + timedelta(seconds=1), second - timedelta(seconds=1)])
+    
+    seen = walk_pages(db, sort_order)
+    
+    expected = ["w5", "w4", "w3", "w2", "w1", "w0", "w6"]
+    assert seen == (expected if sort_order == "desc" else expected[::-1])
@@ -89,22 +89,69 @@ def extract_product_id_from_url(url: str) -> Optional[str]:
     
     return None
 
+# Built-in tracking number formats as (carrier name, carrier code, pattern),
+# in priority order: the first full match wins.
+DEFAULT_CARRIER_PATTERNS = [
+    ("UPS", "ups", r'1Z[0-9A-Z]{16}'),
+    ("FedEx", "fedex", r'[0-9]{12}'),
+    ("USPS", "usps", r'[0-9]{20,22}'),
+    ("DHL", "dhl", r'[0-9]{10}'),
+    ("Royal Mail", "royal-mail", r'[A-Z]{2}[0-9]{9}[A-Z]{2}'),
+    ("Colissimo", "colissimo", r'[0-9]{13}'),
+]
+
+class CarrierClassifier:
+    """
+    Single-pass carrier detection over a combined regex.
+
+    Every pattern becomes one named alternative of a single compiled
+    expression, so classifying a number is one `fullmatch` whatever the
+    number of carriers; `lastgroup` tells which alternative matched.
+    Patterns come from carrier settings, so each one is compiled on its own
+    first and invalid ones are logged and skipped instead of breaking
+    detection for every carrier.
+    """
+    def __init__(self, patterns: Optional[List[tuple]] = None):
+        self.carriers = []
+        alternatives = []
+        for name, code, pattern in patterns or DEFAULT_CARRIER_PATTERNS:
+            try:
+                compiled = re.compile(pattern)
+            except (re.error, TypeError) as e:
+                logger.warning(f"Skipping invalid tracking number pattern for carrier {name}: {e}")
+                continue
+            if compiled.groupindex:
+                # Named groups would clash with the alternative names
+                logger.warning(f"Skipping tracking number pattern with named groups for carrier {name}")
+                continue
+            alternatives.append(f"(?P<c{len(self.carriers)}>{pattern})")
+            self.carriers.append((name, code))
+        self.regex = re.compile("|".join(alternatives)) if alternatives else None
+
+    def classify(self, tracking_number: str) -> Optional[tuple]:
+        """
+        Return the (carrier name, carrier code) of a tracking number, if recognized
+        """
+        if self.regex is None or not tracking_number:
+            return None
+        match = self.regex.fullmatch(tracking_number.strip().upper())
+        if not match:
+            return None
+        return self.carriers[int(match.lastgroup[1:])]
+
+    def classify_many(self, tracking_numbers: List[str]) -> Dict[str, Optional[tuple]]:
+        """
+        Classify a list of tracking numbers, each distinct number once
+        """
+        classify = self.classify
+        return {number: classify(number) for number in set(tracking_numbers)}
+
+default_carrier_classifier = CarrierClassifier()
+
 def get_tracking_carrier(tracking_number: str) -> Optional[str]:
     """Attempt to identify carrier from tracking number format."""
-    if re.match(r'^1Z[0-9A-Z]{16}$', tracking_number):
-        return 'UPS'
-    elif re.match(r'^[0-9]{12}$', tracking_number):
-        return 'FedEx'
-    elif re.match(r'^[0-9]{20,22}$', tracking_number):
-        return 'USPS'
-    elif re.match(r'^[0-9]{10}$', tracking_number):
-        return 'DHL'
-    elif re.match(r'^[A-Z]{2}[0-9]{9}[A-Z]{2}$', tracking_number):
-        return 'Royal Mail'
-    elif re.match(r'^[0-9]{13}$', tracking_number):
-        return 'Colissimo'
-    
-    return None
+    carrier = default_carrier_classifier.classify(tracking_number)
+    return carrier[0] if carrier else None
 
 def log_activity(user_id: str, action: str, details: Dict[str, Any]) -> None:
     """Log user activity for audit purposes."""